@@ -0,0 +1,39 @@
+// 빌드 산출물(dist)의 텍스트 파일마다 .br / .gz 사전 압축본을 생성합니다.
+// 백엔드(PrecompressedStaticFiles)가 Accept-Encoding에 맞는 파일을 그대로 전송하므로
+// 요청마다 압축하지 않고 최고 압축률을 사용할 수 있습니다.
+import { readdirSync, readFileSync, statSync, writeFileSync } from 'node:fs';
+import { extname, join } from 'node:path';
+import { brotliCompressSync, constants, gzipSync } from 'node:zlib';
+
+const distDir = process.argv[2] ?? 'dist';
+const extensions = new Set(['.html', '.js', '.mjs', '.css', '.svg', '.json', '.txt', '.map', '.ico', '.webmanifest']);
+const minBytes = 1024;
+
+function* walk(dir) {
+  for (const entry of readdirSync(dir, { withFileTypes: true })) {
+    const path = join(dir, entry.name);
+    if (entry.isDirectory()) yield* walk(path);
+    else yield path;
+  }
+}
+
+let originalTotal = 0;
+let brotliTotal = 0;
+for (const path of walk(distDir)) {
+  if (!extensions.has(extname(path)) || statSync(path).size < minBytes) continue;
+  const content = readFileSync(path);
+  const br = brotliCompressSync(content, {
+    params: {
+      [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+      [constants.BROTLI_PARAM_SIZE_HINT]: content.length,
+    },
+  });
+  const gz = gzipSync(content, { level: constants.Z_BEST_COMPRESSION });
+  // 압축 효과가 없으면 만들지 않음 (원본이 그대로 전송됨)
+  if (br.length < content.length) writeFileSync(`${path}.br`, br);
+  if (gz.length < content.length) writeFileSync(`${path}.gz`, gz);
+  originalTotal += content.length;
+  brotliTotal += Math.min(br.length, content.length);
+}
+
+console.log(`precompress: ${(originalTotal / 1024).toFixed(1)} KiB → ${(brotliTotal / 1024).toFixed(1)} KiB (br)`);
@@ -0,0 +1,250 @@
+"""
+HTTP 압축
+
+- PrecompressedStaticFiles: 빌드 시 만들어 둔 .br/.gz 파일을 Accept-Encoding에 따라 그대로 전송하고,
+  해시가 붙은 빌드 산출물(assets/*-해시.js 등)은 1년 immutable 캐시로 응답
+- CompressionMiddleware: API 응답을 크기 기준(compression_min_bytes) 이상일 때 Brotli/GZip으로 압축
+  (스트리밍 응답은 조각마다 flush하여 진행 상황이 그대로 전달됨),
+  Content-Encoding: gzip으로 보낸 요청 본문(긴 면접 STT 등)은 풀어서 라우터에 전달
+
+Brotli는 brotli 패키지가 설치된 경우에만 사용하고, 없으면 GZip만 사용합니다.
+"""
+import logging
+import mimetypes
+import os
+import re
+import zlib
+from typing import Optional
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.staticfiles import StaticFiles
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# 빌드 도구(Vite)가 파일명에 콘텐츠 해시를 붙인 산출물 (내용이 바뀌면 이름도 바뀌므로 영구 캐시 가능)
+HASHED_ASSET_PATTERN = re.compile(r"(^|/)assets/.+[-.][A-Za-z0-9_-]{8,}\.[a-z0-9]+$")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+# 압축 효과가 있는 Content-Type
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    """Accept-Encoding 헤더에서 q=0이 아닌 인코딩 목록"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = re.search(r"q=([0-9.]+)", params)
+        if quality and float(quality.group(1)) == 0:
+            continue
+        accepted.add(name.strip())
+    return accepted
+
+def choose_encoding(accept_encoding: str, available=("br", "gzip")) -> Optional[str]:
+    """서버가 제공 가능한 인코딩 중 클라이언트가 받는 것 (br 우선)"""
+    accepted = _accepted_encodings(accept_encoding)
+    for encoding in available:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+class PrecompressedStaticFiles(StaticFiles):
+    """.br/.gz 사전 압축본과 장기 캐시 헤더를 지원하는 StaticFiles"""
+    
+    VARIANTS = (("br", ".br"), ("gzip", ".gz"))
+    
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        path = str(full_path)
+        media_type = mimetypes.guess_type(path)[0] or "text/plain"
+        
+        available = [encoding for encoding, suffix in self.VARIANTS if os.path.isfile(path + suffix)]
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), available) if available else None
+        if encoding is not None:
+            variant_path = path + dict(self.VARIANTS)[encoding]
+            response = super().file_response(variant_path, os.stat(variant_path), scope, status_code)
+            response.headers["content-type"] = media_type + ("; charset=utf-8" if media_type.startswith("text/") else "")
+            if response.status_code != 304:
+                response.headers["content-encoding"] = encoding
+        else:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+            
+        if available:
+            response.headers.add_vary_header("Accept-Encoding")
+        relative = os.path.relpath(path, self.directory) if self.directory else path
+        # 해시 산출물은 영구 캐시, index.html 등은 매번 재검증 (새 배포가 바로 반영되도록)
+        response.headers["cache-control"] = IMMUTABLE_CACHE if HASHED_ASSET_PATTERN.search(relative.replace(os.sep, "/")) else "no-cache"
+        return response
+
+class _Compressor:
+    """스트리밍 압축기 (gzip / br)"""
+    
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.compression_brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    
+    def flush(self, data: bytes) -> bytes:
+        """지금까지의 데이터를 클라이언트가 바로 풀 수 있게 내보냄 (스트리밍 조각용)"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+    
+    def finish(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+class _CompressingSend:
+    """응답 헤더를 첫 본문 조각까지 보류했다가 압축 여부를 결정하는 send 래퍼"""
+    
+    def __init__(self, send, encoding: str):
+        self.send = send
+        self.encoding = encoding
+        self.start_message = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+    
+    def _should_compress(self, headers: MutableHeaders, status: int) -> bool:
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+    
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if self.passthrough or self.compressor is not None:
+            await self._send_body(message)
+            return
+        if message["type"] != "http.response.body":
+            # pathsend 등 본문 이외의 메시지는 압축하지 않음
+            self.passthrough = True
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+            
+        # 첫 본문 조각: 압축 여부 결정
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if not self._should_compress(headers, self.start_message["status"]) or (
+            not more_body and len(body) < settings.compression_min_bytes
+        ):
+            self.passthrough = True
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+            
+        self.compressor = _Compressor(self.encoding)
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag", "")
+        if etag.startswith('"') and etag.endswith('"'):
+            # 강한 ETag는 표현(인코딩)마다 달라야 하므로 접미사 추가 (http_cache에서 비교 시 무시)
+            headers["etag"] = f'{etag[:-1]}-{self.encoding}"'
+        if more_body:
+            # 스트리밍: 길이를 미리 알 수 없음
+            if "content-length" in headers:
+                del headers["content-length"]
+            self.start_message["headers"] = headers.raw
+            await self.send(self.start_message)
+            await self._send_body(message)
+        else:
+            compressed = self.compressor.finish(body)
+            headers["content-length"] = str(len(compressed))
+            self.start_message["headers"] = headers.raw
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": compressed, "more_body": False})
+    
+    async def _send_body(self, message):
+        if self.passthrough or message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        data = self.compressor.flush(body) if more_body else self.compressor.finish(body)
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+def _decompressing_receive(receive):
+    """
+    gzip 요청 본문을 조각 단위로 풀어 주는 receive 래퍼 (압축 폭탄 방지를 위해 최대 크기 제한)
+    
+    오류는 HTTPException으로 올려 라우터의 본문 파싱 단계에서 그대로 413/400 응답이 되도록 합니다.
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    total = 0
+    
+    async def wrapped():
+        nonlocal total
+        message = await receive()
+        if message["type"] != "http.request":
+            return message
+        try:
+            body = decompressor.decompress(message.get("body", b""), settings.request_max_decompressed_bytes - total + 1)
+            if not message.get("more_body", False):
+                body += decompressor.flush()
+        except zlib.error as e:
+            logger.warning(f"gzip 요청 본문 해제 실패: {str(e)}")
+            raise HTTPException(status_code=400, detail="gzip 요청 본문이 올바르지 않습니다.")
+        total += len(body)
+        if total > settings.request_max_decompressed_bytes or decompressor.unconsumed_tail:
+            raise HTTPException(status_code=413, detail="압축 해제된 요청 본문이 너무 큽니다.")
+        return {"type": "http.request", "body": body, "more_body": message.get("more_body", False)}
+        
+    return wrapped
+
+async def _plain_response(send, status: int, text: str):
+    body = text.encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+class CompressionMiddleware:
+    """응답 Brotli/GZip 압축 + gzip 요청 본문 해제 ASGI 미들웨어"""
+    
+    def __init__(self, app):
+        self.app = app
+        self.available = ("br", "gzip") if brotli is not None else ("gzip",)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+            
+        headers = Headers(scope=scope)
+        request_encoding = headers.get("content-encoding", "").strip().lower()
+        if request_encoding and request_encoding != "identity":
+            if request_encoding != "gzip":
+                await _plain_response(send, 415, f"지원하지 않는 요청 Content-Encoding입니다: {request_encoding} (gzip만 지원)")
+                return
+            # 풀린 본문 길이는 알 수 없으므로 content-length/content-encoding 헤더 제거
+            scope = dict(scope)
+            scope["headers"] = [
+                (name, value) for name, value in scope["headers"]
+                if name not in (b"content-encoding", b"content-length")
+            ]
+            receive = _decompressing_receive(receive)
+            
+        encoding = choose_encoding(headers.get("accept-encoding", ""), self.available) if settings.compression_enabled else None
+        await self.app(scope, receive, _CompressingSend(send, encoding) if encoding else send)
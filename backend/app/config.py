@@ -1,8 +1,11 @@
 """
 환경변수 기반 설정 파일
 """
+import logging
 import os
+from typing import Dict, List
 from dotenv import load_dotenv
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 # 프로젝트 루트의 .env 파일 로드 (간단한 절대경로)
@@ -10,14 +13,13 @@ import pathlib
 project_root = pathlib.Path(__file__).parent.parent.parent
 env_path = project_root / ".env"
 
+logger = logging.getLogger(__name__)
+
 # 🔥 기존 환경변수 무시하고 .env 파일 우선 적용
 load_dotenv(dotenv_path=str(env_path), override=True)
 
 # 디버깅: .env 파일 로드 확인
-print(f"🔍 .env 파일 경로: {env_path}")
-print(f"🔍 .env 파일 존재?: {env_path.exists()}")
-if env_path.exists():
-    print("✅ .env 파일이 override=True로 로드되었습니다")
+logger.debug(f".env 파일 경로: {env_path} (존재: {env_path.exists()}, override=True로 로드)")
 
 class Settings(BaseSettings):
     """애플리케이션 설정"""
@@ -30,15 +32,66 @@ class Settings(BaseSettings):
     azure_openai_model_1: str = "gpt-4o-eastus2" 
     azure_openai_embedding_model: str = "text-embedding-3-small-eastus2"
     
+    # LLM 게이트웨이 설정 (배포별 요청/토큰 한도, 재시도)
+    llm_requests_per_minute: int = 60  # 배포별 기본 분당 요청 수
+    llm_tokens_per_minute: int = 80000  # 배포별 기본 분당 토큰 수
+    llm_max_concurrency: int = 8  # 배포별 최대 동시 호출 수 (스로틀링 시 자동 감소)
+    llm_deployment_limits: Dict[str, Dict[str, int]] = {}  # 배포별 개별 한도 (JSON: {"배포명": {"requests_per_minute": .., "tokens_per_minute": .., "max_concurrency": ..}})
+    llm_max_retries: int = 5
+    llm_backoff_base_seconds: float = 1.0
+    llm_backoff_max_seconds: float = 30.0
+    llm_expected_output_tokens: int = 1000  # 토큰 버킷 예약 시 응답 토큰 추정치
+    llm_http_max_connections: int = 50  # 모든 LLM/STT 클라이언트가 공유하는 커넥션 풀 크기
+    llm_request_timeout_seconds: float = 120.0
+    
+    # 프롬프트 토큰 예산 설정 (엔드포인트별, 원문이 예산을 넘으면 정책에 따라 축소)
+    token_encoding_name: str = "o200k_base"  # gpt-4o 계열 토크나이저
+    prompt_token_budget_default: int = 12000
+    prompt_token_budgets: Dict[str, int] = {
+        "analyze_match": 12000,
+        "interview_analysis": 16000,
+        "integrated_analysis": 16000,
+        "rag_match": 8000  # 검색된 문서(context)가 추가로 붙으므로 더 작게
+    }
+    prompt_budget_default_policy: str = "compress"  # truncate (앞부분만 유지) | compress (추출식 압축)
+    prompt_budget_policies: Dict[str, str] = {}  # 엔드포인트별 정책 지정
+    
+    # 긴 면접 map-reduce 분석 설정
+    interview_map_reduce_threshold_tokens: int = 6000  # STT 결과가 이보다 길면 구간별 요약 후 평가
+    interview_window_tokens: int = 1500  # 질문/답변 구간 하나의 목표 크기
+    interview_map_concurrency: int = 8  # 구간 요약 동시 실행 수
+    
     # Azure AI Search 설정 (.env의 AZURE_AI_SEARCH_* 와 매핑)
     azure_ai_search_service_name: str = ""
     azure_ai_search_api_key: str = ""
     azure_ai_search_index_name: str = ""
+    indexer_debounce_ms: int = 500  # 업로드 후 이 시간 동안 들어온 인덱서 실행 요청을 한 번의 실행으로 병합
+    indexer_debounce_max_ms: int = 3000  # 요청이 계속 들어와도 첫 요청 후 이 시간 안에는 실행
+    indexer_conflict_retry_seconds: float = 5.0  # 이미 실행 중(409)인 인덱서 재실행 간격
+    indexer_conflict_max_retries: int = 6
+    indexer_trigger_wait_seconds: float = 60.0  # 요청한 실행이 끝나기를 기다리는 최대 시간
+    indexer_monitor_enabled: bool = True  # 인덱서 상태를 백그라운드에서 조회해 /indexer-status를 스냅샷으로 응답
+    indexer_monitor_active_seconds: float = 1.0  # 실행 중일 때 상태 조회 간격
+    indexer_monitor_idle_seconds: float = 30.0  # 실행 중인 인덱서가 없을 때 상태 조회 간격
+    indexer_monitor_active_window_seconds: float = 30.0  # 인덱서 실행 후 이 시간 동안은 실행 중 간격으로 조회
+    indexer_monitor_list_refresh_seconds: float = 300.0  # 인덱서 목록 재조회 간격
+    
+    # 문서 검색 백엔드 설정
+    search_backend: str = "azure"  # azure (Azure AI Search + Blob 인덱서) | local (업로드 시 내장 BM25/벡터 인덱스에 색인, 오프라인 검색)
+    local_search_dir: str = "./local_search_index"  # 로컬 검색 인덱스 저장 경로 (스냅샷 index.json + vectors.npy, 색인 로그 index.log.jsonl)
+    local_search_vector_dim: int = 512  # 해시 임베딩 차원 (바꾸면 기존 로컬 인덱스는 다시 색인 필요)
+    local_search_vector_weight: float = 0.3  # top-k 검색에서 벡터 유사도 가중치 (나머지는 BM25)
+    local_search_compact_min_records: int = 200  # 색인 로그가 이 건수를 넘으면 백그라운드에서 스냅샷으로 압축
     
     # Azure Storage 설정 (.env의 AZURE_STORAGE_* 와 매핑)
     azure_storage_account_name: str = ""
     azure_storage_account_key: str = ""
     azure_storage_container_name: str = ""
+    upload_dedupe_enabled: bool = True  # 같은 내용(SHA-256)의 파일이 이미 있으면 업로드/인덱싱 대기 생략
+    
+    # 파일 저장소 설정
+    storage_backend: str = "azure"  # azure (Blob Storage) | local (로컬 파일 시스템, 온프레미스/오프라인 배포용, Blob 인덱서를 쓸 수 없으므로 search_backend=local 필수)
+    local_storage_dir: str = "./local_storage"  # 로컬 저장소 경로 (컨테이너별 하위 디렉터리)
     
     # Azure Speech Service 설정 (.env의 AZURE_SPEECH_* 와 매핑)
     azure_speech_key: str = ""
@@ -57,10 +110,70 @@ class Settings(BaseSettings):
     
     # ChromaDB 설정 (.env의 CHROMA_* 와 매핑)
     chroma_persist_dir: str = "./chroma_db"
+    analysis_store_backend: str = "sqlite"  # 분석 결과 저장소: sqlite (FTS5 검색) | jsonl (JSON 스냅샷 + 로그)
+    chroma_group_commit_ms: int = 2  # 동시 저장을 한 번의 fsync로 묶기 위한 대기 시간
+    chroma_compact_min_records: int = 1000  # 로그가 이 건수를 넘으면 스냅샷으로 압축
+    chroma_compact_interval_seconds: int = 300  # 로그가 남아 있으면 이 주기로 압축
+    vector_search_enabled: bool = True  # 분석 결과 임베딩 + HNSW 의미 검색 사용 여부
+    vector_embedding_batch_size: int = 64  # 한 번의 임베딩 호출에 묶을 최대 문서 수
+    vector_embedding_batch_wait_ms: int = 200  # 배치를 채우기 위해 기다리는 최대 시간
+    vector_embedding_max_retries: int = 5  # 임베딩 실패 시 문서별 재시도 횟수 (넘기면 다음 재색인 때 다시 시도)
+    vector_embedding_retry_base_seconds: float = 2.0  # 재시도 백오프 시작 간격 (실패할 때마다 2배)
+    vector_embedding_retry_max_seconds: float = 60.0
+    chroma_server_host: str = ""  # 지정 시 로컬 인덱스 대신 ChromaDB 서버 사용 (미설정 상태로 워커를 여러 개 띄우면 벡터 검색은 꺼짐)
+    chroma_server_port: int = 8000
+    sqlite_busy_timeout_seconds: float = 10.0  # 다른 프로세스가 쓰는 중일 때 잠금 대기 시간
+    
+    # 일괄 심사 설정
+    batch_analysis_concurrency: int = 4  # 기본 동시 분석 수
+    batch_analysis_max_concurrency: int = 16  # 요청으로 지정 가능한 최대 동시 분석 수
+    
+    # RAG 질의응답 설정
+    rag_max_concurrency: int = 4  # 여러 질문을 한 번에 보낼 때 최대 동시 답변 수
+    retriever_cache_enabled: bool = True  # 같은 질의(정규화)의 검색 결과를 인덱스가 바뀔 때까지 재사용
+    retriever_cache_ttl_seconds: float = 300.0  # 검색 결과 보관 시간 (다른 워커/포털에서 색인된 문서는 이 시간 후 반영)
+    retriever_cache_max_entries: int = 256
+    
+    # 중복 요청 설정
+    single_flight_enabled: bool = True  # 진행 중인 동일 분석 요청(정규화한 입력이 같음)은 한 번만 실행하고 결과 공유
+    
+    # 요청 추적 설정
+    server_timing_enabled: bool = True  # 응답에 Server-Timing 헤더(단계별 소요 시간) 추가
+    trace_export_file: str = ""  # 지정 시 요청별 트레이스를 OTLP JSON Lines로 저장 (예: ./traces.jsonl)
+    
+    # HTTP 압축 설정
+    compression_enabled: bool = True  # API 응답 Brotli/GZip 압축
+    compression_min_bytes: int = 1024  # 이보다 작은 응답은 압축하지 않음
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4  # 동적 압축용 (정적 파일은 빌드 시 최고 압축률로 미리 압축)
+    request_max_decompressed_bytes: int = 50 * 1024 * 1024  # gzip 요청 본문의 최대 해제 크기
+    
+    # HTTP 캐시 설정 (ETag / 조건부 GET)
+    blob_inventory_ttl_seconds: float = 10.0  # Blob 목록 캐시 유지 시간 (다른 워커/포털에서 바뀐 내용은 이 시간 안에 반영)
+    saved_result_max_age_seconds: int = 300  # 저장된 분석 결과의 브라우저 캐시 시간 (이후 ETag로 재검증)
+    
+    # 시작 시간 설정
+    preload_services_on_startup: bool = True  # 서버 시작 직후 백그라운드에서 Azure/LLM 서비스 미리 초기화 (끄면 첫 요청 시 초기화)
+    startup_import_budget_ms: int = 2500  # app.main import 시간 한도 (tests/test_startup_time.py, `python -m benchmarks.import_profile --check`)
     
     # 기타 설정
+    web_concurrency: int = 1  # 워커 프로세스 수 (uvicorn --workers 기본값과 같은 WEB_CONCURRENCY 환경변수)
     debug: bool = False
     log_level: str = "info"
+    log_format: str = "text"  # text | json (한 줄 JSON 구조화 로그)
+    log_sample_rate: float = 0.1  # 검색 결과별 같은 반복 디버그 로그의 출력 비율
+    
+    @model_validator(mode="after")
+    def _check_backends(self):
+        # Blob 인덱서는 로컬 파일을 볼 수 없으므로 업로드한 문서가 영영 검색되지 않음
+        if self.storage_backend == "local" and self.search_backend != "local":
+            raise ValueError("storage_backend=local은 search_backend=local과 함께 사용해야 합니다 (Azure Blob 인덱서는 로컬 파일을 색인할 수 없음)")
+        # 로컬 ChromaDB 인덱스는 워커끼리 공유할 수 없으므로 서버가 없으면 벡터 검색만 끄고 여러 워커로 실행
+        # (분석 결과 저장은 프로세스 간 안전, 빠진 벡터는 단일 프로세스/서버 모드에서 reindex_vectors()로 채움)
+        if self.web_concurrency > 1 and self.vector_search_enabled and not self.chroma_server_host:
+            logger.warning(f"워커 {self.web_concurrency}개: chroma_server_host가 없어 벡터 검색을 끕니다 (키워드 검색만 사용)")
+            self.vector_search_enabled = False
+        return self
     
     class Config:
         # 프로젝트 루트의 .env 파일 경로 설정
@@ -74,15 +187,30 @@ class Settings(BaseSettings):
 # 전역 설정 인스턴스
 settings = Settings()
 
-# 🔍 디버깅: 실제 로드된 값들 확인
-print("=" * 50)
-print("🔍 settings 인스턴스에 로드된 실제 값들:")
-print(f"azure_openai_endpoint: {settings.azure_openai_endpoint}")
-print(f"azure_openai_deployment_name: {settings.azure_openai_deployment_name}")
-print(f"azure_openai_api_version: {settings.azure_openai_api_version}")
-print(f"azure_ai_search_service_name: {settings.azure_ai_search_service_name}")
-print(f"azure_storage_account_name: {settings.azure_storage_account_name}")
-print(f"azureopenai_endpoint: {settings.azureopenai_endpoint}")
-print(f"azureopenai_key: {settings.azureopenai_key[:20]}..." if settings.azureopenai_key else "azureopenai_key: (비어있음)")
-print(f"azureopenai_api_version: {settings.azureopenai_api_version}")
-print("=" * 50) 
\ No newline at end of file
+def single_process_reasons() -> List[str]:
+    """
+    워커 프로세스를 여러 개 띄우면 안 되는 이유 (프로세스 메모리에만 있는 상태를 쓰는 설정)
+    
+    분석 결과 저장소(sqlite/jsonl)와 로컬 파일 저장소는 프로세스 간 안전하지만,
+    아래 인덱스는 프로세스마다 따로 메모리에 올려 두고 파일을 통째로 덮어쓰므로 워커끼리 서로의 변경을 잃습니다.
+    (web_concurrency > 1이면 로컬 ChromaDB 벡터 인덱스는 설정 검증에서 꺼지므로 로컬 검색 인덱스만 남음)
+    (인덱서 실행 병합, Blob 목록 캐시도 워커별이지만 409 재시도/캐시 TTL로 정확성에는 문제가 없습니다)
+    """
+    reasons = []
+    if settings.vector_search_enabled and not settings.chroma_server_host:
+        reasons.append("로컬 ChromaDB 벡터 인덱스 (chroma_server_host 미설정)")
+    if settings.search_backend == "local":
+        reasons.append("로컬 검색 인덱스 (search_backend=local)")
+    return reasons
+
+# 🔍 디버깅: 실제 로드된 값들 확인 (키 값은 기록하지 않고 설정 여부만 표시)
+logger.debug(
+    f"설정 로드 완료: azure_openai_endpoint={settings.azure_openai_endpoint}, "
+    f"azure_openai_deployment_name={settings.azure_openai_deployment_name}, "
+    f"azure_openai_api_version={settings.azure_openai_api_version}, "
+    f"azure_ai_search_service_name={settings.azure_ai_search_service_name}, "
+    f"azure_storage_account_name={settings.azure_storage_account_name}, "
+    f"azureopenai_endpoint={settings.azureopenai_endpoint}, "
+    f"azureopenai_key={'설정됨' if settings.azureopenai_key else '(비어있음)'}, "
+    f"azureopenai_api_version={settings.azureopenai_api_version}"
+)
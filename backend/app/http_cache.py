@@ -0,0 +1,54 @@
+"""
+ETag / 조건부 GET 도우미
+
+라우터는 응답 본문을 만들기 전에 if_none_match()로 클라이언트가 가진 버전과 비교하고,
+같으면 not_modified()로 본문 없는 304를 돌려줍니다.
+CompressionMiddleware가 압축 응답의 ETag에 인코딩 접미사(-br, -gzip)를 붙이므로 비교할 때는 접미사를 무시합니다.
+"""
+import re
+from typing import Optional
+from fastapi import Request, Response
+from .config import settings
+
+# 목록은 자주 바뀌므로 매번 재검증 (변경이 없으면 304라 비용이 작음)
+LISTING_CACHE_CONTROL = "private, no-cache"
+
+_ENCODING_SUFFIX = re.compile(r"-(br|gzip)\"$")
+
+def saved_result_cache_control() -> str:
+    """저장된 분석 결과는 잘 바뀌지 않으므로 잠시 캐시 후 재검증"""
+    return f"private, max-age={settings.saved_result_max_age_seconds}"
+
+def _opaque_tag(tag: str) -> str:
+    """약한 ETag 표시(W/)와 압축 인코딩 접미사를 제거한 비교용 값"""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    return _ENCODING_SUFFIX.sub('"', tag)
+
+def if_none_match(request: Request, etag: Optional[str]) -> bool:
+    """If-None-Match가 현재 ETag와 일치하는지 (일치하면 304로 응답 가능)"""
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    current = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == current for tag in header.split(","))
+
+def requested_etag(request: Request) -> Optional[str]:
+    """If-None-Match의 첫 ETag를 비교용 값으로 (없거나 '*'이면 None, 원본 저장소의 조건부 요청에 전달할 때 사용)"""
+    header = request.headers.get("if-none-match", "").strip()
+    if not header or header == "*":
+        return None
+    return _opaque_tag(header.split(",")[0])
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """본문 없는 304 응답"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def set_cache_headers(response: Response, etag: Optional[str], cache_control: str):
+    """200 응답에 ETag / Cache-Control 헤더 설정"""
+    if etag:
+        response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
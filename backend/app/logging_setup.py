@@ -0,0 +1,124 @@
+"""
+로깅 설정 (구조화 로그 + 큐 기반 비동기 출력)
+
+- 요청 스레드는 QueueHandler로 레코드를 큐에 넣기만 하고, 실제 출력은 QueueListener 스레드가 담당
+- log_format=json이면 한 줄에 하나의 JSON 객체 (시간, 레벨, 로거, 메시지, 트레이스 ID, 추가 필드)
+- extra=SAMPLED로 남긴 결과별 디버그 로그는 log_sample_rate 비율만 출력
+- API 키 등 설정된 비밀 값이 메시지에 포함되면 마스킹
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from typing import Optional
+from .config import settings
+
+# 검색 결과 하나하나 같은 반복 디버그 로그에 붙이는 extra (샘플링 대상)
+SAMPLED = {"sampled": True}
+
+# LogRecord 기본 속성 (JSON 출력 시 extra 필드만 골라내기 위함)
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class SamplingFilter(logging.Filter):
+    """sampled=True인 레코드는 log_sample_rate 비율만 통과"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampled", False):
+            return random.random() < settings.log_sample_rate
+        return True
+
+class RedactingFilter(logging.Filter):
+    """메시지에 포함된 비밀 값(API 키 등)을 마스킹"""
+    
+    SECRET_FIELDS = (
+        "azure_openai_api_key",
+        "azure_ai_search_api_key",
+        "azure_storage_account_key",
+        "azure_speech_key",
+        "azureopenai_key",
+        "azure_form_key",
+    )
+    
+    def __init__(self):
+        super().__init__()
+        self.secrets = [
+            value for value in (getattr(settings, field, "") for field in self.SECRET_FIELDS)
+            if value and len(value) >= 8
+        ]
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.secrets:
+            message = record.getMessage()
+            redacted = message
+            for secret in self.secrets:
+                redacted = redacted.replace(secret, "***")
+            if redacted != message:
+                record.msg, record.args = redacted, None
+        return True
+
+class ContextFilter(logging.Filter):
+    """요청 추적 ID를 레코드에 추가 (요청 스레드에서 실행되어야 하므로 QueueHandler에 부착)"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        from .services.tracing import current_trace_id
+        record.trace_id = current_trace_id()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 포맷터"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key != "sampled" and value is not None:
+                entry[key] = value if isinstance(value, (str, int, float, bool)) else str(value)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def setup_logging():
+    """루트 로거를 큐 기반 핸들러로 구성 (여러 번 호출해도 한 번만 적용)"""
+    global _listener
+    if _listener is not None:
+        return
+        
+    if settings.log_format == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(formatter)
+    
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # 필터는 요청 스레드에서 실행 (샘플링으로 버릴 레코드는 큐에 넣지도 않음)
+    queue_handler.addFilter(SamplingFilter())
+    queue_handler.addFilter(RedactingFilter())
+    queue_handler.addFilter(ContextFilter())
+    
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.log_level.upper())
+    
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 출력하고 리스너 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
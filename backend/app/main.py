@@ -3,17 +3,22 @@ FastAPI 메인 애플리케이션
 """
 import logging
 import os
-from fastapi import FastAPI, HTTPException
+import threading
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from .config import settings, single_process_reasons
+from .logging_setup import setup_logging, shutdown_logging
+from .compression import CompressionMiddleware, PrecompressedStaticFiles
+from .serialization import ORJSONResponse
+
+# 로깅 설정 (서비스 모듈이 import 시점에 남기는 로그도 큐 핸들러로 가도록 라우터보다 먼저 설정)
+setup_logging()
+
 from .routers import document_api, interview_api
-from .config import settings
+from .services.metrics import MetricsMiddleware, metrics_payload
+from .services.tracing import TracingMiddleware
+from .services.lazy import preload_services
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # FastAPI 앱 생성
@@ -22,7 +27,8 @@ app = FastAPI(
     description="신입사원 면접 분석 및 평가 보조 시스템",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse  # orjson 직렬화 (라우터는 Accept에 따라 MessagePack도 지원)
 )
 
 # CORS 설정 (React 프론트엔드와 통신을 위해)
@@ -42,11 +48,26 @@ app.add_middleware(
 app.include_router(document_api.router, prefix="/api")
 app.include_router(interview_api.router, prefix="/api")
 
+# 응답 Brotli/GZip 압축 + gzip 요청 본문 해제 (정적 파일의 사전 압축본은 그대로 통과)
+app.add_middleware(CompressionMiddleware)
+
+# Prometheus 메트릭 (정적 파일 마운트("/")보다 먼저 등록해야 가려지지 않음)
+app.add_middleware(MetricsMiddleware)
+
+# 요청별 단계 추적 (Server-Timing 헤더, 선택적으로 OTLP JSON 트레이스 파일)
+app.add_middleware(TracingMiddleware)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 메트릭 엔드포인트"""
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
+
 # 프론트엔드 정적 파일 서빙 설정
 frontend_dist_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "UI", "dist")
 if os.path.exists(frontend_dist_path):
     logger.info(f"프론트엔드 정적 파일 경로: {frontend_dist_path}")
-    app.mount("/", StaticFiles(directory=frontend_dist_path, html=True), name="static")
+    app.mount("/", PrecompressedStaticFiles(directory=frontend_dist_path, html=True), name="static")
 else:
     logger.warning(f"프론트엔드 빌드 파일을 찾을 수 없음: {frontend_dist_path}")
 
@@ -81,11 +102,31 @@ async def startup_event():
     logger.info("KT DS 면접 분석 시스템 시작")
     logger.info(f"Azure OpenAI 설정: {bool(settings.azure_openai_api_key)}")
     logger.info(f"ChromaDB 디렉토리: {settings.chroma_persist_dir}")
+    
+    # 워커가 여러 개면 (startup.sh는 이 경우 워커를 1개로 줄여서 실행, 로컬 벡터 인덱스는 설정 검증에서 꺼짐)
+    reasons = single_process_reasons()
+    if settings.web_concurrency > 1 and reasons:
+        logger.warning(f"워커 {settings.web_concurrency}개로 실행 중이지만 단일 프로세스 전용 설정을 사용합니다: {', '.join(reasons)}")
+    logger.info(f"벡터 검색: {'사용' if settings.vector_search_enabled else '사용 안 함'} (ChromaDB 서버: {settings.chroma_server_host or '없음'})")
+    
+    # 무거운 서비스 초기화는 요청 처리를 막지 않도록 백그라운드에서 (완료 전 요청은 초기화를 기다림)
+    if settings.preload_services_on_startup:
+        threading.Thread(target=preload_services, name="service-preload", daemon=True).start()
+    
+    # 인덱서 상태 모니터 (첫 조회도 백그라운드에서, search_backend=local이면 인덱서가 없으므로 시작하지 않음)
+    from .services.indexer_monitor import indexer_monitor, monitor_enabled
+    if monitor_enabled():
+        indexer_monitor.ensure_started()
 
 # 애플리케이션 종료시 실행되는 이벤트
 @app.on_event("shutdown")
 async def shutdown_event():
     """애플리케이션 종료시 실행"""
     logger.info("KT DS 면접 분석 시스템 종료")
+    from .services.indexer_monitor import indexer_monitor
+    indexer_monitor.stop()
+    from .services.tracing import shutdown_tracing
+    shutdown_tracing()
+    shutdown_logging()
 
 # Force redeploy - ensure all backend files are properly deployed to Azure 
\ No newline at end of file
@@ -1,8 +1,8 @@
 """
 Pydantic 스키마 모델 정의
 """
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field
 
 class InterviewRequest(BaseModel):
     """면접 분석 요청 모델"""
@@ -20,8 +20,128 @@ class AnalyzeResult(BaseModel):
     summary: str = Field(..., description="평가 요약")
     strengths: str = Field(..., description="강점")
     weaknesses: str = Field(..., description="약점")
-    
+
 class ErrorResponse(BaseModel):
     """에러 응답 모델"""
     error: str = Field(..., description="에러 메시지")
-    detail: Optional[str] = Field(None, description="상세 에러 정보") 
\ No newline at end of file
+    detail: Optional[str] = Field(None, description="상세 에러 정보")
+
+# API 응답 모델
+# 주요 필드만 선언하고 나머지는 그대로 전달 (extra="allow"), 반환하지 않은 선언 필드는 응답에서 생략 (NegotiatedRoute)
+
+class ApiResponse(BaseModel):
+    """API 공통 응답 (성공/오류 모두 status, message 사용)"""
+    model_config = ConfigDict(extra="allow")
+    
+    status: str = Field(..., description="success | error")
+    message: Optional[str] = Field(None, description="결과 또는 오류 메시지")
+
+class UploadResponse(ApiResponse):
+    """파일 업로드 결과"""
+    filename: Optional[str] = Field(None, description="저장된 Blob 이름 (prefix 포함)")
+    deduplicated: Optional[bool] = Field(None, description="같은 내용이 이미 있어 업로드를 생략했는지")
+
+class UploadBothResponse(ApiResponse):
+    """이력서 + 채용공고 동시 업로드 결과"""
+    resume_upload: Optional[UploadResponse] = None
+    job_upload: Optional[UploadResponse] = None
+
+class MatchAnalysisResponse(ApiResponse):
+    """이력서-채용공고 적합도 분석 결과"""
+    analysis: Optional[str] = Field(None, description="분석 결과 (마크다운)")
+    scores: Optional[Dict[str, Optional[int]]] = Field(None, description="항목별 점수 (0~100)")
+    token_usage: Optional[Dict[str, Any]] = Field(None, description="프롬프트/응답 토큰 사용량")
+
+class IndexInfo(BaseModel):
+    """인덱스 재발견 결과"""
+    old_index: Optional[str] = None
+    new_index: Optional[str] = None
+    index_changed: bool = False
+
+class UploadAndAnalyzeResponse(ApiResponse):
+    """업로드 + 인덱싱 + 분석 올인원 결과"""
+    mode: Optional[str] = None
+    deduplicated: Optional[bool] = Field(None, description="두 파일 모두 기존과 같아 인덱서 실행/인덱싱 대기를 생략했는지")
+    upload_results: Optional[Dict[str, UploadResponse]] = None
+    indexer_result: Optional[Dict[str, Any]] = None
+    index_info: Optional[IndexInfo] = None
+    indexing_status: Optional[Dict[str, Any]] = None
+    analysis_result: Optional[MatchAnalysisResponse] = None
+
+class LeaderboardResponse(ApiResponse):
+    """채용공고별 지원자 순위"""
+    job_filename: Optional[str] = None
+    sort_by: Optional[str] = None
+    total: Optional[int] = None
+    candidates: Optional[List[Dict[str, Any]]] = None
+
+class FileInfo(BaseModel):
+    """Blob 파일 정보"""
+    model_config = ConfigDict(extra="allow")
+    
+    name: str
+    size: Optional[int] = None
+    last_modified: Optional[str] = Field(None, description="ISO 8601 수정 시각")
+    display_name: Optional[str] = Field(None, description="prefix를 제거한 표시용 파일명")
+
+class FilesListResponse(ApiResponse):
+    """Blob 파일 목록"""
+    resume_files: Optional[List[FileInfo]] = None
+    job_files: Optional[List[FileInfo]] = None
+    files: Optional[List[FileInfo]] = None
+    total_files: Optional[int] = None
+
+class IndexerResponse(ApiResponse):
+    """인덱서 실행/상태 결과"""
+    indexers: Optional[List[Dict[str, Any]]] = None
+
+class IntegratedAnalysisResponse(ApiResponse):
+    """문서 + 면접 통합 분석 결과"""
+    analysis_type: Optional[str] = None
+    input_summary: Optional[Dict[str, Any]] = None
+    integrated_analysis: Optional[str] = Field(None, description="최종 종합 평가 (마크다운)")
+    token_usage: Optional[Dict[str, Any]] = None
+
+class SavedResultResponse(ApiResponse):
+    """분석 결과 저장/불러오기/삭제 결과"""
+    filename: Optional[str] = None
+    saved_at: Optional[str] = None
+    file_size: Optional[int] = None
+    data: Optional[Dict[str, Any]] = Field(None, description="저장된 분석 결과 (불러오기)")
+    loaded_at: Optional[str] = None
+    deleted_at: Optional[str] = None
+
+class SavedResultsListResponse(ApiResponse):
+    """저장된 분석 결과 목록"""
+    total_results: Optional[int] = None
+    results: Optional[List[Dict[str, Any]]] = None
+
+class TranscriptionResponse(ApiResponse):
+    """STT 결과"""
+    transcription: Optional[str] = None
+    filename: Optional[str] = None
+    text_length: Optional[int] = None
+
+class UploadTranscribeResponse(TranscriptionResponse):
+    """업로드 + STT 결과"""
+    upload_result: Optional[UploadResponse] = None
+    transcribe_result: Optional[TranscriptionResponse] = None
+
+class InterviewAnalysisResponse(MatchAnalysisResponse):
+    """면접 내용 분석 결과"""
+    text_length: Optional[int] = None
+    analysis_mode: Optional[str] = Field(None, description="single | map_reduce")
+    window_count: Optional[int] = None
+
+class FullInterviewAnalysisResponse(ApiResponse):
+    """면접 업로드 + STT + 분석 올인원 결과"""
+    upload_transcribe_result: Optional[UploadTranscribeResponse] = None
+    analysis_result: Optional[InterviewAnalysisResponse] = None
+    filename: Optional[str] = None
+    transcription: Optional[str] = None
+    analysis: Optional[str] = None
+
+class InterviewFilesResponse(ApiResponse):
+    """면접 녹음 파일 목록"""
+    interview_files: Optional[List[FileInfo]] = None
+    total_files: Optional[int] = None
@@ -1,23 +1,57 @@
 """
 문서 분석 API 라우터 - 파일 업로드 및 분석
 """
+import asyncio
 import logging
 import datetime
 import json
-from fastapi import APIRouter, HTTPException, status, UploadFile, File
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from ..models import (
+    ApiResponse,
+    FilesListResponse,
+    IndexerResponse,
+    IntegratedAnalysisResponse,
+    LeaderboardResponse,
+    MatchAnalysisResponse,
+    SavedResultResponse,
+    SavedResultsListResponse,
+    UploadAndAnalyzeResponse,
+    UploadBothResponse,
+    UploadResponse
+)
+from ..config import settings
+from ..http_cache import LISTING_CACHE_CONTROL, if_none_match, not_modified, requested_etag, saved_result_cache_control, set_cache_headers
+from ..serialization import NegotiatedRoute
 from ..services.document_analyzer import (
     upload_resume_file, 
     upload_job_posting_file, 
     analyze_candidate_match,
     document_analyzer,
-    get_storage_files_list
+    get_storage_files_list,
+    read_resume,
+    find_job_posting,
+    wait_for_file_indexing,
+    extract_overall_score,
+    DocumentNotFound,
+    LOCAL_INDEXER_RESULT
 )
+from ..services.token_budget import token_budget_manager
+from ..services.leaderboard import leaderboard_service
+from ..services.blob_inventory import blob_inventory
+from ..services.storage_backend import StorageNotModified, StorageObjectNotFound
+from ..services.single_flight import single_flight
+from ..services.indexer_trigger import indexer_trigger
+from ..services.indexer_monitor import indexer_monitor
 
 logger = logging.getLogger(__name__)
 
 # 라우터 생성
 router = APIRouter(
+    route_class=NegotiatedRoute,
     prefix="/document",
     tags=["문서분석"],
     responses={
@@ -26,7 +60,7 @@ router = APIRouter(
     }
 )
 
-@router.post("/upload-resume")
+@router.post("/upload-resume", response_model=UploadResponse)
 async def upload_resume_api(file: UploadFile = File(...)):
     """
     이력서 파일 업로드 (1단계)
@@ -57,7 +91,7 @@ async def upload_resume_api(file: UploadFile = File(...)):
             detail=f"이력서 업로드 실패: {str(e)}"
         )
 
-@router.post("/upload-job")
+@router.post("/upload-job", response_model=UploadResponse)
 async def upload_job_posting_api(file: UploadFile = File(...)):
     """
     채용공고 파일 업로드 (1단계)
@@ -92,7 +126,7 @@ class AnalyzeFilesRequest(BaseModel):
     resume_filename: str
     job_filename: str
 
-@router.post("/analyze-files")
+@router.post("/analyze-files", response_model=MatchAnalysisResponse)
 async def analyze_files_api(request: AnalyzeFilesRequest):
     """
     업로드된 파일들로 분석 실행 (2단계)
@@ -106,8 +140,11 @@ async def analyze_files_api(request: AnalyzeFilesRequest):
     try:
         logger.info(f"파일 분석 요청: {request.resume_filename} vs {request.job_filename}")
         
-        # 파일 기반 분석 실행
-        result = analyze_candidate_match(request.resume_filename, request.job_filename)
+        # 파일 기반 분석 실행 (같은 파일 쌍의 분석이 진행 중이면 그 결과를 공유)
+        result = await single_flight.run(
+            "analyze_files", (request.resume_filename, request.job_filename),
+            analyze_candidate_match, request.resume_filename, request.job_filename
+        )
         
         logger.info("파일 분석 완료")
         return result
@@ -123,7 +160,7 @@ class AnalyzeTextRequest(BaseModel):
     resume_text: str
     job_posting_text: str
 
-@router.post("/analyze-text")
+@router.post("/analyze-text", response_model=MatchAnalysisResponse)
 async def analyze_text_api(request: AnalyzeTextRequest):
     """
     직접 텍스트로 분석 (파일 없이)
@@ -150,7 +187,7 @@ async def analyze_text_api(request: AnalyzeTextRequest):
             detail=f"텍스트 분석 실패: {str(e)}"
         )
 
-@router.post("/upload-both")
+@router.post("/upload-both", response_model=UploadBothResponse)
 async def upload_both_files_api(
     resume_file: UploadFile = File(...),
     job_file: UploadFile = File(...)
@@ -194,7 +231,7 @@ async def upload_both_files_api(
             detail=f"동시 업로드 실패: {str(e)}"
         )
 
-@router.post("/upload-and-analyze")
+@router.post("/upload-and-analyze", response_model=UploadAndAnalyzeResponse)
 async def upload_and_analyze_api(
     resume_file: UploadFile = File(...),
     job_file: UploadFile = File(...)
@@ -220,8 +257,8 @@ async def upload_and_analyze_api(
         
         # 1단계: 업로드
         logger.info("📤 1단계: 파일 업로드 중...")
-        resume_upload = upload_resume_file(resume_content, resume_filename)
-        job_upload = upload_job_posting_file(job_content, job_filename)
+        resume_upload = await run_in_threadpool(upload_resume_file, resume_content, resume_filename)
+        job_upload = await run_in_threadpool(upload_job_posting_file, job_content, job_filename)
         
         if resume_upload["status"] != "success" or job_upload["status"] != "success":
             return {
@@ -231,49 +268,58 @@ async def upload_and_analyze_api(
                 "job_upload": job_upload
             }
         
-        # 2단계: 인덱서 즉시 실행 (시연용 최적화)
-        logger.info("⚡ 2단계: 인덱서 즉시 실행 중...")
-        indexer_result = document_analyzer.run_indexer()
-        logger.info(f"   인덱서 실행 결과: {indexer_result.get('status', 'unknown')}")
-        
-        # 3단계: 인덱스 재발견 (새로운 인덱스가 생성될 수 있음)
-        logger.info("🔍 3단계: 최신 인덱스 재발견 중...")
-        old_index = document_analyzer.index_name
-        document_analyzer.index_name = document_analyzer._get_active_index_name()
-        
-        # 검색 클라이언트도 새로운 인덱스로 업데이트
-        from azure.search.documents import SearchClient
-        document_analyzer.search_client = SearchClient(
-            endpoint=document_analyzer.search_endpoint,
-            index_name=document_analyzer.index_name,
-            credential=document_analyzer.search_credential
-        )
-        
-        if old_index != document_analyzer.index_name:
-            logger.info(f"   인덱스 변경: {old_index} → {document_analyzer.index_name}")
+        # 두 파일 모두 이미 같은 내용으로 저장되어 있으면 Blob이 바뀌지 않았으므로 인덱서 실행/인덱싱 대기 생략
+        deduplicated = bool(resume_upload.get("deduplicated") and job_upload.get("deduplicated"))
+        if deduplicated or document_analyzer.search_backend.indexes_on_upload:
+            logger.info(f"⏭️ 2~4단계 생략: {'두 파일 모두 기존과 같은 내용' if deduplicated else '업로드 시 검색 인덱스에 색인됨'}")
+            indexer_result = {
+                "status": "skipped",
+                "message": "변경된 파일이 없어 인덱서를 실행하지 않았습니다." if deduplicated else "로컬 검색 인덱스는 업로드 시 바로 색인되어 인덱서를 실행하지 않았습니다."
+            }
+            old_index = document_analyzer.index_name
+            resume_indexed = job_indexed = True
         else:
-            logger.info(f"   기존 인덱스 유지: {document_analyzer.index_name}")
-        
-        # 4단계: 인덱싱 완료 대기
-        logger.info("⏳ 4단계: 인덱싱 완료 대기 중...")
-        from ..services.document_analyzer import wait_for_file_indexing
-        import time
-        
-        # 각 파일의 인덱싱 완료 대기 (시연용: 최대 30초)
-        resume_indexed = wait_for_file_indexing(f"resume_{resume_filename}", 30)
-        job_indexed = wait_for_file_indexing(f"job_{job_filename}", 30)
-        
-        logger.info(f"   인덱싱 상태 - 이력서: {resume_indexed}, 채용공고: {job_indexed}")
+            # 2단계: 인덱서 실행 (동시에 들어온 업로드와 병합된 실행의 결과를 기다림)
+            logger.info("⚡ 2단계: 인덱서 실행 중...")
+            generation = indexer_trigger.request_run(resume_upload["filename"], job_upload["filename"])
+            indexer_result = await run_in_threadpool(indexer_trigger.wait, generation)
+            logger.info(f"   인덱서 실행 결과: {indexer_result.get('status', 'unknown')}")
+            
+            # 인덱서 실행이 끝날 때까지 대기 (상태 모니터가 완료를 알려줌, 검색 폴링은 그 뒤에 확인용으로만)
+            # (실행을 시작한 인덱서가 없으면 기다리지 않고 4단계 검색 확인으로 넘어감)
+            started_indexers = indexer_trigger.started_indexers(indexer_result)
+            if indexer_result.get("started_at") and started_indexers:
+                run_finished = await run_in_threadpool(indexer_monitor.wait_for_run, indexer_result["started_at"], settings.indexer_trigger_wait_seconds, started_indexers)
+                logger.info(f"   인덱서 실행 완료: {run_finished}")
+            
+            # 3단계: 인덱스 재발견 (새로운 인덱스가 생성될 수 있음)
+            logger.info("🔍 3단계: 최신 인덱스 재발견 중...")
+            # 인덱스가 바뀐 경우에만 검색 클라이언트 교체
+            old_index = await run_in_threadpool(document_analyzer.refresh_index)
+            
+            if old_index != document_analyzer.index_name:
+                logger.info(f"   인덱스 변경: {old_index} → {document_analyzer.index_name}")
+            else:
+                logger.info(f"   기존 인덱스 유지: {document_analyzer.index_name}")
+            
+            # 4단계: 인덱싱 완료 대기
+            logger.info("⏳ 4단계: 인덱싱 완료 대기 중...")
+            # 각 파일의 인덱싱 완료 대기 (시연용: 최대 30초)
+            resume_indexed = bool(resume_upload.get("deduplicated")) or await run_in_threadpool(wait_for_file_indexing, f"resume_{resume_filename}", 30)
+            job_indexed = bool(job_upload.get("deduplicated")) or await run_in_threadpool(wait_for_file_indexing, f"job_{job_filename}", 30)
+            
+            logger.info(f"   인덱싱 상태 - 이력서: {resume_indexed}, 채용공고: {job_indexed}")
         
         # 5단계: 분석 실행 (인덱싱 상태와 관계없이 시도)
         logger.info("📊 5단계: 분석 실행 중...")
         if not resume_indexed or not job_indexed:
             logger.warning("⚠️ 인덱싱 미완료 상태에서 분석 시도...")
             
-        analysis_result = analyze_candidate_match(resume_filename, job_filename)
+        analysis_result = await run_in_threadpool(analyze_candidate_match, resume_filename, job_filename)
         
         result = {
             "status": "success",
+            "deduplicated": deduplicated,
             "upload_results": {
                 "resume_upload": resume_upload,
                 "job_upload": job_upload
@@ -301,7 +347,7 @@ async def upload_and_analyze_api(
             detail=f"업로드+분석 실패: {str(e)}"
         )
 
-@router.post("/upload-and-analyze-fast")
+@router.post("/upload-and-analyze-fast", response_model=UploadAndAnalyzeResponse)
 async def upload_and_analyze_fast_api(
     resume_file: UploadFile = File(...),
     job_file: UploadFile = File(...)
@@ -328,8 +374,8 @@ async def upload_and_analyze_fast_api(
         
         # 1단계: 업로드
         logger.info("📤 1단계: 파일 업로드 중...")
-        resume_upload = upload_resume_file(resume_content, resume_filename)
-        job_upload = upload_job_posting_file(job_content, job_filename)
+        resume_upload = await run_in_threadpool(upload_resume_file, resume_content, resume_filename)
+        job_upload = await run_in_threadpool(upload_job_posting_file, job_content, job_filename)
         
         if resume_upload["status"] != "success" or job_upload["status"] != "success":
             return {
@@ -339,46 +385,55 @@ async def upload_and_analyze_fast_api(
                 "job_upload": job_upload
             }
         
-        # 2단계: 인덱서 즉시 실행
-        logger.info("⚡ 2단계: 인덱서 실행 중...")
-        indexer_result = document_analyzer.run_indexer()
-        logger.info(f"   인덱서 실행 결과: {indexer_result.get('status', 'unknown')}")
-        
-        # 3단계: 인덱스 재발견
-        logger.info("🔍 3단계: 최신 인덱스 재발견 중...")
-        old_index = document_analyzer.index_name
-        document_analyzer.index_name = document_analyzer._get_active_index_name()
-        
-        # 검색 클라이언트 업데이트
-        from azure.search.documents import SearchClient
-        document_analyzer.search_client = SearchClient(
-            endpoint=document_analyzer.search_endpoint,
-            index_name=document_analyzer.index_name,
-            credential=document_analyzer.search_credential
-        )
-        
-        if old_index != document_analyzer.index_name:
-            logger.info(f"   인덱스 변경: {old_index} → {document_analyzer.index_name}")
+        # 두 파일 모두 이미 같은 내용으로 저장되어 있으면 Blob이 바뀌지 않았으므로 인덱서 실행/인덱싱 대기 생략
+        deduplicated = bool(resume_upload.get("deduplicated") and job_upload.get("deduplicated"))
+        if deduplicated or document_analyzer.search_backend.indexes_on_upload:
+            logger.info(f"⏭️ 2~4단계 생략: {'두 파일 모두 기존과 같은 내용' if deduplicated else '업로드 시 검색 인덱스에 색인됨'}")
+            indexer_result = {
+                "status": "skipped",
+                "message": "변경된 파일이 없어 인덱서를 실행하지 않았습니다." if deduplicated else "로컬 검색 인덱스는 업로드 시 바로 색인되어 인덱서를 실행하지 않았습니다."
+            }
+            old_index = document_analyzer.index_name
+            resume_indexed = job_indexed = True
         else:
-            logger.info(f"   기존 인덱스 유지: {document_analyzer.index_name}")
-        
-        # 4단계: 짧은 인덱싱 대기 (시연용: 최대 10초)
-        logger.info("⏳ 4단계: 빠른 인덱싱 확인 중...")
-        from ..services.document_analyzer import wait_for_file_indexing
-        import time
-        
-        resume_indexed = wait_for_file_indexing(f"resume_{resume_filename}", 10)
-        job_indexed = wait_for_file_indexing(f"job_{job_filename}", 10)
-        
-        logger.info(f"   빠른 인덱싱 상태 - 이력서: {resume_indexed}, 채용공고: {job_indexed}")
+            # 2단계: 인덱서 실행 (동시에 들어온 업로드와 병합된 실행의 결과를 기다림)
+            logger.info("⚡ 2단계: 인덱서 실행 중...")
+            generation = indexer_trigger.request_run(resume_upload["filename"], job_upload["filename"])
+            indexer_result = await run_in_threadpool(indexer_trigger.wait, generation)
+            logger.info(f"   인덱서 실행 결과: {indexer_result.get('status', 'unknown')}")
+            
+            # 인덱서 실행이 끝날 때까지 대기 (상태 모니터가 완료를 알려줌, 검색 폴링은 그 뒤에 확인용으로만)
+            # (실행을 시작한 인덱서가 없으면 기다리지 않고 4단계 검색 확인으로 넘어감)
+            started_indexers = indexer_trigger.started_indexers(indexer_result)
+            if indexer_result.get("started_at") and started_indexers:
+                run_finished = await run_in_threadpool(indexer_monitor.wait_for_run, indexer_result["started_at"], settings.indexer_trigger_wait_seconds, started_indexers)
+                logger.info(f"   인덱서 실행 완료: {run_finished}")
+            
+            # 3단계: 인덱스 재발견
+            logger.info("🔍 3단계: 최신 인덱스 재발견 중...")
+            # 인덱스가 바뀐 경우에만 검색 클라이언트 교체
+            old_index = await run_in_threadpool(document_analyzer.refresh_index)
+            
+            if old_index != document_analyzer.index_name:
+                logger.info(f"   인덱스 변경: {old_index} → {document_analyzer.index_name}")
+            else:
+                logger.info(f"   기존 인덱스 유지: {document_analyzer.index_name}")
+            
+            # 4단계: 짧은 인덱싱 대기 (시연용: 최대 10초)
+            logger.info("⏳ 4단계: 빠른 인덱싱 확인 중...")
+            resume_indexed = bool(resume_upload.get("deduplicated")) or await run_in_threadpool(wait_for_file_indexing, f"resume_{resume_filename}", 10)
+            job_indexed = bool(job_upload.get("deduplicated")) or await run_in_threadpool(wait_for_file_indexing, f"job_{job_filename}", 10)
+            
+            logger.info(f"   빠른 인덱싱 상태 - 이력서: {resume_indexed}, 채용공고: {job_indexed}")
         
         # 5단계: 즉시 분석 실행
         logger.info("📊 5단계: 즉시 분석 실행 중...")
-        analysis_result = analyze_candidate_match(resume_filename, job_filename)
+        analysis_result = await run_in_threadpool(analyze_candidate_match, resume_filename, job_filename)
         
         result = {
             "status": "success",
             "mode": "fast",
+            "deduplicated": deduplicated,
             "upload_results": {
                 "resume_upload": resume_upload,
                 "job_upload": job_upload
@@ -407,18 +462,274 @@ async def upload_and_analyze_fast_api(
             detail=f"고속 업로드+분석 실패: {str(e)}"
         )
 
-@router.get("/files-list")
-async def get_files_list_api():
+@router.post("/batch-analyze")
+async def batch_analyze_api(
+    job_file: Optional[UploadFile] = File(None),
+    job_filename: Optional[str] = Form(None),
+    resume_files: List[UploadFile] = File(default=[]),
+    resume_filenames: Optional[str] = Form(None),
+    concurrency: Optional[int] = Form(None)
+):
+    """
+    여러 이력서를 하나의 채용공고로 일괄 심사 (NDJSON 스트리밍)
+    채용공고 내용은 한 번만 읽고, 이력서 분석은 동시 실행 수를 제한하여 병렬로 처리합니다.
+    
+    Args:
+        job_file: 채용공고 파일 (job_filename 대신 업로드할 때)
+        job_filename: 이미 업로드된 채용공고 파일명
+        resume_files: 이력서 파일들 (업로드 + 분석)
+        resume_filenames: 이미 업로드된 이력서 파일명들 (쉼표로 구분)
+        concurrency: 동시 분석 수 (기본값: batch_analysis_concurrency)
+        
+    Returns:
+        StreamingResponse: application/x-ndjson
+            - {"type": "start", ...}: 심사 시작 정보
+            - {"type": "result", ...}: 지원자 1명 분석 완료 시마다 (현재까지의 순위 포함)
+            - {"type": "summary", ...}: 전체 순위
+    """
+    try:
+        # 요청 파일 내용은 스트리밍 시작 전에 모두 읽어둠
+        uploaded_resumes = []
+        for resume_file in resume_files:
+            uploaded_resumes.append((resume_file.filename or "unknown_resume.pdf", await resume_file.read()))
+        existing_resumes = [name.strip() for name in (resume_filenames or "").split(",") if name.strip()]
+        
+        if job_file is None and not job_filename:
+            return {"status": "error", "message": "채용공고 파일 또는 채용공고 파일명이 필요합니다."}
+        if not uploaded_resumes and not existing_resumes:
+            return {"status": "error", "message": "이력서 파일 또는 이력서 파일명이 1개 이상 필요합니다."}
+        
+        max_concurrency = max(1, min(concurrency or settings.batch_analysis_concurrency, settings.batch_analysis_max_concurrency))
+        logger.info(f"🚀 일괄 심사 요청: 이력서 {len(uploaded_resumes) + len(existing_resumes)}건, 동시 실행 {max_concurrency}")
+        
+        # 1단계: 새 파일 업로드 (인덱서는 한 번만 실행, 기존과 같은 내용의 파일은 인덱싱 대기 생략)
+        job_changed = False
+        if job_file is not None:
+            job_filename = job_file.filename or "unknown_job.pdf"
+            job_upload = await run_in_threadpool(upload_job_posting_file, await job_file.read(), job_filename)
+            if job_upload["status"] != "success":
+                return {"status": "error", "message": "채용공고 업로드 실패", "job_upload": job_upload}
+            job_changed = not job_upload.get("deduplicated")
+        
+        upload_errors = {}
+        changed_resumes = set()
+        for resume_name, resume_content in uploaded_resumes:
+            resume_upload = await run_in_threadpool(upload_resume_file, resume_content, resume_name)
+            if resume_upload["status"] != "success":
+                upload_errors[resume_name] = resume_upload.get("message", "업로드 실패")
+            elif not resume_upload.get("deduplicated"):
+                changed_resumes.add(resume_name)
+        
+        if (job_changed or changed_resumes) and not document_analyzer.search_backend.indexes_on_upload:
+            changed_files = [f"resume_{name}" for name in changed_resumes] + ([f"job_{job_filename}"] if job_changed else [])
+            indexer_result = await run_in_threadpool(indexer_trigger.wait, indexer_trigger.request_run(*changed_files))
+            logger.info(f"   인덱서 실행 결과: {indexer_result.get('status', 'unknown')}")
+        
+        # 2단계: 채용공고 내용은 한 번만 조회
+        if job_changed:
+            await run_in_threadpool(wait_for_file_indexing, f"job_{job_filename}", 30)
+        try:
+            job_content = await run_in_threadpool(find_job_posting, job_filename)
+        except DocumentNotFound as e:
+            return {"status": "error", "message": f"채용공고 파일 오류: {str(e)}"}
+        
+    except Exception as e:
+        logger.error(f"❌ 일괄 심사 준비 중 오류: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"일괄 심사 실패: {str(e)}"
+        )
+    
+    # (이력서 파일명, 인덱싱 대기 필요 여부)
+    candidates = [(name, name in changed_resumes) for name, _ in uploaded_resumes] + [(name, False) for name in existing_resumes]
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def analyze_one(resume_name: str, needs_indexing: bool) -> dict:
+        """이력서 1건 분석 (동시 실행 수 제한)"""
+        if resume_name in upload_errors:
+            return {"resume_filename": resume_name, "status": "error", "score": None,
+                    "analysis_result": {"status": "error", "message": upload_errors[resume_name]}}
+        async with semaphore:
+            try:
+                if needs_indexing:
+                    await run_in_threadpool(wait_for_file_indexing, f"resume_{resume_name}", 30)
+                resume_content = await run_in_threadpool(read_resume, resume_name)
+                analysis_result = await run_in_threadpool(document_analyzer.analyze_match, resume_content, job_content)
+                if analysis_result.get("status") == "success":
+                    await run_in_threadpool(
+                        leaderboard_service.record_document_scores, job_filename, resume_name, analysis_result["scores"]
+                    )
+            except Exception as e:
+                analysis_result = {"status": "error", "message": f"분석 중 오류 발생: {str(e)}"}
+        return {
+            "resume_filename": resume_name,
+            "status": analysis_result.get("status", "error"),
+            "score": extract_overall_score(analysis_result),
+            "analysis_result": analysis_result
+        }
+    
+    def ranking_key(item: dict):
+        # 점수 높은 순, 점수 없는(오류) 지원자는 맨 뒤
+        return (item["score"] is None, -(item["score"] or 0), item["resume_filename"])
+    
+    async def stream_results():
+        yield json.dumps({
+            "type": "start",
+            "job_filename": job_filename,
+            "total": len(candidates),
+            "concurrency": max_concurrency
+        }, ensure_ascii=False) + "\n"
+        
+        finished = []
+        for next_done in asyncio.as_completed([analyze_one(name, needs_indexing) for name, needs_indexing in candidates]):
+            item = await next_done
+            finished.append(item)
+            finished.sort(key=ranking_key)
+            yield json.dumps({
+                "type": "result",
+                "rank": finished.index(item) + 1,
+                "completed": len(finished),
+                "total": len(candidates),
+                **item
+            }, ensure_ascii=False) + "\n"
+        
+        logger.info(f"✅ 일괄 심사 완료: {len(finished)}건")
+        yield json.dumps({
+            "type": "summary",
+            "job_filename": job_filename,
+            "total": len(candidates),
+            "succeeded": sum(1 for item in finished if item["status"] == "success"),
+            "ranking": [
+                {"rank": rank, "resume_filename": item["resume_filename"], "score": item["score"], "status": item["status"]}
+                for rank, item in enumerate(finished, start=1)
+            ]
+        }, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+class AskQuestionsRequest(BaseModel):
+    questions: List[str]
+    resume_filename: Optional[str] = None  # 지정하면 이 지원자의 이력서를 한 번만 읽어 모든 질문이 공유
+    resume_text: str = ""
+    job_posting_text: str = ""
+    max_concurrency: Optional[int] = None
+
+@router.post("/ask-questions")
+async def ask_questions_api(request: AskQuestionsRequest):
+    """
+    면접관 후속 질문 일괄 답변 (완료되는 순서대로 스트리밍)
+    
+    Returns:
+        StreamingResponse: application/x-ndjson
+            - {"type": "start", ...}: 질문 수, 동시 실행 수
+            - {"type": "answer", "index": 입력 순서, ...}: 답변 1건 완료 시마다
+            - {"type": "summary", "answers": [...]}: 입력 순서의 전체 답변
+    """
+    questions = [question.strip() for question in request.questions if question.strip()]
+    if not questions:
+        return {"status": "error", "message": "질문이 1개 이상 필요합니다."}
+    
+    # RAG 체인은 import 시점에 클라이언트를 만들므로 처음 사용할 때 불러옴
+    from ..services.rag import aask_questions, batch_concurrency
+    
+    logger.info(f"💬 질문 일괄 답변 요청: {len(questions)}건 (지원자 문서 공유: {bool(request.resume_filename)})")
+    
+    def summary_line(answers: list) -> str:
+        return json.dumps({
+            "type": "summary",
+            "total": len(questions),
+            "succeeded": sum(1 for item in answers if item and item["status"] == "success"),
+            "answers": answers
+        }, ensure_ascii=False) + "\n"
+    
+    async def stream_answers():
+        yield json.dumps({
+            "type": "start",
+            "total": len(questions),
+            "shared_retrieval": bool(request.resume_filename),
+            "max_concurrency": batch_concurrency(request.max_concurrency)
+        }, ensure_ascii=False) + "\n"
+        
+        # 다른 지원자의 문서가 섞이지 않도록 이 지원자의 이력서만 context로 공유
+        shared_context = None
+        if request.resume_filename:
+            try:
+                shared_context = await run_in_threadpool(read_resume, request.resume_filename)
+            except Exception as e:
+                logger.error(f"❌ 지원자 문서 조회 오류: {str(e)}")
+                answers = [
+                    {"index": index, "question": question, "answer": f"지원자 문서 조회 중 오류가 발생했습니다: {str(e)}", "status": "error"}
+                    for index, question in enumerate(questions)
+                ]
+                for completed, item in enumerate(answers, start=1):
+                    yield json.dumps({"type": "answer", "completed": completed, "total": len(questions), **item}, ensure_ascii=False) + "\n"
+                yield summary_line(answers)
+                return
+        
+        answers = [None] * len(questions)
+        completed = 0
+        async for item in aask_questions(
+            questions,
+            resume_text=request.resume_text,
+            job_posting_text=request.job_posting_text,
+            shared_context=shared_context,
+            max_concurrency=request.max_concurrency
+        ):
+            completed += 1
+            answers[item["index"]] = item
+            yield json.dumps({"type": "answer", "completed": completed, "total": len(questions), **item}, ensure_ascii=False) + "\n"
+        
+        logger.info(f"✅ 질문 일괄 답변 완료: {completed}건")
+        yield summary_line(answers)
+    
+    return StreamingResponse(stream_answers(), media_type="application/x-ndjson")
+
+@router.get("/leaderboard/{job_filename}", response_model=LeaderboardResponse)
+async def get_leaderboard_api(job_filename: str, sort_by: str = "document", limit: int = 50, offset: int = 0):
+    """
+    채용공고별 지원자 순위 (저장된 점수 인덱스만 조회, LLM 호출 없음)
+    
+    Args:
+        job_filename: 채용공고 파일명
+        sort_by: 정렬 기준 (document: 서류 점수, interview: 면접 점수)
+        limit: 결과 제한 수
+        offset: 건너뛸 결과 수
+        
+    Returns:
+        dict: 전체 지원자 수와 점수 순위 목록
+    """
+    try:
+        return await run_in_threadpool(leaderboard_service.get_leaderboard, job_filename, sort_by, limit, offset)
+        
+    except Exception as e:
+        logger.error(f"리더보드 조회 중 오류: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"리더보드 조회 실패: {str(e)}"
+        )
+
+@router.get("/files-list", response_model=FilesListResponse)
+async def get_files_list_api(request: Request, response: Response):
     """
     Azure Blob Storage에 있는 파일 목록 조회
     
+    목록 캐시의 ETag가 If-None-Match와 같으면 Blob Storage를 조회하지 않고 304로 응답합니다.
+    
     Returns:
         dict: 이력서 및 채용공고 파일 목록
     """
     try:
         logger.info("파일 목록 조회 요청")
         
+        cached_etag = blob_inventory.cached_etag(document_analyzer.container_name)
+        if if_none_match(request, cached_etag):
+            return not_modified(cached_etag, LISTING_CACHE_CONTROL)
+        
         result = get_storage_files_list()
+        etag = result.pop("inventory_etag", None)
+        if if_none_match(request, etag):
+            return not_modified(etag, LISTING_CACHE_CONTROL)
+        set_cache_headers(response, etag, LISTING_CACHE_CONTROL)
         
         logger.info(f"파일 목록 조회 완료: {result.get('total_files', 0)}개")
         return result
@@ -430,7 +741,7 @@ async def get_files_list_api():
             detail=f"파일 목록 조회 실패: {str(e)}"
         ) 
 
-@router.get("/debug-index")
+@router.get("/debug-index", response_model=ApiResponse)
 async def debug_index_api():
     """
     Azure AI Search 인덱스 디버깅 (개발용)
@@ -453,7 +764,7 @@ async def debug_index_api():
             detail=f"인덱스 디버깅 실패: {str(e)}"
         ) 
 
-@router.post("/run-indexer")
+@router.post("/run-indexer", response_model=IndexerResponse)
 async def run_indexer_api():
     """
     Azure AI Search 인덱서를 수동으로 실행 (Blob Storage → AI Search 동기화)
@@ -464,7 +775,13 @@ async def run_indexer_api():
     try:
         logger.info("인덱서 수동 실행 요청")
         
-        result = document_analyzer.run_indexer()
+        if settings.search_backend == "local":
+            # 로컬 검색 인덱스는 업로드 시 색인되므로 실행할 인덱서가 없음
+            return dict(LOCAL_INDEXER_RESULT)
+        
+        # 진행 중인 업로드 요청과 병합하되 대기 없이 바로 실행 (이미 실행 중(409)이면 재실행 예약 후 그 결과를 바로 반환)
+        generation = indexer_trigger.request_run("manual", immediate=True)
+        result = await run_in_threadpool(indexer_trigger.wait, generation, None, False)
         
         logger.info(f"인덱서 실행 완료: {result}")
         return result
@@ -476,7 +793,7 @@ async def run_indexer_api():
             detail=f"인덱서 실행 실패: {str(e)}"
         )
 
-@router.get("/indexer-status")
+@router.get("/indexer-status", response_model=IndexerResponse)
 async def get_indexer_status_api():
     """
     Azure AI Search 인덱서 상태 확인
@@ -487,7 +804,11 @@ async def get_indexer_status_api():
     try:
         logger.info("인덱서 상태 확인 요청")
         
-        result = document_analyzer.check_indexer_status()
+        if settings.search_backend == "local":
+            return dict(LOCAL_INDEXER_RESULT)
+        
+        # 백그라운드 모니터의 최신 스냅샷 (Azure 호출 없이 바로 응답)
+        result = await run_in_threadpool(indexer_monitor.snapshot)
         
         logger.info("인덱서 상태 확인 완료")
         return result
@@ -499,38 +820,11 @@ async def get_indexer_status_api():
             detail=f"인덱서 상태 확인 실패: {str(e)}"
         ) 
 
-@router.post("/integrated-analysis")
-async def integrated_analysis_api(request: dict):
-    """
-    2단계 시연용: 문서 분석 + 면접 STT 통합 분석
-    
-    Args:
-        request: {
-            "document_analysis": "1단계 문서 분석 결과",
-            "interview_stt": "면접 STT 결과",
-            "resume_filename": "이력서 파일명",
-            "job_filename": "채용공고 파일명"
-        }
-        
-    Returns:
-        dict: 최종 종합 평가 결과
-    """
-    try:
-        document_analysis = request.get("document_analysis", "")
-        interview_stt = request.get("interview_stt", "")
-        resume_filename = request.get("resume_filename", "")
-        job_filename = request.get("job_filename", "")
-        
-        logger.info("🔄 2단계: 문서+면접 통합 분석 시작")
-        
-        if not document_analysis or not interview_stt:
-            return {
-                "status": "error",
-                "message": "문서 분석 결과와 면접 STT 결과가 모두 필요합니다."
-            }
-        
-        # 통합 분석 프롬프트
-        prompt = f"""
+def run_integrated_analysis(document_analysis: str, interview_stt: str, resume_filename: str, job_filename: str) -> dict:
+    """문서 분석 결과 + 면접 STT로 최종 종합 평가 생성 (LLM 호출)"""
+    # 통합 분석 프롬프트
+    def build_prompt(document_analysis: str, interview_stt: str) -> str:
+        return f"""
 당신은 전문 채용 컨설턴트입니다. 아래 1단계 서류 심사 결과와 2단계 면접 결과를 종합하여 최종 평가를 해주세요.
 
 ## 📋 1단계: 서류 심사 결과
@@ -573,21 +867,65 @@ async def integrated_analysis_api(request: dict):
 ### 📈 성장 가능성 및 장기 전망
 [해당 지원자의 3-5년 후 성장 가능성과 회사 기여도 예측]
 """
+    
+    # 토큰 예산을 넘는 원문은 정책(압축/자르기)에 따라 줄여서 전송
+    prompt, token_usage = token_budget_manager.fit(
+        "integrated_analysis", build_prompt,
+        document_analysis=document_analysis, interview_stt=interview_stt
+    )
+    
+    # LLM을 통한 통합 분석
+    result = document_analyzer.llm.invoke(prompt)
+    
+    return {
+        "status": "success",
+        "analysis_type": "integrated",
+        "input_summary": {
+            "document_analysis_length": len(document_analysis),
+            "interview_stt_length": len(interview_stt),
+            "resume_file": resume_filename,
+            "job_file": job_filename
+        },
+        "integrated_analysis": result.content,
+        "token_usage": token_budget_manager.completion_usage(token_usage, result)
+    }
+    
+
+@router.post("/integrated-analysis", response_model=IntegratedAnalysisResponse)
+async def integrated_analysis_api(request: dict):
+    """
+    2단계 시연용: 문서 분석 + 면접 STT 통합 분석
+    
+    Args:
+        request: {
+            "document_analysis": "1단계 문서 분석 결과",
+            "interview_stt": "면접 STT 결과",
+            "resume_filename": "이력서 파일명",
+            "job_filename": "채용공고 파일명"
+        }
         
-        # LLM을 통한 통합 분석
-        result = document_analyzer.llm.invoke(prompt)
+    Returns:
+        dict: 최종 종합 평가 결과
+    """
+    try:
+        document_analysis = request.get("document_analysis", "")
+        interview_stt = request.get("interview_stt", "")
+        resume_filename = request.get("resume_filename", "")
+        job_filename = request.get("job_filename", "")
         
-        return {
-            "status": "success",
-            "analysis_type": "integrated",
-            "input_summary": {
-                "document_analysis_length": len(document_analysis),
-                "interview_stt_length": len(interview_stt),
-                "resume_file": resume_filename,
-                "job_file": job_filename
-            },
-            "integrated_analysis": result.content
-        }
+        logger.info("🔄 2단계: 문서+면접 통합 분석 시작")
+        
+        if not document_analysis or not interview_stt:
+            return {
+                "status": "error",
+                "message": "문서 분석 결과와 면접 STT 결과가 모두 필요합니다."
+            }
+        
+        # 같은 입력의 통합 분석이 진행 중이면 그 결과를 공유
+        return await single_flight.run(
+            "integrated_analysis", (document_analysis, interview_stt, resume_filename, job_filename),
+            run_integrated_analysis, document_analysis, interview_stt, resume_filename, job_filename
+        )
         
     except Exception as e:
         logger.error(f"❌ 통합 분석 중 오류: {str(e)}")
@@ -596,7 +934,7 @@ async def integrated_analysis_api(request: dict):
             "message": f"통합 분석 실패: {str(e)}"
         }
 
-@router.post("/save-analysis-result")
+@router.post("/save-analysis-result", response_model=SavedResultResponse)
 async def save_analysis_result_api(request: dict):
     """
     분석 결과를 Azure Blob Storage에 JSON 파일로 저장
@@ -677,17 +1015,23 @@ async def save_analysis_result_api(request: dict):
             "message": f"저장 중 오류: {str(e)}"
         }
 
-@router.get("/get-saved-results")
-async def get_saved_results_api():
+@router.get("/get-saved-results", response_model=SavedResultsListResponse)
+async def get_saved_results_api(request: Request, response: Response):
     """
     저장된 분석 결과 목록 조회
     
+    목록 캐시의 ETag가 If-None-Match와 같으면 Blob Storage를 조회하지 않고 304로 응답합니다.
+    
     Returns:
         dict: 저장된 결과 파일 목록
     """
     try:
         logger.info("📋 저장된 분석 결과 목록 조회")
         
+        cached_etag = blob_inventory.cached_etag(document_analyzer.container_name)
+        if if_none_match(request, cached_etag):
+            return not_modified(cached_etag, LISTING_CACHE_CONTROL)
+        
         # 전체 파일 목록 조회
         files_result = document_analyzer.get_blob_files_list()
         
@@ -697,6 +1041,11 @@ async def get_saved_results_api():
                 "message": "파일 목록 조회 실패"
             }
         
+        etag = files_result.get("inventory_etag")
+        if if_none_match(request, etag):
+            return not_modified(etag, LISTING_CACHE_CONTROL)
+        set_cache_headers(response, etag, LISTING_CACHE_CONTROL)
+        
         # 분석 결과 파일들만 필터링 (analysis_result_로 시작하는 파일들)
         all_files = files_result.get("files", [])
         result_files = []
@@ -751,11 +1100,14 @@ async def get_saved_results_api():
             "message": f"목록 조회 실패: {str(e)}"
         }
 
-@router.get("/load-analysis-result/{filename}")
-async def load_analysis_result_api(filename: str):
+@router.get("/load-analysis-result/{filename}", response_model=SavedResultResponse)
+async def load_analysis_result_api(filename: str, request: Request, response: Response):
     """
     저장된 분석 결과 불러오기
     
+    ETag는 Blob의 ETag를 그대로 사용합니다. If-None-Match가 목록 캐시의 Blob ETag와 같으면 Blob Storage를 조회하지 않고,
+    캐시가 없으면 Blob Storage에 조건부 다운로드를 요청해 변경이 없을 때 본문을 받지 않습니다.
+    
     Args:
         filename: 불러올 결과 파일명
         
@@ -772,22 +1124,27 @@ async def load_analysis_result_api(filename: str):
                 "message": "올바른 분석 결과 파일이 아닙니다."
             }
         
-        # Azure Blob Storage에서 파일 읽기
-        if document_analyzer.blob_service_client is None:
+        # 저장소에서 파일 읽기
+        if document_analyzer.storage is None:
             return {
                 "status": "error",
                 "message": "Azure Storage가 설정되지 않았습니다."
             }
         
-        blob_client = document_analyzer.blob_service_client.get_blob_client(
-            container=document_analyzer.container_name,
-            blob=filename
-        )
+        cache_control = saved_result_cache_control()
+        cached_etag = blob_inventory.cached_blob_etag(document_analyzer.container_name, filename)
+        if if_none_match(request, cached_etag):
+            return not_modified(cached_etag, cache_control)
         
-        # 파일 다운로드
+        # 파일 다운로드 (클라이언트의 ETag와 같으면 저장소가 본문 없이 응답)
+        etag = requested_etag(request)
         try:
-            blob_data = blob_client.download_blob()
-            json_content = blob_data.readall().decode('utf-8')
+            try:
+                content, stored = document_analyzer.storage.get(filename, if_none_match=etag)
+            except StorageNotModified:
+                return not_modified(etag, cache_control)
+            json_content = content.decode('utf-8')
+            set_cache_headers(response, stored.etag, cache_control)
             
             # JSON 파싱
             import json
@@ -802,7 +1159,7 @@ async def load_analysis_result_api(filename: str):
             }
             
         except Exception as e:
-            if "BlobNotFound" in str(e):
+            if isinstance(e, StorageObjectNotFound):
                 return {
                     "status": "error",
                     "message": "파일을 찾을 수 없습니다."
@@ -817,7 +1174,7 @@ async def load_analysis_result_api(filename: str):
             "message": f"불러오기 실패: {str(e)}"
         }
 
-@router.delete("/delete-analysis-result/{filename}")
+@router.delete("/delete-analysis-result/{filename}", response_model=SavedResultResponse)
 async def delete_analysis_result_api(filename: str):
     """
     저장된 분석 결과 삭제
@@ -838,21 +1195,17 @@ async def delete_analysis_result_api(filename: str):
                 "message": "올바른 분석 결과 파일이 아닙니다."
             }
         
-        # Azure Blob Storage에서 파일 삭제
-        if document_analyzer.blob_service_client is None:
+        # 저장소에서 파일 삭제
+        if document_analyzer.storage is None:
             return {
                 "status": "error",
                 "message": "Azure Storage가 설정되지 않았습니다."
             }
         
-        blob_client = document_analyzer.blob_service_client.get_blob_client(
-            container=document_analyzer.container_name,
-            blob=filename
-        )
-        
         # 파일 삭제
         try:
-            blob_client.delete_blob()
+            document_analyzer.storage.delete(filename)
+            blob_inventory.invalidate(document_analyzer.container_name)
             
             logger.info(f"✅ 분석 결과 삭제 완료: {filename}")
             return {
@@ -863,7 +1216,7 @@ async def delete_analysis_result_api(filename: str):
             }
             
         except Exception as e:
-            if "BlobNotFound" in str(e):
+            if isinstance(e, StorageObjectNotFound):
                 return {
                     "status": "error",
                     "message": "파일을 찾을 수 없습니다."
@@ -2,21 +2,37 @@
 면접 분석 API 라우터 - 음성 파일 업로드, STT, 면접 내용 분석
 """
 import logging
-from fastapi import APIRouter, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from ..models import (
+    FullInterviewAnalysisResponse,
+    InterviewAnalysisResponse,
+    InterviewFilesResponse,
+    TranscriptionResponse,
+    UploadResponse,
+    UploadTranscribeResponse
+)
 from typing import Optional
+from ..http_cache import LISTING_CACHE_CONTROL, if_none_match, not_modified, set_cache_headers
+from ..serialization import NegotiatedRoute
 from ..services.speech_service import (
     upload_interview_file,
     transcribe_interview,
     analyze_interview,
     upload_and_transcribe_interview,
-    get_interview_files
+    get_interview_files,
+    speech_service
 )
+from ..services.leaderboard import leaderboard_service
+from ..services.blob_inventory import blob_inventory
+from ..services.single_flight import single_flight
 
 logger = logging.getLogger(__name__)
 
 # 라우터 생성
 router = APIRouter(
+    route_class=NegotiatedRoute,
     prefix="/interview",
     tags=["면접분석"],
     responses={
@@ -25,7 +41,7 @@ router = APIRouter(
     }
 )
 
-@router.post("/upload-audio")
+@router.post("/upload-audio", response_model=UploadResponse)
 async def upload_interview_audio_api(file: UploadFile = File(...)):
     """
     면접 녹음 파일 업로드 (1단계)
@@ -56,7 +72,7 @@ async def upload_interview_audio_api(file: UploadFile = File(...)):
             detail=f"면접 녹음 파일 업로드 실패: {str(e)}"
         )
 
-@router.post("/transcribe")
+@router.post("/transcribe", response_model=TranscriptionResponse)
 async def transcribe_audio_api(file: UploadFile = File(...)):
     """
     음성 파일 STT (Speech-to-Text) 변환
@@ -87,7 +103,7 @@ async def transcribe_audio_api(file: UploadFile = File(...)):
             detail=f"STT 변환 실패: {str(e)}"
         )
 
-@router.post("/upload-and-transcribe")
+@router.post("/upload-and-transcribe", response_model=UploadTranscribeResponse)
 async def upload_and_transcribe_api(file: UploadFile = File(...)):
     """
     면접 녹음 업로드 + STT 한 번에 처리 (올인원 기능)
@@ -136,8 +152,11 @@ async def upload_and_transcribe_api(file: UploadFile = File(...)):
 class AnalyzeInterviewRequest(BaseModel):
     transcription: str
     job_description: Optional[str] = ""
+    # 둘 다 지정하면 면접 점수가 채용공고별 리더보드에 기록됨
+    job_filename: Optional[str] = None
+    resume_filename: Optional[str] = None
 
-@router.post("/analyze")
+@router.post("/analyze", response_model=InterviewAnalysisResponse)
 async def analyze_interview_api(request: AnalyzeInterviewRequest):
     """
     면접 내용 분석 (STT 결과를 바탕으로)
@@ -151,8 +170,16 @@ async def analyze_interview_api(request: AnalyzeInterviewRequest):
     try:
         logger.info(f"면접 내용 분석 요청: {len(request.transcription)}자")
         
-        # 면접 내용 분석
-        result = analyze_interview(request.transcription, request.job_description or "")
+        # 면접 내용 분석 (같은 입력의 분석이 진행 중이면 그 결과를 공유)
+        result = await single_flight.run(
+            "interview_analyze", (request.transcription, request.job_description or ""),
+            analyze_interview, request.transcription, request.job_description or ""
+        )
+        
+        if result.get("status") == "success" and request.job_filename and request.resume_filename:
+            await run_in_threadpool(
+                leaderboard_service.record_interview_scores, request.job_filename, request.resume_filename, result["scores"]
+            )
         
         logger.info("면접 내용 분석 완료")
         return result
@@ -164,7 +191,7 @@ async def analyze_interview_api(request: AnalyzeInterviewRequest):
             detail=f"면접 내용 분석 실패: {str(e)}"
         )
 
-@router.post("/full-analysis")
+@router.post("/full-analysis", response_model=FullInterviewAnalysisResponse)
 async def full_interview_analysis_api(
     audio_file: UploadFile = File(...),
     job_description: str = ""
@@ -225,18 +252,28 @@ async def full_interview_analysis_api(
             detail=f"면접 전체 분석 실패: {str(e)}"
         )
 
-@router.get("/audio-files")
-async def get_interview_audio_files_api():
+@router.get("/audio-files", response_model=InterviewFilesResponse)
+async def get_interview_audio_files_api(request: Request, response: Response):
     """
     저장된 면접 녹음 파일 목록 조회
     
+    목록 캐시의 ETag가 If-None-Match와 같으면 Blob Storage를 조회하지 않고 304로 응답합니다.
+    
     Returns:
         dict: 면접 녹음 파일 목록
     """
     try:
         logger.info("면접 파일 목록 조회 요청")
         
+        cached_etag = blob_inventory.cached_etag(speech_service.container_name)
+        if if_none_match(request, cached_etag):
+            return not_modified(cached_etag, LISTING_CACHE_CONTROL)
+        
         result = get_interview_files()
+        etag = result.pop("inventory_etag", None)
+        if if_none_match(request, etag):
+            return not_modified(etag, LISTING_CACHE_CONTROL)
+        set_cache_headers(response, etag, LISTING_CACHE_CONTROL)
         
         logger.info(f"면접 파일 목록 조회 완료: {result.get('total_files', 0)}개")
         return result
@@ -248,7 +285,7 @@ async def get_interview_audio_files_api():
             detail=f"면접 파일 목록 조회 실패: {str(e)}"
         )
 
-@router.post("/transcribe-existing-file")
+@router.post("/transcribe-existing-file", response_model=TranscriptionResponse)
 async def transcribe_existing_file_api(filename: str):
     """
     기존 저장된 면접 녹음 파일 STT 처리
@@ -262,37 +299,25 @@ async def transcribe_existing_file_api(filename: str):
     try:
         logger.info(f"🎤 기존 파일 STT 처리 요청: {filename}")
         
-        # Azure Blob Storage에서 파일 다운로드
+        # 저장소에서 파일 다운로드
         from ..services.speech_service import speech_service
+        from ..services.storage_backend import StorageObjectNotFound
         
-        if not speech_service.blob_service_client:
+        if speech_service.storage is None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Azure Storage가 설정되지 않았습니다."
             )
         
-        # 파일 다운로드
-        if not speech_service.container_name:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Azure Storage 컨테이너가 설정되지 않았습니다."
-            )
-        
-        blob_client = speech_service.blob_service_client.get_blob_client(
-            container=speech_service.container_name,
-            blob=filename
-        )
-        
-        # 파일 존재 여부 확인
-        if not blob_client.exists():
+        # 파일 내용 다운로드 (없으면 404)
+        try:
+            file_content, _ = speech_service.storage.get(filename)
+        except StorageObjectNotFound:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"파일을 찾을 수 없습니다: {filename}"
             )
         
-        # 파일 내용 다운로드
-        file_content = blob_client.download_blob().readall()
-        
         # 원본 파일명 (interview_ prefix 제거)
         original_filename = filename.replace('interview_', '')
         
@@ -319,7 +344,7 @@ class QuickInterviewAnalysisRequest(BaseModel):
     job_posting_content: Optional[str] = ""
     resume_content: Optional[str] = ""
 
-@router.post("/quick-analysis")
+@router.post("/quick-analysis", response_model=InterviewAnalysisResponse)
 async def quick_interview_analysis_api(request: QuickInterviewAnalysisRequest):
     """
     빠른 면접 분석 (이미 있는 STT 결과 활용)
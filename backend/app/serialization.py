@@ -0,0 +1,85 @@
+"""
+응답 직렬화
+
+- ORJSONResponse: 앱 기본 응답 클래스 (orjson으로 직렬화, 표준 json 대비 수 배 빠름)
+- NegotiatedRoute: 라우터의 route_class. Accept 헤더가 application/msgpack을 원하면
+  같은 응답을 MessagePack으로 직렬화합니다 (내부 일괄 처리 클라이언트용).
+
+MessagePack은 ormsgpack 패키지가 설치된 경우에만 사용하고, 없으면 항상 JSON으로 응답합니다.
+"""
+import re
+from contextvars import ContextVar
+from typing import Any
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+try:
+    import ormsgpack
+except ImportError:  # 선택 의존성
+    ormsgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# 현재 요청이 MessagePack 응답을 원하는지 (NegotiatedRoute가 요청마다 설정)
+_msgpack_requested: ContextVar[bool] = ContextVar("msgpack_requested", default=False)
+
+def _default(value: Any) -> Any:
+    """orjson/ormsgpack이 직접 처리하지 못하는 타입 (Pydantic 모델, set 등)"""
+    return jsonable_encoder(value)
+
+def wants_msgpack(accept: str) -> bool:
+    """Accept 헤더에서 MessagePack이 JSON보다 우선하는지"""
+    if ormsgpack is None or "msgpack" not in accept:
+        return False
+    msgpack_quality = json_quality = 0.0
+    for part in accept.lower().split(","):
+        media_type, _, params = part.strip().partition(";")
+        quality = re.search(r"q=([0-9.]+)", params)
+        value = float(quality.group(1)) if quality else 1.0
+        if media_type.strip() in MSGPACK_MEDIA_TYPES:
+            msgpack_quality = max(msgpack_quality, value)
+        elif media_type.strip() == "application/json":
+            json_quality = max(json_quality, value)
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+class ORJSONResponse(JSONResponse):
+    """orjson 응답 (NegotiatedRoute 요청에서 MessagePack을 원하면 MessagePack으로 직렬화)"""
+    
+    def render(self, content: Any) -> bytes:
+        if _msgpack_requested.get():
+            self.media_type = MSGPACK_MEDIA_TYPE
+            return ormsgpack.packb(
+                content,
+                default=_default,
+                option=ormsgpack.OPT_NON_STR_KEYS | ormsgpack.OPT_SERIALIZE_NUMPY | ormsgpack.OPT_SERIALIZE_PYDANTIC
+            )
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+class NegotiatedRoute(APIRoute):
+    """
+    Accept 헤더로 JSON / MessagePack을 고르는 라우트
+    
+    응답 모델에 선언됐지만 엔드포인트가 반환하지 않은 필드는 생략합니다 (기존 dict 응답과 같은 모양 유지).
+    """
+    
+    def __init__(self, *args, **kwargs):
+        kwargs["response_model_exclude_unset"] = True
+        super().__init__(*args, **kwargs)
+    
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        
+        async def negotiated_handler(request):
+            token = _msgpack_requested.set(wants_msgpack(request.headers.get("accept", "")))
+            try:
+                response = await handler(request)
+            finally:
+                _msgpack_requested.reset(token)
+            if isinstance(response, ORJSONResponse) and ormsgpack is not None:
+                response.headers.add_vary_header("Accept")
+            return response
+            
+        return negotiated_handler
@@ -0,0 +1,107 @@
+"""
+Blob 컨테이너 목록 캐시 (조건부 GET용 인벤토리)
+
+UI는 파일 목록/저장 결과/면접 파일 목록을 주기적으로 다시 조회합니다.
+컨테이너 목록을 blob_inventory_ttl_seconds 동안 캐시하고, 목록의 ETag를 각 Blob ETag로부터 계산해 두면
+If-None-Match 요청에 Blob Storage를 조회하지 않고 304로 응답할 수 있습니다.
+
+이 프로세스에서 업로드/삭제하면 즉시 무효화되고, 다른 워커나 포털에서 바뀐 내용은 TTL이 지나면 반영됩니다.
+"""
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+class _ContainerInventory:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: Optional[List[Dict[str, Any]]] = None
+        self.by_name: Dict[str, Dict[str, Any]] = {}
+        self.etag: Optional[str] = None
+        self.fetched_at = 0.0
+        self.generation = 0
+    
+    def is_fresh(self) -> bool:
+        return self.entries is not None and time.monotonic() - self.fetched_at < settings.blob_inventory_ttl_seconds
+
+def inventory_etag(entries: Iterable[Dict[str, Any]]) -> str:
+    """Blob 이름/ETag 목록으로 만든 강한 ETag (하나라도 바뀌면 달라짐)"""
+    digest = hashlib.sha256()
+    for entry in sorted(entries, key=lambda e: e["name"]):
+        digest.update(f"{entry['name']}\0{entry['etag']}\0{entry['size']}\n".encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+class BlobInventory:
+    """컨테이너별 Blob 목록 캐시"""
+    
+    def __init__(self):
+        self._containers: Dict[str, _ContainerInventory] = {}
+        self._lock = threading.Lock()
+    
+    def _inventory(self, container: str) -> _ContainerInventory:
+        with self._lock:
+            if container not in self._containers:
+                self._containers[container] = _ContainerInventory()
+            return self._containers[container]
+    
+    def entries(self, container: str, list_blobs: Callable[[], Iterable[Any]]) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        컨테이너 Blob 목록과 목록 ETag (캐시가 유효하면 Blob Storage를 조회하지 않음)
+        
+        Args:
+            container: 컨테이너 이름
+            list_blobs: 캐시가 없거나 만료됐을 때 호출할 목록 조회 함수 (BlobProperties 목록 반환)
+            
+        Returns:
+            ([{"name", "size", "last_modified", "etag"}], 목록 ETag)
+        """
+        inventory = self._inventory(container)
+        if inventory.is_fresh():
+            return inventory.entries, inventory.etag
+        # 동시에 만료를 본 요청들은 한 번의 목록 조회를 공유
+        with inventory.lock:
+            if inventory.is_fresh():
+                return inventory.entries, inventory.etag
+            generation = inventory.generation
+            entries = [
+                {
+                    "name": blob.name,
+                    "size": blob.size,
+                    "last_modified": blob.last_modified,
+                    "etag": getattr(blob, "etag", None) or f'"{blob.size}-{blob.last_modified}"',
+                }
+                for blob in list_blobs()
+            ]
+            etag = inventory_etag(entries)
+            # 조회 중에 업로드/삭제로 무효화됐다면 결과는 돌려주되 캐시는 만료 상태로 둠
+            inventory.entries = entries
+            inventory.by_name = {entry["name"]: entry for entry in entries}
+            inventory.etag = etag
+            inventory.fetched_at = time.monotonic() if generation == inventory.generation else 0.0
+            return entries, etag
+    
+    def cached_etag(self, container: str) -> Optional[str]:
+        """유효한 캐시의 목록 ETag (없으면 None)"""
+        inventory = self._inventory(container)
+        return inventory.etag if inventory.is_fresh() else None
+    
+    def cached_blob_etag(self, container: str, name: str) -> Optional[str]:
+        """유효한 캐시에 있는 Blob 하나의 ETag (없으면 None)"""
+        inventory = self._inventory(container)
+        if not inventory.is_fresh():
+            return None
+        entry = inventory.by_name.get(name)
+        return entry["etag"] if entry else None
+    
+    def invalidate(self, container: str):
+        """업로드/삭제 후 호출 (다음 조회에서 목록을 새로 읽음)"""
+        inventory = self._inventory(container)
+        inventory.generation += 1
+        inventory.fetched_at = 0.0
+
+# 전역 인벤토리 인스턴스
+blob_inventory = BlobInventory()
@@ -1,16 +1,44 @@
 """
 임시 JSON 파일 저장소 서비스 (ChromaDB 대신)
+
+저장 구조:
+- interview_analysis.json        : 마지막 압축 시점의 스냅샷
+- interview_analysis.log.jsonl   : 스냅샷 이후 추가된 레코드 (추가 전용 로그)
+- interview_analysis.lock        : 여러 워커 프로세스 간 쓰기 잠금 (fcntl.flock)
+
+저장 시에는 로그에 한 줄만 추가하고, 동시에 들어온 저장 요청은 한 번의 fsync로 묶어서 커밋합니다.
+로그가 쌓이면 백그라운드에서 스냅샷으로 압축한 뒤 로그를 비웁니다.
+다른 프로세스가 쓴 내용은 조회 시 파일 상태(stat)를 비교해 로그 꼬리만 읽어서 반영합니다.
 """
+import contextlib
 import logging
+import queue
+import threading
+import time
 import uuid
-from typing import Dict, Any, List
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Tuple
 import json
 import os
 from ..config import settings
+from .vector_index import VectorSearchMixin
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없음 (단일 워커 또는 sqlite 백엔드 사용)
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
-class TempStoreService:
+def _file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """파일 교체/변경 감지용 서명 (inode, 수정 시각, 크기)"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+class TempStoreService(VectorSearchMixin):
     """임시 파일 저장소 서비스 클래스"""
     
     def __init__(self):
@@ -20,34 +48,216 @@ class TempStoreService:
             self.storage_dir = settings.chroma_persist_dir
             os.makedirs(self.storage_dir, exist_ok=True)
             
-            # 저장소 파일 경로
+            # 저장소 파일 경로 (스냅샷 + 추가 전용 로그 + 프로세스 간 잠금)
             self.storage_file = os.path.join(self.storage_dir, "interview_analysis.json")
+            self.log_file = os.path.join(self.storage_dir, "interview_analysis.log.jsonl")
+            self.lock_file = os.path.join(self.storage_dir, "interview_analysis.lock")
+            self._lock_fd = open(self.lock_file, "a")
+            if fcntl is None:
+                logger.warning("fcntl을 사용할 수 없어 프로세스 간 잠금 없이 동작합니다. 워커는 1개만 사용하세요.")
+            
+            # 메모리 저장소 초기화 (스냅샷 + 로그 꼬리 재생)
+            self._lock = threading.Lock()
+            self.storage: Dict[str, Any] = {}
+            self._snapshot_signature = None
+            self._log_offset = 0
+            self._log_records = 0
+            with self._lock:
+                self._reload()
+            self._log = open(self.log_file, "a", encoding="utf-8")
             
-            # 메모리 저장소 초기화
-            self.storage = self._load_storage()
+            # 그룹 커밋 / 압축 담당 백그라운드 쓰기 스레드
+            self._write_queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+            self._group_commit_wait = max(settings.chroma_group_commit_ms, 0) / 1000
+            self._last_compaction = time.monotonic()
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="temp-store-writer", daemon=True
+            )
+            self._writer.start()
             
-            logger.info("임시 저장소 초기화 완료")
+            logger.info(f"임시 저장소 초기화 완료: {len(self.storage)}건 (로그 재생 {self._log_records}건)")
             
         except Exception as e:
             logger.error(f"저장소 초기화 중 오류 발생: {str(e)}")
             raise Exception(f"저장소 초기화 실패: {str(e)}")
     
-    def _load_storage(self) -> Dict[str, Any]:
-        """저장소 파일 로드"""
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """프로세스 간 배타 잠금 (쓰기/압축 시에만 사용)"""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_fd.fileno(), fcntl.LOCK_EX)
         try:
-            if os.path.exists(self.storage_file):
+            yield
+        finally:
+            fcntl.flock(self._lock_fd.fileno(), fcntl.LOCK_UN)
+    
+    def _reload(self):
+        """스냅샷을 다시 읽고 로그 전체를 재생 (self._lock 보유 상태에서 호출)"""
+        storage: Dict[str, Any] = {}
+        self._snapshot_signature = _file_signature(self.storage_file)
+        try:
+            if self._snapshot_signature is not None:
                 with open(self.storage_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
+                    storage = json.load(f)
+        except Exception as e:
+            logger.warning(f"스냅샷 로드 실패, 빈 저장소로 시작: {str(e)}")
+            storage = {}
+            
+        self.storage = storage
+        self._log_offset = 0
+        self._log_records = 0
+        self._read_log_tail()
+    
+    def _read_log_tail(self):
+        """마지막으로 읽은 위치 이후의 완전한 로그 줄만 반영 (self._lock 보유 상태에서 호출)"""
+        try:
+            with open(self.log_file, 'rb') as f:
+                f.seek(self._log_offset)
+                tail = f.read()
+        except FileNotFoundError:
+            return
+            
+        # 쓰는 중이거나 중단된 마지막 줄은 건너뜀 (잘라내기는 쓰기 잠금 안에서만 수행)
+        for line in tail.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            self._apply_entry(self.storage, entry)
+            self._log_records += 1
+            self._log_offset += len(line)
+    
+    def _refresh(self):
+        """다른 프로세스의 변경 사항 반영 (self._lock 보유 상태에서 호출)"""
+        if _file_signature(self.storage_file) != self._snapshot_signature:
+            # 다른 프로세스가 압축하여 스냅샷이 교체됨
+            self._reload()
+            return
+            
+        log_signature = _file_signature(self.log_file)
+        log_size = log_signature[2] if log_signature else 0
+        if log_size < self._log_offset:
+            self._reload()
+        elif log_size > self._log_offset:
+            self._read_log_tail()
+    
+    def _discard_torn_tail(self):
+        """중단된 쓰기로 남은 불완전한 로그 꼬리 제거 (쓰기 잠금 + self._lock 보유 상태에서 호출)"""
+        log_signature = _file_signature(self.log_file)
+        if log_signature and log_signature[2] > self._log_offset:
+            logger.warning(f"손상된 로그 꼬리 제거: {self.log_file} ({self._log_offset}바이트까지 유지)")
+            with open(self.log_file, 'r+b') as f:
+                f.truncate(self._log_offset)
+    
+    @staticmethod
+    def _apply_entry(storage: Dict[str, Any], entry: Dict[str, Any]):
+        """로그 항목 하나를 메모리 저장소에 반영"""
+        if entry.get("op") == "put":
+            document = entry["doc"]
+            storage[document["id"]] = document
+    
+    def _writer_loop(self):
+        """저장 요청을 모아서 한 번에 커밋하고, 유휴 시간에는 로그를 압축"""
+        while True:
+            timeout = max(settings.chroma_compact_interval_seconds, 1)
+            try:
+                item = self._write_queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+                
+            if item is not None:
+                batch = [item]
+                # 짧은 대기 동안 들어온 요청을 같은 배치로 묶음
+                if self._group_commit_wait:
+                    time.sleep(self._group_commit_wait)
+                while True:
+                    try:
+                        batch.append(self._write_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                self._commit_batch(batch)
+                
+            if self._should_compact():
+                try:
+                    self._compact()
+                except Exception as e:
+                    logger.error(f"저장소 압축 실패: {str(e)}")
+    
+    def _commit_batch(self, batch: List[tuple]):
+        """배치를 로그에 쓰고 fsync 1회로 확정한 뒤 메모리에 반영"""
+        try:
+            lines = "".join(
+                json.dumps(entry, ensure_ascii=False) + "\n" for entry, _ in batch
+            )
+            with self._file_lock():
+                # 다른 프로세스의 기록을 먼저 따라잡은 뒤 이어서 추가
+                with self._lock:
+                    self._refresh()
+                    self._discard_torn_tail()
+                self._log.write(lines)
+                self._log.flush()
+                os.fsync(self._log.fileno())
+                with self._lock:
+                    self._read_log_tail()
         except Exception as e:
-            logger.warning(f"저장소 로드 실패, 빈 저장소 생성: {str(e)}")
-            return {}
+            logger.error(f"저장소 로그 기록 실패: {str(e)}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+            
+        for _, future in batch:
+            future.set_result(None)
+    
+    def _should_compact(self) -> bool:
+        """압축 필요 여부 (로그 건수 또는 경과 시간 기준)"""
+        if self._log_records == 0:
+            return False
+        if self._log_records >= settings.chroma_compact_min_records:
+            return True
+        return time.monotonic() - self._last_compaction >= settings.chroma_compact_interval_seconds
+    
+    def _compact(self):
+        """현재 상태를 새 스냅샷으로 원자적으로 교체한 뒤 로그를 비움"""
+        with self._file_lock():
+            with self._lock:
+                self._refresh()
+                self._discard_torn_tail()
+                if self._log_records == 0:
+                    # 다른 프로세스가 이미 압축함
+                    self._last_compaction = time.monotonic()
+                    return
+                snapshot = dict(self.storage)
+                compacted_records = self._log_records
+                
+            temp_file = f"{self.storage_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.storage_file)
+            
+            # 스냅샷 교체 후 로그를 비움 (그 사이 중단되어도 재생은 멱등)
+            self._log.truncate(0)
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            with self._lock:
+                self._snapshot_signature = _file_signature(self.storage_file)
+                self._log_offset = 0
+                self._log_records = 0
+            self._last_compaction = time.monotonic()
+            
+        logger.info(f"저장소 압축 완료: 스냅샷 {len(snapshot)}건, 로그 {compacted_records}건 정리")
     
-    def _save_storage(self):
-        """저장소 파일 저장"""
+    def _save_storage(self, entry: Dict[str, Any]):
+        """로그 항목을 쓰기 스레드에 넘기고 커밋될 때까지 대기"""
         try:
-            with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump(self.storage, f, ensure_ascii=False, indent=2)
+            future: Future = Future()
+            self._write_queue.put((entry, future))
+            future.result()
         except Exception as e:
             logger.error(f"저장소 저장 실패: {str(e)}")
             raise Exception(f"저장소 저장 실패: {str(e)}")
@@ -88,11 +298,11 @@ class TempStoreService:
                 "document_type": "interview_analysis"
             }
             
-            # 저장소에 추가
-            self.storage[document_id] = data
+            # 로그에 추가 (커밋 후 메모리 저장소에 반영됨)
+            self._save_storage({"op": "put", "doc": data})
             
-            # 파일에 저장
-            self._save_storage()
+            # 의미 검색용 임베딩 대기열에 추가 (배치로 처리됨)
+            self._index_vectors(data)
             
             logger.info(f"분석 결과 저장 완료: {document_id}")
             return document_id
@@ -112,22 +322,40 @@ class TempStoreService:
             Dict: 분석 결과
         """
         try:
-            if document_id not in self.storage:
+            with self._lock:
+                self._refresh()
+                data = self.storage.get(document_id)
+            if data is None:
                 raise Exception(f"문서를 찾을 수 없습니다: {document_id}")
-            
-            return self.storage[document_id]
+                
+            return data
             
         except Exception as e:
             logger.error(f"분석 결과 조회 중 오류 발생: {str(e)}")
             raise Exception(f"분석 결과 조회 실패: {str(e)}")
     
-    def search_analyses(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def iter_analysis_results(self):
+        """저장된 모든 분석 결과 (벡터 재색인용)"""
+        with self._lock:
+            self._refresh()
+            documents = list(self.storage.values())
+        yield from documents
+    
+    def search_analyses(
+        self,
+        query: str,
+        limit: int = 10,
+        position: Optional[str] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
         """
         분석 결과를 검색합니다.
         
         Args:
             query: 검색 쿼리
             limit: 결과 제한 수
+            position: 지원 직무 필터 (정확히 일치)
+            offset: 건너뛸 결과 수
             
         Returns:
             list: 검색 결과
@@ -137,18 +365,29 @@ class TempStoreService:
             results = []
             query_lower = query.lower()
             
-            for doc_id, data in self.storage.items():
+            with self._lock:
+                self._refresh()
+                documents = list(self.storage.values())
+                
+            skipped = 0
+            for data in documents:
+                if position and data.get('position') != position:
+                    continue
+                
                 # 검색 대상 텍스트 구성
                 search_text = f"{data.get('candidate_name', '')} {data.get('position', '')} {data.get('summary', '')} {data.get('strengths', '')} {data.get('weaknesses', '')}".lower()
                 
                 if query_lower in search_text:
+                    if skipped < offset:
+                        skipped += 1
+                        continue
                     result = data.copy()
                     result["similarity_score"] = 1.0  # 임시로 1.0 설정
                     results.append(result)
                     
                     if len(results) >= limit:
                         break
-            
+                        
             return results
             
         except Exception as e:
@@ -158,16 +397,27 @@ class TempStoreService:
     def get_collection_stats(self) -> Dict[str, Any]:
         """컬렉션 통계 정보를 반환합니다."""
         try:
-            count = len(self.storage)
+            with self._lock:
+                self._refresh()
+                count = len(self.storage)
+                log_records = self._log_records
             return {
                 "collection_name": "interview_analysis",
                 "document_count": count,
+                "pending_log_records": log_records,
                 "persist_directory": self.storage_dir,
-                "storage_type": "JSON 파일"
+                "storage_type": "JSON 스냅샷 + JSONL 로그"
             }
         except Exception as e:
             logger.error(f"컬렉션 통계 조회 중 오류 발생: {str(e)}")
             return {"error": str(e)}
 
+def create_store_service():
+    """설정(analysis_store_backend)에 맞는 저장소 서비스 생성"""
+    if settings.analysis_store_backend == "sqlite":
+        from .sqlite_store import SQLiteStoreService
+        return SQLiteStoreService()
+    return TempStoreService()
+
 # 서비스 인스턴스 생성
-chroma_store_service = TempStoreService() 
\ No newline at end of file
+chroma_store_service = create_store_service()
@@ -1,50 +1,102 @@
-from azure.search.documents import SearchClient
-from azure.search.documents.indexes import SearchIndexClient
-from azure.core.credentials import AzureKeyCredential
-from azure.storage.blob import BlobServiceClient
-from langchain_openai import AzureChatOpenAI
+import hashlib
+import logging
 import os
 import time
+from typing import List, Optional
 from ..config import settings
+from .llm_gateway import llm_gateway
+from .token_budget import token_budget_manager
+from .scoring import MATCH_SCORE_FIELDS, score_format_instruction, extract_scores
+from .leaderboard import leaderboard_service
+from .lazy import LazyService
+from .blob_inventory import blob_inventory
+from .search_backend import AzureSearchBackend, LocalSearchBackend
+from .storage_backend import create_storage_backend
+from .retriever_cache import retriever_cache
+from .metrics import observe_stage, observe_payload
+from .tracing import span, traced
+from ..logging_setup import SAMPLED
+
+logger = logging.getLogger(__name__)
+
+# 업로드 중복 확인용 내용 해시(SHA-256)를 저장하는 Blob 메타데이터 키
+CONTENT_HASH_METADATA_KEY = "content_sha256"
+
+# search_backend=local이면 Blob 인덱서를 쓰지 않으므로 인덱서 실행/상태 조회는 Azure를 호출하지 않고 이 결과를 반환
+LOCAL_INDEXER_RESULT = {
+    "status": "skipped",
+    "message": "로컬 검색 인덱스는 업로드 시 바로 색인되어 인덱서를 사용하지 않습니다.",
+    "indexers": []
+}
+
+class DocumentNotFound(Exception):
+    """검색 인덱스에서 문서를 찾을 수 없음 (인덱싱 대기 중일 수 있음)"""
 
 # settings에서 환경변수를 가져옴 (config.py에서 이미 로드됨)
 
 class DocumentAnalyzer:
-    def __init__(self):
+    def __init__(self, index_client=None, indexer_client=None, search_client_factory=None, storage=None):
+        """
+        Args:
+            index_client, indexer_client: Azure AI Search 관리 클라이언트 (없으면 설정값으로 생성)
+            search_client_factory: 인덱스 이름 → SearchClient (없으면 설정값으로 생성)
+            storage: 파일 저장소 (없으면 storage_backend 설정으로 생성)
+            
+            벤치마크/오프라인 실행은 가짜 클라이언트를 넘겨서 생성 중에도 실제 서비스를 호출하지 않도록 합니다.
+        """
+        # Azure SDK는 import 비용이 커서 인스턴스 생성 시점에 불러옴
+        from azure.core.credentials import AzureKeyCredential
+        from azure.search.documents.indexes import SearchIndexClient, SearchIndexerClient
+        
         # Azure AI Search 기본 설정
         self.search_service_name = settings.azure_ai_search_service_name
         self.search_endpoint = f"https://{self.search_service_name}.search.windows.net"
         self.search_credential = AzureKeyCredential(settings.azure_ai_search_api_key)
+        self._search_client_factory = search_client_factory or self._create_search_client
         
-        # 동적으로 인덱스 이름 찾기
-        self.index_name = self._get_active_index_name()
-        
-        # Azure AI Search 클라이언트 설정
-        self.search_client = SearchClient(
+        # 인덱스/인덱서 관리 클라이언트 (호출마다 새로 만들지 않고 재사용)
+        self.index_client = index_client or SearchIndexClient(
+            endpoint=self.search_endpoint,
+            credential=self.search_credential
+        )
+        self.indexer_client = indexer_client or SearchIndexerClient(
             endpoint=self.search_endpoint,
-            index_name=self.index_name,
             credential=self.search_credential
         )
         
-        # Azure Blob Storage 클라이언트 설정
-        if settings.azure_storage_account_name and settings.azure_storage_account_key:
-            self.blob_service_client = BlobServiceClient(
-                account_url=f"https://{settings.azure_storage_account_name}.blob.core.windows.net",
-                credential=settings.azure_storage_account_key
-            )
+        # 문서 검색 백엔드 (local이면 업로드 시점에 내장 인덱스에 색인하고 Azure AI Search를 조회하지 않음)
+        if settings.search_backend == "local":
+            self.search_backend = LocalSearchBackend(settings.local_search_dir)
+            self.index_name = self.search_backend.index_name
         else:
-            print("⚠️ Azure Storage 환경변수가 설정되지 않았습니다. 파일 업로드 기능을 사용할 수 없습니다.")
-            self.blob_service_client = None
+            # 동적으로 인덱스 이름 찾기
+            self.index_name = self._get_active_index_name()
+            
+            # Azure AI Search 클라이언트 설정
+            self.search_backend = AzureSearchBackend(
+                self._search_client_factory(self.index_name),
+                self.index_client,
+                self.index_name
+            )
         
-        self.container_name = settings.azure_storage_container_name
+        # 파일 저장소 설정 (storage_backend: Azure Blob Storage 또는 로컬 파일 시스템)
+        self.container_name = storage.container if storage is not None else settings.azure_storage_container_name
+        self.storage = storage or create_storage_backend(self.container_name)
+        if self.storage is None:
+            logger.warning("Azure Storage 환경변수가 설정되지 않았습니다. 파일 업로드 기능을 사용할 수 없습니다.")
         
-        # Azure OpenAI LLM 설정
-        self.llm = AzureChatOpenAI(
-            model=settings.azure_openai_deployment_name,
-            temperature=0,
-            api_version=settings.azure_openai_api_version,
-            azure_endpoint=settings.azure_openai_endpoint,
-            azure_deployment=settings.azure_openai_deployment_name,
+        # Azure OpenAI LLM 설정 (공용 게이트웨이 경유)
+        self.llm = llm_gateway.chat_model(
+            deployment=settings.azure_openai_deployment_name,
+            temperature=0
+        )
+    
+    def _create_search_client(self, index_name: str):
+        from azure.search.documents import SearchClient
+        return SearchClient(
+            endpoint=self.search_endpoint,
+            index_name=index_name,
+            credential=self.search_credential
         )
     
     def _get_active_index_name(self) -> str:
@@ -53,14 +105,8 @@ class DocumentAnalyzer:
         'rag-'로 시작하는 인덱스 중 가장 최신 것을 반환
         """
         try:
-            # SearchIndexClient로 인덱스 목록 조회
-            index_client = SearchIndexClient(
-                endpoint=self.search_endpoint,
-                credential=self.search_credential
-            )
-            
             # 모든 인덱스 조회
-            indexes = list(index_client.list_indexes())
+            indexes = list(self.index_client.list_indexes())
             
             # 'rag-'로 시작하는 인덱스들 필터링
             rag_indexes = [idx.name for idx in indexes if idx.name.startswith('rag-')]
@@ -68,41 +114,75 @@ class DocumentAnalyzer:
             if rag_indexes:
                 # 가장 최신 인덱스 반환 (이름 기준 정렬)
                 latest_index = sorted(rag_indexes, reverse=True)[0]
-                print(f"✅ 자동 발견된 인덱스: {latest_index}")
+                logger.info(f"자동 발견된 인덱스: {latest_index}")
                 return latest_index
             else:
                 # 기본 인덱스 이름 반환
                 fallback_index = "rag-1752025961760"
-                print(f"⚠️ rag- 인덱스를 찾을 수 없어서 기본값 사용: {fallback_index}")
+                logger.warning(f"rag- 인덱스를 찾을 수 없어서 기본값 사용: {fallback_index}")
                 return fallback_index
                 
         except Exception as e:
             # 오류 시 기본 인덱스 이름 사용
             fallback_index = "rag-1752025961760"
-            print(f"❌ 인덱스 조회 오류, 기본값 사용: {fallback_index} (오류: {str(e)})")
+            logger.error(f"인덱스 조회 오류, 기본값 사용: {fallback_index} (오류: {str(e)})")
             return fallback_index
     
+    def refresh_index(self) -> str:
+        """
+        활성 인덱스를 다시 찾고, 바뀐 경우에만 검색 클라이언트를 교체
+        
+        Returns:
+            str: 이전 인덱스 이름
+        """
+        old_index = self.index_name
+        if self.search_backend.indexes_on_upload:
+            # 로컬 인덱스는 하나뿐이라 바뀌지 않음
+            return old_index
+        self.index_name = self._get_active_index_name()
+        if self.index_name != old_index:
+            retriever_cache.invalidate(f"인덱스 변경 {old_index} → {self.index_name}")
+            self.search_backend = AzureSearchBackend(
+                self._search_client_factory(self.index_name),
+                self.index_client,
+                self.index_name
+            )
+        return old_index
+    
+    @observe_stage("blob_upload")
     def upload_file_to_storage(self, file_content: bytes, filename: str) -> dict:
-        """파일을 Azure Blob Storage에 업로드"""
+        """파일을 저장소(Azure Blob Storage 또는 로컬)에 업로드"""
         try:
-            if self.blob_service_client is None:
+            if self.storage is None:
                 return {
                     "status": "error",
                     "message": "Azure Storage가 설정되지 않았습니다."
                 }
             
-            blob_client = self.blob_service_client.get_blob_client(
-                container=self.container_name,
-                blob=filename
-            )
+            # 같은 내용이 이미 저장되어 있으면 업로드 생략 (Blob이 바뀌지 않아 인덱서 재처리/인덱싱 대기가 필요 없음)
+            content_hash = hashlib.sha256(file_content).hexdigest()
+            if settings.upload_dedupe_enabled and self._stored_content_hash(filename) == content_hash:
+                logger.info(f"같은 내용의 파일이 이미 있어 업로드 생략: {filename}")
+                # 로컬 인덱스가 비어 있는 경우(다른 서버에서 올린 파일 등)에도 검색되도록 (같은 내용이면 바로 반환)
+                self._index_on_upload(file_content, filename)
+                return {
+                    "status": "success",
+                    "message": f"파일 '{filename}'이 이미 같은 내용으로 저장되어 있습니다.",
+                    "filename": filename,
+                    "deduplicated": True
+                }
             
-            # 파일 업로드
-            blob_client.upload_blob(file_content, overwrite=True)
+            # 파일 업로드 (다음 업로드와 비교할 수 있도록 내용 해시를 메타데이터에 저장)
+            observe_payload("blob_upload", len(file_content))
+            self.storage.put(filename, file_content, metadata={CONTENT_HASH_METADATA_KEY: content_hash})
+            blob_inventory.invalidate(self.container_name)
+            self._index_on_upload(file_content, filename)
             
             return {
                 "status": "success",
                 "message": f"파일 '{filename}'이 성공적으로 업로드되었습니다.",
-                "filename": filename
+                "filename": filename,
+                "deduplicated": False
             }
         except Exception as e:
             return {
@@ -110,6 +190,25 @@ class DocumentAnalyzer:
                 "message": f"파일 업로드 중 오류 발생: {str(e)}"
             }
     
+    def _index_on_upload(self, file_content: bytes, filename: str):
+        """업로드 시점 색인을 지원하는 검색 백엔드(local)에 바로 색인 (실패해도 업로드는 성공으로 처리)"""
+        if not self.search_backend.indexes_on_upload:
+            return
+        try:
+            if not self.search_backend.index_document(filename, file_content):
+                logger.warning(f"검색 인덱스에 색인할 수 없는 파일: {filename}")
+        except Exception as e:
+            logger.error(f"검색 인덱스 색인 오류: {filename} ({str(e)})")
+    
+    def _stored_content_hash(self, filename: str) -> Optional[str]:
+        """저장된 Blob의 내용 해시 (Blob이 없거나 해시 메타데이터가 없으면 None)"""
+        try:
+            stored = self.storage.properties(filename)
+            return stored.metadata.get(CONTENT_HASH_METADATA_KEY) if stored else None
+        except Exception as e:
+            logger.warning(f"Blob 속성 조회 실패, 업로드 진행: {str(e)}")
+            return None
+    
     def upload_resume(self, file_content: bytes, filename: str) -> dict:
         """이력서 파일 업로드"""
         # 이력서 파일명 앞에 prefix 추가
@@ -122,6 +221,7 @@ class DocumentAnalyzer:
         job_filename = f"job_{filename}"
         return self.upload_file_to_storage(file_content, job_filename)
     
+    @observe_stage("search_read")
     def read_resume_file(self, filename: str) -> str:
         """이력서 파일 읽기 (AI Search에서)"""
         try:
@@ -129,7 +229,7 @@ class DocumentAnalyzer:
             if not filename.startswith("resume_"):
                 filename = f"resume_{filename}"
             
-            print(f"🔍 이력서 파일 검색: {filename}")
+            logger.debug(f"이력서 파일 검색: {filename}")
             
             # 인덱스 스키마 확인
             schema_info = self.get_index_schema()
@@ -137,7 +237,7 @@ class DocumentAnalyzer:
                 return f"인덱스 스키마 조회 실패: {schema_info['message']}"
             
             available_fields = schema_info["fields"]
-            print(f"📋 사용 가능한 필드들: {available_fields}")
+            logger.debug(f"사용 가능한 필드들: {available_fields}")
             
             # 사용할 필드들 결정
             content_fields = []
@@ -147,7 +247,7 @@ class DocumentAnalyzer:
             for field in ["title", "metadata_storage_name", "metadata_storage_path", "filename", "name"]:
                 if field in available_fields:
                     filename_field = field
-                    print(f"✅ 파일명 필드로 '{field}' 사용")
+                    logger.debug(f"파일명 필드로 '{field}' 사용")
                     break
             
             # 컨텐츠를 위한 필드들 찾기
@@ -155,18 +255,18 @@ class DocumentAnalyzer:
                 if field in available_fields:
                     content_fields.append(field)
             
-            print(f"✅ 컨텐츠 필드들: {content_fields}")
+            logger.debug(f"컨텐츠 필드들: {content_fields}")
             
             if not filename_field:
-                print("⚠️ 파일명 필드를 찾을 수 없어서 전체 검색으로 진행합니다")
+                logger.warning("파일명 필드를 찾을 수 없어서 전체 검색으로 진행합니다")
                 # 전체 검색으로 진행
-                all_results = self.search_client.search(
+                all_results = self.search_backend.search(
                     search_text="*",
                     top=10,
                     select=content_fields
                 )
                 
-                print("📋 AI Search에서 찾은 문서들:")
+                logger.debug("AI Search에서 찾은 문서들:")
                 doc_count = 0
                 for result in all_results:
                     doc_count += 1
@@ -175,9 +275,9 @@ class DocumentAnalyzer:
                         field_content = result.get(field, "")
                         if field_content and len(field_content) > len(content):
                             content = field_content
-                    print(f"  - 문서 {doc_count}: 내용 길이 {len(content)}자")
+                    logger.debug(f"- 문서 {doc_count}: 내용 길이 {len(content)}자", extra=SAMPLED)
                     if filename.lower() in content.lower() and len(content) > 100:
-                        print(f"  ✅ 파일명이 포함된 문서 발견!")
+                        logger.debug(f"파일명이 포함된 문서 발견: {filename}")
                         return content
                 
                 return f"이력서 파일 '{filename}'을 찾을 수 없습니다"
@@ -185,20 +285,21 @@ class DocumentAnalyzer:
             # 파일명 필드가 있는 경우 정확한 검색
             select_fields = [filename_field] + content_fields
             
-            # 먼저 모든 문서를 검색해서 어떤 파일들이 있는지 확인
-            try:
-                all_results = self.search_client.search(
-                    search_text="*",
-                    top=10,
-                    select=select_fields
-                )
-                
-                print("📋 AI Search에서 찾은 파일들:")
-                for result in all_results:
-                    storage_name = result.get(filename_field, "")
-                    print(f"  - {storage_name}")
-            except Exception as e:
-                print(f"⚠️ 전체 문서 조회 오류: {str(e)}")
+            # 먼저 모든 문서를 검색해서 어떤 파일들이 있는지 확인 (디버그 로그용이므로 DEBUG일 때만 조회)
+            if logger.isEnabledFor(logging.DEBUG):
+                try:
+                    all_results = self.search_backend.search(
+                        search_text="*",
+                        top=10,
+                        select=select_fields
+                    )
+                    
+                    logger.debug("AI Search에서 찾은 파일들:")
+                    for result in all_results:
+                        storage_name = result.get(filename_field, "")
+                        logger.debug(f"- {storage_name}", extra=SAMPLED)
+                except Exception as e:
+                    logger.warning(f"전체 문서 조회 오류: {str(e)}")
             
             # 다양한 검색 방식으로 시도
             search_queries = [
@@ -210,15 +311,15 @@ class DocumentAnalyzer:
             
             for i, search_query in enumerate(search_queries):
                 try:
-                    print(f"🔍 검색 시도 {i+1}: '{search_query}'")
-                    results = self.search_client.search(
+                    logger.debug(f"검색 시도 {i+1}: '{search_query}'")
+                    results = self.search_backend.search(
                         search_text=search_query,
                         top=5,
                         select=select_fields
                     )
                     
                     results_list = list(results)
-                    print(f"   → {len(results_list)}개 결과")
+                    logger.debug(f"→ {len(results_list)}개 결과", extra=SAMPLED)
                     
                     for result in results_list:
                         storage_name = result.get(filename_field, "")
@@ -228,8 +329,7 @@ class DocumentAnalyzer:
                             if field_content and len(field_content) > len(content):
                                 content = field_content
                         
-                        print(f"  - 파일: {storage_name}")
-                        print(f"    내용 길이: {len(content)}자")
+                        logger.debug(f"- 파일: {storage_name}, 내용 길이: {len(content)}자", extra=SAMPLED)
                         
                         # 파일명 매칭 조건들
                         original_filename = filename.replace("resume_", "").replace("job_", "")
@@ -241,16 +341,16 @@ class DocumentAnalyzer:
                         ]
                         
                         if any(match_conditions) and content and len(content) > 50:
-                            print(f"  ✅ 매칭 성공: {storage_name}")
+                            logger.debug(f"매칭 성공: {storage_name}")
                             return content
                             
                 except Exception as e:
-                    print(f"⚠️ 검색 시도 {i+1} 오류: {str(e)}")
+                    logger.warning(f"검색 시도 {i+1} 오류: {str(e)}")
             
             # 모든 문서를 검색해서 사용 가능한 파일 목록 표시
-            print("📋 현재 인덱스에 있는 모든 파일:")
+            logger.debug("현재 인덱스에 있는 모든 파일:")
             try:
-                all_results = self.search_client.search(
+                all_results = self.search_backend.search(
                     search_text="*",
                     top=10,
                     select=select_fields
@@ -261,7 +361,7 @@ class DocumentAnalyzer:
                     storage_name = result.get(filename_field, "")
                     if storage_name:
                         available_files.append(storage_name)
-                        print(f"  - {storage_name}")
+                        logger.debug(f"- {storage_name}", extra=SAMPLED)
                 
                 if available_files:
                     suggestion_msg = f"\n💡 '{filename}' 파일을 찾을 수 없습니다.\n"
@@ -272,132 +372,146 @@ class DocumentAnalyzer:
                     return f"인덱스에 문서가 없습니다. 파일을 업로드해주세요."
                         
             except Exception as e:
-                print(f"⚠️ 전체 파일 목록 조회 오류: {str(e)}")
+                logger.warning(f"전체 파일 목록 조회 오류: {str(e)}")
                 return f"이력서 파일 '{filename}'을 찾을 수 없습니다. (AI Search 인덱싱 대기 중일 수 있습니다)"
         except Exception as e:
-            print(f"❌ 이력서 파일 읽기 오류: {str(e)}")
+            logger.error(f"이력서 파일 읽기 오류: {str(e)}")
             return f"이력서 파일 읽기 오류: {str(e)}"
     
     def read_job_posting_file(self, filename: str) -> str:
-        """채용공고 파일 읽기 (AI Search에서)"""
+        """채용공고 파일 읽기 (AI Search에서, 실패하면 오류 메시지를 내용 대신 반환)"""
         try:
-            # job_ prefix가 없으면 추가
-            if not filename.startswith("job_"):
-                filename = f"job_{filename}"
-            
-            print(f"🔍 채용공고 파일 검색: {filename}")
-            
-            # 인덱스 스키마 확인 (캐시된 결과 사용 가능)
-            schema_info = self.get_index_schema()
-            if schema_info["status"] == "error":
-                return f"인덱스 스키마 조회 실패: {schema_info['message']}"
-            
-            available_fields = schema_info["fields"]
-            
-            # 사용할 필드들 결정
-            content_fields = []
-            filename_field = None
+            return self.find_job_posting_file(filename)
+        except DocumentNotFound as e:
+            return str(e)
+        except Exception as e:
+            logger.error(f"채용공고 파일 읽기 오류: {str(e)}")
+            return f"채용공고 파일 읽기 오류: {str(e)}"
+    
+    @observe_stage("search_read")
+    def find_job_posting_file(self, filename: str) -> str:
+        """
+        채용공고 파일 내용 (AI Search에서)
+        
+        Raises:
+            DocumentNotFound: 인덱스에서 찾을 수 없음
+            Exception: 인덱스 스키마 조회 실패 등 검색 오류
+        """
+        # job_ prefix가 없으면 추가
+        if not filename.startswith("job_"):
+            filename = f"job_{filename}"
+        
+        logger.debug(f"채용공고 파일 검색: {filename}")
+        
+        # 인덱스 스키마 확인 (캐시된 결과 사용 가능)
+        schema_info = self.get_index_schema()
+        if schema_info["status"] == "error":
+            raise RuntimeError(f"인덱스 스키마 조회 실패: {schema_info['message']}")
+        
+        available_fields = schema_info["fields"]
+        
+        # 사용할 필드들 결정
+        content_fields = []
+        filename_field = None
+        
+        # 파일명을 위한 필드 찾기
+        for field in ["metadata_storage_name", "metadata_storage_path", "filename", "name", "title"]:
+            if field in available_fields:
+                filename_field = field
+                break
+        
+        # 컨텐츠를 위한 필드들 찾기
+        for field in ["content", "chunk", "text", "body"]:
+            if field in available_fields:
+                content_fields.append(field)
+        
+        if not filename_field:
+            logger.warning("파일명 필드를 찾을 수 없어서 전체 검색으로 진행합니다")
+            # 전체 검색으로 진행
+            all_results = self.search_backend.search(
+                search_text="*",
+                top=10,
+                select=content_fields
+            )
             
-            # 파일명을 위한 필드 찾기
-            for field in ["metadata_storage_name", "metadata_storage_path", "filename", "name", "title"]:
-                if field in available_fields:
-                    filename_field = field
-                    break
+            for result in all_results:
+                content = ""
+                for field in content_fields:
+                    field_content = result.get(field, "")
+                    if field_content and len(field_content) > len(content):
+                        content = field_content
+                if filename.lower() in content.lower() and len(content) > 100:
+                    logger.debug(f"파일명이 포함된 문서 발견: {filename}")
+                    return content
+            
+            raise DocumentNotFound(f"채용공고 파일 '{filename}'을 찾을 수 없습니다")
+        
+        # 파일명 필드가 있는 경우 정확한 검색
+        select_fields = [filename_field] + content_fields
+        
+        # 정확한 파일명으로 검색
+        try:
+            results = self.search_backend.search(
+                search_text=f"{filename_field}:{filename}",
+                top=1,
+                select=select_fields
+            )
             
-            # 컨텐츠를 위한 필드들 찾기
-            for field in ["content", "chunk", "text", "body"]:
-                if field in available_fields:
-                    content_fields.append(field)
+            results_list = list(results)
+            logger.debug(f"'{filename}' 검색 결과: {len(results_list)}개")
             
-            if not filename_field:
-                print("⚠️ 파일명 필드를 찾을 수 없어서 전체 검색으로 진행합니다")
-                # 전체 검색으로 진행
-                all_results = self.search_client.search(
-                    search_text="*",
-                    top=10,
-                    select=content_fields
-                )
+            for result in results_list:
+                storage_name = result.get(filename_field, "")
+                content = ""
+                for field in content_fields:
+                    field_content = result.get(field, "")
+                    if field_content and len(field_content) > len(content):
+                        content = field_content
                 
-                for result in all_results:
-                    content = ""
-                    for field in content_fields:
-                        field_content = result.get(field, "")
-                        if field_content and len(field_content) > len(content):
-                            content = field_content
-                    if filename.lower() in content.lower() and len(content) > 100:
-                        print(f"  ✅ 파일명이 포함된 문서 발견!")
-                        return content
-                
-                return f"채용공고 파일 '{filename}'을 찾을 수 없습니다"
-            
-            # 파일명 필드가 있는 경우 정확한 검색
-            select_fields = [filename_field] + content_fields
+                logger.debug(f"- 파일: {storage_name}, 내용 길이: {len(content)}자", extra=SAMPLED)
+                if content:
+                    return content
+        except Exception as e:
+            logger.warning(f"정확한 파일명 검색 오류: {str(e)}")
+        
+        # 파일명 부분 매칭으로 재시도
+        logger.debug(f"부분 매칭으로 재시도: {filename}")
+        try:
+            results = self.search_backend.search(
+                search_text=filename,
+                top=5,
+                select=select_fields
+            )
             
-            # 정확한 파일명으로 검색
-            try:
-                results = self.search_client.search(
-                    search_text=f"{filename_field}:{filename}",
-                    top=1,
-                    select=select_fields
-                )
-                
-                results_list = list(results)
-                print(f"🔍 '{filename}' 검색 결과: {len(results_list)}개")
-                
-                for result in results_list:
-                    storage_name = result.get(filename_field, "")
+            for result in results:
+                storage_name = result.get(filename_field, "")
+                if filename in storage_name:
                     content = ""
                     for field in content_fields:
                         field_content = result.get(field, "")
                         if field_content and len(field_content) > len(content):
                             content = field_content
                     
-                    print(f"  - 파일: {storage_name}, 내용 길이: {len(content)}자")
+                    logger.debug(f"부분 매칭 성공: {storage_name}")
                     if content:
                         return content
-            except Exception as e:
-                print(f"⚠️ 정확한 파일명 검색 오류: {str(e)}")
-            
-            # 파일명 부분 매칭으로 재시도
-            print(f"🔍 부분 매칭으로 재시도: {filename}")
-            try:
-                results = self.search_client.search(
-                    search_text=filename,
-                    top=5,
-                    select=select_fields
-                )
-                
-                for result in results:
-                    storage_name = result.get(filename_field, "")
-                    if filename in storage_name:
-                        content = ""
-                        for field in content_fields:
-                            field_content = result.get(field, "")
-                            if field_content and len(field_content) > len(content):
-                                content = field_content
-                        
-                        print(f"  ✅ 부분 매칭 성공: {storage_name}")
-                        if content:
-                            return content
-            except Exception as e:
-                print(f"⚠️ 부분 매칭 검색 오류: {str(e)}")
-            
-            return f"채용공고 파일 '{filename}'을 찾을 수 없습니다. (AI Search 인덱싱 대기 중일 수 있습니다)"
         except Exception as e:
-            print(f"❌ 채용공고 파일 읽기 오류: {str(e)}")
-            return f"채용공고 파일 읽기 오류: {str(e)}"
+            logger.warning(f"부분 매칭 검색 오류: {str(e)}")
+        
+        raise DocumentNotFound(f"채용공고 파일 '{filename}'을 찾을 수 없습니다. (AI Search 인덱싱 대기 중일 수 있습니다)")
     
+    @observe_stage("index_wait")
     def wait_for_indexing(self, filename: str, max_wait_time: int = 30) -> bool:
         """AI Search 인덱싱 완료 대기"""
         try:
             # 인덱스 스키마 확인
             schema_info = self.get_index_schema()
             if schema_info["status"] == "error":
-                print(f"⚠️ 스키마 조회 실패, 기본 방식으로 대기: {schema_info['message']}")
+                logger.warning(f"스키마 조회 실패, 기본 방식으로 대기: {schema_info['message']}")
                 # 기본 방식으로 대기
                 for _ in range(max_wait_time):
                     try:
-                        results = self.search_client.search(
+                        results = self.search_backend.search(
                             search_text=filename,
                             top=1
                         )
@@ -424,11 +538,11 @@ class DocumentAnalyzer:
                     content_fields.append(field)
             
             if not filename_field or not content_fields:
-                print(f"⚠️ 필요한 필드를 찾을 수 없어서 기본 검색으로 대기")
+                logger.warning("필요한 필드를 찾을 수 없어서 기본 검색으로 대기")
                 # 기본 방식으로 대기
                 for _ in range(max_wait_time):
                     try:
-                        results = self.search_client.search(
+                        results = self.search_backend.search(
                             search_text=filename,
                             top=1
                         )
@@ -443,7 +557,7 @@ class DocumentAnalyzer:
             
             for i in range(max_wait_time):
                 try:
-                    results = self.search_client.search(
+                    results = self.search_backend.search(
                         search_text=f"{filename_field}:{filename}",
                         top=1,
                         select=select_fields
@@ -458,21 +572,22 @@ class DocumentAnalyzer:
                                 content = field_content
                         
                         if content:
-                            print(f"✅ 파일 '{filename}' 인덱싱 완료 (대기 시간: {i+1}초)")
+                            logger.info(f"파일 '{filename}' 인덱싱 완료 (대기 시간: {i+1}초)")
                             return True
                     
                     time.sleep(1)  # 1초 대기
                 except Exception as e:
-                    print(f"⚠️ 인덱싱 대기 중 오류 ({i+1}/{max_wait_time}): {str(e)}")
+                    logger.warning(f"인덱싱 대기 중 오류 ({i+1}/{max_wait_time}): {str(e)}")
                     time.sleep(1)
             
-            print(f"❌ 파일 '{filename}' 인덱싱 대기 시간 초과 ({max_wait_time}초)")
+            logger.error(f"파일 '{filename}' 인덱싱 대기 시간 초과 ({max_wait_time}초)")
             return False
             
         except Exception as e:
-            print(f"❌ 인덱싱 대기 함수 오류: {str(e)}")
+            logger.error(f"인덱싱 대기 함수 오류: {str(e)}")
             return False
     
+    @traced("analyze_match")
     def analyze_match(self, resume_content: str, job_content: str) -> dict:
         """이력서-채용공고 매칭 분석"""
         try:
@@ -502,9 +617,10 @@ class DocumentAnalyzer:
                     "message": f"채용공고 내용이 너무 짧습니다: {len(job_content)}자"
                 }
             
-            print(f"📊 분석 시작 - 이력서: {len(resume_content)}자, 채용공고: {len(job_content)}자")
+            logger.info(f"분석 시작 - 이력서: {len(resume_content)}자, 채용공고: {len(job_content)}자")
             
-            prompt = f"""
+            def build_prompt(job_content: str, resume_content: str) -> str:
+                return f"""
 당신은 전문 채용 컨설턴트입니다. 다음 채용공고와 지원자 이력서를 분석하여 매칭도를 평가해주세요.
 
 **채용공고:**
@@ -536,40 +652,39 @@ class DocumentAnalyzer:
 3. [문제 해결 질문]
 4. [협업/소통 질문]
 5. [성장 가능성 질문]
-"""
+""" + score_format_instruction(MATCH_SCORE_FIELDS)
+            
+            # 토큰 예산을 넘는 원문은 정책(압축/자르기)에 따라 줄여서 전송
+            with span("prompt_budget"):
+                prompt, token_usage = token_budget_manager.fit(
+                    "analyze_match", build_prompt,
+                    job_content=job_content, resume_content=resume_content
+                )
             
             result = self.llm.invoke(prompt)
+            analysis, scores = extract_scores(result.content, MATCH_SCORE_FIELDS)
             
             return {
                 "status": "success",
-                "analysis": result.content
+                "analysis": analysis,
+                "scores": scores,
+                "token_usage": token_budget_manager.completion_usage(token_usage, result)
             }
             
         except Exception as e:
-            print(f"❌ 분석 중 오류: {str(e)}")
+            logger.error(f"분석 중 오류: {str(e)}")
             return {
                 "status": "error",
                 "message": f"분석 중 오류 발생: {str(e)}"
             }
 
+    @traced("index_schema")
     def get_index_schema(self) -> dict:
-        """Azure AI Search 인덱스 스키마 조회"""
+        """검색 인덱스 스키마(필드 목록) 조회"""
         try:
-            from azure.search.documents.indexes import SearchIndexClient
-            
-            index_client = SearchIndexClient(
-                endpoint=self.search_endpoint,
-                credential=self.search_credential
-            )
-            
-            # 현재 인덱스 정보 조회
-            index = index_client.get_index(self.index_name)
-            
-            print(f"📋 인덱스 '{self.index_name}' 스키마:")
-            field_names = []
-            for field in index.fields:
-                print(f"  - {field.name} ({field.type})")
-                field_names.append(field.name)
+            # 현재 인덱스 필드 조회
+            field_names = self.search_backend.field_names()
+            logger.debug(f"인덱스 '{self.index_name}' 필드: {field_names}", extra=SAMPLED)
             
             return {
                 "status": "success",
@@ -578,25 +693,23 @@ class DocumentAnalyzer:
             }
             
         except Exception as e:
-            print(f"❌ 인덱스 스키마 조회 오류: {str(e)}")
+            logger.error(f"인덱스 스키마 조회 오류: {str(e)}")
             return {
                 "status": "error",
                 "message": f"인덱스 스키마 조회 오류: {str(e)}"
             }
 
     def get_blob_files_list(self) -> dict:
-        """Azure Blob Storage에서 파일 목록 조회"""
+        """저장소에서 파일 목록 조회"""
         try:
-            if self.blob_service_client is None:
+            if self.storage is None:
                 return {
                     "status": "error",
                     "message": "Azure Storage가 설정되지 않았습니다."
                 }
             
-            # 컨테이너의 모든 blob 목록 조회
-            blob_list = self.blob_service_client.get_container_client(
-                self.container_name
-            ).list_blobs()
+            # 컨테이너의 모든 blob 목록 조회 (인벤토리 캐시가 유효하면 저장소를 조회하지 않음)
+            blob_list, inventory_etag = blob_inventory.entries(self.container_name, self.storage.list)
             
             resume_files = []
             job_files = []
@@ -604,23 +717,23 @@ class DocumentAnalyzer:
             
             for blob in blob_list:
                 file_info = {
-                    "name": blob.name,
-                    "size": blob.size,
-                    "last_modified": blob.last_modified.isoformat() if blob.last_modified else None
+                    "name": blob["name"],
+                    "size": blob["size"],
+                    "last_modified": blob["last_modified"].isoformat() if blob["last_modified"] else None
                 }
                 
                 # 모든 파일 목록에 추가
                 all_files.append(file_info)
                 
-                if blob.name.startswith("resume_"):
+                if blob["name"].startswith("resume_"):
                     resume_files.append({
                         **file_info,
-                        "display_name": blob.name.replace("resume_", "")
+                        "display_name": blob["name"].replace("resume_", "")
                     })
-                elif blob.name.startswith("job_"):
+                elif blob["name"].startswith("job_"):
                     job_files.append({
                         **file_info,
-                        "display_name": blob.name.replace("job_", "")
+                        "display_name": blob["name"].replace("job_", "")
                     })
             
             # 최신 파일 순으로 정렬
@@ -633,11 +746,12 @@ class DocumentAnalyzer:
                 "resume_files": resume_files,
                 "job_files": job_files,
                 "files": all_files,  # 모든 파일 목록 추가
-                "total_files": len(all_files)
+                "total_files": len(all_files),
+                "inventory_etag": inventory_etag  # 조건부 GET용 (라우터에서 ETag 헤더로 옮김)
             }
             
         except Exception as e:
-            print(f"❌ Blob 파일 목록 조회 오류: {str(e)}")
+            logger.error(f"Blob 파일 목록 조회 오류: {str(e)}")
             return {
                 "status": "error",
                 "message": f"파일 목록 조회 중 오류 발생: {str(e)}"
@@ -646,19 +760,19 @@ class DocumentAnalyzer:
     def debug_search_index(self) -> dict:
         """Azure AI Search 인덱스의 모든 문서와 스키마 정보를 디버깅용으로 조회"""
         try:
-            print(f"🔍 인덱스 '{self.index_name}' 디버깅 시작...")
+            logger.debug(f"인덱스 '{self.index_name}' 디버깅 시작...")
             
             # 1. 스키마 정보 조회
             schema_info = self.get_index_schema()
             if schema_info["status"] == "error":
                 return schema_info
             
-            print(f"📋 사용 가능한 필드들: {schema_info['fields']}")
+            logger.debug(f"사용 가능한 필드들: {schema_info['fields']}")
             
             # 2. 모든 문서 조회 (필드 제한 없이)
             try:
-                print("📋 모든 문서 조회 중...")
-                all_results = self.search_client.search(
+                logger.debug("모든 문서 조회 중...")
+                all_results = self.search_backend.search(
                     search_text="*",
                     top=20,  # 최대 20개 문서
                     include_total_count=True
@@ -669,7 +783,7 @@ class DocumentAnalyzer:
                 for result in all_results:
                     count += 1
                     doc_info = {}
-                    print(f"\n📄 문서 {count}:")
+                    logger.debug(f"문서 {count}:")
                     
                     # 각 필드의 실제 값 출력
                     for field_name in schema_info['fields']:
@@ -680,12 +794,12 @@ class DocumentAnalyzer:
                                 display_value = field_value[:100] + "..."
                             else:
                                 display_value = field_value
-                            print(f"  - {field_name}: {display_value}")
+                            logger.debug(f"- {field_name}: {display_value}", extra=SAMPLED)
                             doc_info[field_name] = field_value
                     
                     documents.append(doc_info)
                 
-                print(f"\n✅ 총 {count}개 문서 조회 완료")
+                logger.debug(f"총 {count}개 문서 조회 완료")
                 
                 return {
                     "status": "success",
@@ -695,7 +809,7 @@ class DocumentAnalyzer:
                 }
                 
             except Exception as e:
-                print(f"❌ 문서 조회 오류: {str(e)}")
+                logger.error(f"문서 조회 오류: {str(e)}")
                 return {
                     "status": "error",
                     "message": f"문서 조회 오류: {str(e)}",
@@ -703,25 +817,30 @@ class DocumentAnalyzer:
                 }
                 
         except Exception as e:
-            print(f"❌ 디버깅 함수 오류: {str(e)}")
+            logger.error(f"디버깅 함수 오류: {str(e)}")
             return {
                 "status": "error",
                 "message": f"디버깅 함수 오류: {str(e)}"
             }
 
-    def run_indexer(self) -> dict:
-        """Azure AI Search 인덱서를 수동으로 실행하여 Blob Storage의 새 파일들을 인덱싱"""
+    @observe_stage("indexer_trigger")
+    def run_indexer(self, indexer_names: Optional[List[str]] = None) -> dict:
+        """
+        Azure AI Search 인덱서를 수동으로 실행하여 Blob Storage의 새 파일들을 인덱싱
+        
+        Args:
+            indexer_names: 실행할 인덱서 이름 (지정하지 않으면 모든 인덱서)
+        """
+        if self.search_backend.indexes_on_upload:
+            return dict(LOCAL_INDEXER_RESULT)
         try:
-            from azure.search.documents.indexes import SearchIndexerClient
-            
-            indexer_client = SearchIndexerClient(
-                endpoint=self.search_endpoint,
-                credential=self.search_credential
-            )
+            indexer_client = self.indexer_client
             
             # 모든 인덱서 목록 조회
             indexers = list(indexer_client.get_indexers())
-            print(f"📋 사용 가능한 인덱서들:")
+            if indexer_names is not None:
+                indexers = [indexer for indexer in indexers if indexer.name in indexer_names]
+            logger.debug("사용 가능한 인덱서들:")
             
             if not indexers:
                 return {
@@ -731,16 +850,18 @@ class DocumentAnalyzer:
             
             results = []
             for indexer in indexers:
-                print(f"  - {indexer.name}")
+                logger.debug(f"- {indexer.name}", extra=SAMPLED)
                 
                 try:
                     # 인덱서 상태 확인
                     status = indexer_client.get_indexer_status(indexer.name)
-                    print(f"    현재 상태: {status.status}")
-                    print(f"    마지막 실행: {status.last_result.end_time if status.last_result else 'N/A'}")
+                    logger.debug(
+                        f"  현재 상태: {status.status}, 마지막 실행: {status.last_result.end_time if status.last_result else 'N/A'}",
+                        extra=SAMPLED
+                    )
                     
                     # 인덱서 실행
-                    print(f"🚀 인덱서 '{indexer.name}' 실행 중...")
+                    logger.info(f"인덱서 '{indexer.name}' 실행 중...")
                     indexer_client.run_indexer(indexer.name)
                     
                     results.append({
@@ -751,11 +872,12 @@ class DocumentAnalyzer:
                     
                 except Exception as e:
                     error_msg = f"인덱서 '{indexer.name}' 실행 오류: {str(e)}"
-                    print(f"❌ {error_msg}")
+                    logger.error(error_msg)
                     results.append({
                         "indexer_name": indexer.name,
                         "status": "error",
-                        "message": error_msg
+                        "message": error_msg,
+                        "status_code": getattr(e, "status_code", None)  # 409: 이미 실행 중
                     })
             
             return {
@@ -766,21 +888,38 @@ class DocumentAnalyzer:
             
         except Exception as e:
             error_msg = f"인덱서 실행 중 오류: {str(e)}"
-            print(f"❌ {error_msg}")
+            logger.error(error_msg)
             return {
                 "status": "error", 
                 "message": error_msg
             }
 
+    def get_indexer_status_info(self, indexer_name: str) -> dict:
+        """인덱서 하나의 상태 조회 (execution_status가 inProgress이면 실행 중)"""
+        status = self.indexer_client.get_indexer_status(indexer_name)
+        
+        indexer_info = {
+            "name": indexer_name,
+            "status": status.status.value if status.status else "unknown",
+            "last_execution": status.last_result.end_time.isoformat() if status.last_result and status.last_result.end_time else None,
+            "execution_status": status.last_result.status.value if status.last_result and status.last_result.status else "unknown",
+            "items_processed": status.last_result.item_count if status.last_result else 0,
+            "errors": len(status.last_result.errors) if status.last_result and status.last_result.errors else 0
+        }
+        
+        logger.debug(
+            f"인덱서 '{indexer_name}': 상태 {indexer_info['status']}, 마지막 실행 {indexer_info['last_execution']}, "
+            f"처리된 항목 {indexer_info['items_processed']}, 오류 수 {indexer_info['errors']}",
+            extra=SAMPLED
+        )
+        return indexer_info
+    
     def check_indexer_status(self) -> dict:
         """모든 인덱서의 상태를 확인"""
+        if self.search_backend.indexes_on_upload:
+            return dict(LOCAL_INDEXER_RESULT)
         try:
-            from azure.search.documents.indexes import SearchIndexerClient
-            
-            indexer_client = SearchIndexerClient(
-                endpoint=self.search_endpoint,
-                credential=self.search_credential
-            )
+            indexer_client = self.indexer_client
             
             indexers = list(indexer_client.get_indexers())
             if not indexers:
@@ -792,27 +931,9 @@ class DocumentAnalyzer:
             indexer_statuses = []
             for indexer in indexers:
                 try:
-                    status = indexer_client.get_indexer_status(indexer.name)
-                    
-                    indexer_info = {
-                        "name": indexer.name,
-                        "status": status.status.value if status.status else "unknown",
-                        "last_execution": status.last_result.end_time.isoformat() if status.last_result and status.last_result.end_time else None,
-                        "execution_status": status.last_result.status.value if status.last_result and status.last_result.status else "unknown",
-                        "items_processed": status.last_result.item_count if status.last_result else 0,
-                        "errors": len(status.last_result.errors) if status.last_result and status.last_result.errors else 0
-                    }
-                    
-                    indexer_statuses.append(indexer_info)
-                    
-                    print(f"📊 인덱서 '{indexer.name}':")
-                    print(f"  - 상태: {indexer_info['status']}")
-                    print(f"  - 마지막 실행: {indexer_info['last_execution']}")
-                    print(f"  - 처리된 항목: {indexer_info['items_processed']}")
-                    print(f"  - 오류 수: {indexer_info['errors']}")
-                    
+                    indexer_statuses.append(self.get_indexer_status_info(indexer.name))
                 except Exception as e:
-                    print(f"❌ 인덱서 '{indexer.name}' 상태 조회 오류: {str(e)}")
+                    logger.error(f"인덱서 '{indexer.name}' 상태 조회 오류: {str(e)}")
             
             return {
                 "status": "success",
@@ -821,14 +942,19 @@ class DocumentAnalyzer:
             
         except Exception as e:
             error_msg = f"인덱서 상태 확인 중 오류: {str(e)}"
-            print(f"❌ {error_msg}")
+            logger.error(error_msg)
             return {
                 "status": "error",
                 "message": error_msg
             }
 
-# 전역 인스턴스 생성
-document_analyzer = DocumentAnalyzer()
+def extract_overall_score(analysis_result: dict) -> Optional[int]:
+    """분석 결과의 '전반적 적합도' 점수 (구조화 점수가 없으면 마크다운에서 추출, 없으면 None)"""
+    scores = analysis_result.get("scores") or extract_scores(analysis_result.get("analysis", ""), MATCH_SCORE_FIELDS)[1]
+    return scores.get("overall_fit")
+
+# 전역 인스턴스 (첫 사용 시 생성: 인덱스 조회 등 네트워크 호출이 import 시점에 일어나지 않도록)
+document_analyzer = LazyService(DocumentAnalyzer, "document_analyzer")
 
 # 파일 업로드 함수들
 def upload_resume_file(file_content: bytes, filename: str) -> dict:
@@ -848,12 +974,19 @@ def read_job_posting(filename: str) -> str:
     """채용공고 파일 읽기"""
     return document_analyzer.read_job_posting_file(filename)
 
+def find_job_posting(filename: str) -> str:
+    """채용공고 파일 읽기 (찾을 수 없으면 DocumentNotFound)"""
+    return document_analyzer.find_job_posting_file(filename)
+
 # 종합 분석 함수
 def analyze_candidate_match(resume_file: str, job_file: str) -> dict:
     """이력서-채용공고 종합 분석"""
     resume_content = read_resume(resume_file)
     job_content = read_job_posting(job_file)
-    return document_analyzer.analyze_match(resume_content, job_content)
+    result = document_analyzer.analyze_match(resume_content, job_content)
+    if result.get("status") == "success":
+        leaderboard_service.record_document_scores(job_file, resume_file, result["scores"])
+    return result
 
 # 인덱싱 대기 함수
 def wait_for_file_indexing(filename: str, max_wait_time: int = 30) -> bool:
@@ -0,0 +1,188 @@
+"""
+인덱서 상태 백그라운드 모니터
+
+/indexer-status와 인덱싱 대기 로직이 호출할 때마다 인덱서 목록 + 인덱서별 상태를 순서대로 조회(N+1회)하지 않도록
+백그라운드 스레드가 상태를 주기적으로 (인덱서별로 동시에) 조회해 최신 스냅샷을 메모리에 보관합니다.
+
+- 실행 중이거나 인덱서를 막 실행한 직후에는 indexer_monitor_active_seconds 간격, 그 외에는 indexer_monitor_idle_seconds 간격으로 조회
+- 인덱서 목록은 indexer_monitor_list_refresh_seconds마다 다시 조회
+- 실행이 끝나면 wait_for_run()으로 기다리던 요청을 깨움
+- search_backend=local이면 인덱서가 없으므로 시작하지 않음 (Azure를 호출하지 않음)
+"""
+import datetime
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+from ..config import settings
+from .retriever_cache import retriever_cache
+
+logger = logging.getLogger(__name__)
+
+# 인덱서 종료 시각(서비스 시계)과 실행 요청 시각(서버 시계)의 차이 허용 범위
+CLOCK_SKEW = datetime.timedelta(seconds=2)
+
+def _parse_time(value: Optional[str]) -> Optional[datetime.datetime]:
+    return datetime.datetime.fromisoformat(value) if value else None
+
+def monitor_enabled() -> bool:
+    """모니터를 사용하는지 (로컬 검색 인덱스는 Blob 인덱서를 쓰지 않음)"""
+    return settings.indexer_monitor_enabled and settings.search_backend != "local"
+
+class IndexerMonitor:
+    """인덱서 상태를 주기적으로 조회해 스냅샷을 보관하는 백그라운드 모니터"""
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._updated_at = 0.0
+        self._indexer_names: List[str] = []
+        self._names_fetched_at = 0.0
+        self._active_until = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="indexer-status")
+    
+    def ensure_started(self):
+        """모니터 스레드 시작 (이미 실행 중이면 아무 것도 하지 않음)"""
+        with self._condition:
+            if self._thread is not None or not monitor_enabled():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run_loop, name="indexer-monitor", daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+    
+    def wake(self):
+        """인덱서를 실행했음을 알림 (한동안 빠른 간격으로 조회)"""
+        with self._condition:
+            self._active_until = time.monotonic() + settings.indexer_monitor_active_window_seconds
+            self._condition.notify_all()
+        self.ensure_started()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """최신 인덱서 상태 (아직 조회한 적이 없으면 한 번 조회)"""
+        if not monitor_enabled():
+            from .document_analyzer import document_analyzer
+            return document_analyzer.check_indexer_status()
+        self.ensure_started()
+        with self._condition:
+            snapshot, updated_at = self._snapshot, self._updated_at
+        if snapshot is None:
+            snapshot = self.refresh()
+            updated_at = self._updated_at
+        return {**snapshot, "age_seconds": round(time.monotonic() - updated_at, 3)}
+    
+    def wait_for_run(self, started_at: str, timeout: float, indexer_names: List[str]) -> bool:
+        """
+        started_at(ISO 형식, 인덱서 트리거 결과의 started_at) 이후에 시작한 인덱서 실행이 끝날 때까지 대기
+        
+        Args:
+            indexer_names: 이번 실행에서 실제로 시작된 인덱서 (이 인덱서들만 기다림)
+        
+        Returns:
+            bool: 시간 안에 끝났는지 (모니터가 꺼져 있거나 상태를 알 수 없으면 바로 반환, 호출자가 직접 검색으로 확인)
+        """
+        if not monitor_enabled() or not indexer_names:
+            return True
+        started = datetime.datetime.fromisoformat(started_at)
+        names = set(indexer_names)
+        self.wake()
+        with self._condition:
+            self._condition.wait_for(lambda: self._run_state(started, names) is not False, timeout)
+            return self._run_state(started, names) is True
+    
+    def _run_state(self, started_at: datetime.datetime, names: Set[str]) -> Optional[bool]:
+        """지정한 인덱서의 실행 상태 (True: 모두 끝남, False: 실행 중, None: 스냅샷 오류 등으로 알 수 없음)"""
+        if self._snapshot is None:
+            return False  # 첫 조회 전 (wake()로 곧 조회됨)
+        if self._snapshot.get("status") != "success":
+            return None
+        indexers = [info for info in self._snapshot.get("indexers") or [] if info["name"] in names]
+        if len(indexers) < len(names):
+            return None  # 상태를 조회하지 못한 인덱서가 있음
+        if any(info["execution_status"] == "inProgress" for info in indexers):
+            return False
+        finished = [_parse_time(info["last_execution"]) for info in indexers]
+        return all(end is not None and end >= started_at - CLOCK_SKEW for end in finished)
+    
+    def refresh(self) -> Dict[str, Any]:
+        """인덱서 상태를 지금 조회해 스냅샷 갱신 (인덱서별 상태는 동시에 조회)"""
+        from .document_analyzer import document_analyzer
+        try:
+            now = time.monotonic()
+            if not self._indexer_names or now - self._names_fetched_at > settings.indexer_monitor_list_refresh_seconds:
+                self._indexer_names = [indexer.name for indexer in document_analyzer.indexer_client.get_indexers()]
+                self._names_fetched_at = now
+            if not self._indexer_names:
+                snapshot = {"status": "error", "message": "사용 가능한 인덱서가 없습니다."}
+            else:
+                indexers = []
+                for name, info in zip(self._indexer_names, self._executor.map(self._status_or_error, self._indexer_names)):
+                    if info is not None:
+                        indexers.append(info)
+                snapshot = {"status": "success", "indexers": indexers}
+        except Exception as e:
+            logger.error(f"인덱서 상태 모니터 조회 오류: {str(e)}")
+            with self._condition:
+                previous = self._snapshot
+            # 조회에 실패하면 마지막 스냅샷을 유지하고 오류만 표시
+            snapshot = {**previous, "stale": True, "error": str(e)} if previous else {
+                "status": "error",
+                "message": f"인덱서 상태 확인 중 오류: {str(e)}"
+            }
+            
+        with self._condition:
+            previous = self._snapshot
+            self._snapshot = snapshot
+            self._updated_at = time.monotonic()
+            self._condition.notify_all()
+        finished = self._newly_finished(previous, snapshot)
+        if finished:
+            # 인덱서 실행이 끝나 새 문서가 검색될 수 있으므로 캐시된 검색 결과를 버림
+            retriever_cache.invalidate(f"인덱서 실행 완료 {', '.join(finished)}")
+        return snapshot
+    
+    @staticmethod
+    def _newly_finished(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> List[str]:
+        """이전 스냅샷 이후 마지막 실행 종료 시각이 바뀐 인덱서 (첫 스냅샷이면 비교하지 않음)"""
+        if not previous or previous.get("status") != "success" or current.get("status") != "success":
+            return []
+        before = {info["name"]: info["last_execution"] for info in previous["indexers"]}
+        return [
+            info["name"] for info in current["indexers"]
+            if info["last_execution"] and info["name"] in before and info["last_execution"] != before[info["name"]]
+        ]
+    
+    @staticmethod
+    def _status_or_error(name: str) -> Optional[Dict[str, Any]]:
+        from .document_analyzer import document_analyzer
+        try:
+            return document_analyzer.get_indexer_status_info(name)
+        except Exception as e:
+            logger.error(f"인덱서 '{name}' 상태 조회 오류: {str(e)}")
+            return None
+    
+    def _is_active(self) -> bool:
+        indexers = (self._snapshot or {}).get("indexers") or []
+        return time.monotonic() < self._active_until or any(info["execution_status"] == "inProgress" for info in indexers)
+    
+    def _run_loop(self):
+        while True:
+            self.refresh()
+            with self._condition:
+                interval = settings.indexer_monitor_active_seconds if self._is_active() else settings.indexer_monitor_idle_seconds
+                # wake()가 호출되면 (인덱서 실행 직후) 바로 다시 조회
+                active_until = self._active_until
+                self._condition.wait_for(lambda: self._stopped or self._active_until != active_until, interval)
+                if self._stopped:
+                    self._thread = None
+                    return
+
+# 전역 인덱서 모니터 인스턴스
+indexer_monitor = IndexerMonitor()
@@ -0,0 +1,182 @@
+"""
+인덱서 실행 요청 병합 (debounce)
+
+업로드마다 run_indexer()를 부르면 동시에 들어온 업로드끼리 "이미 실행 중(409)" 오류가 나거나 불필요한 실행이 쌓입니다.
+업로드 이벤트를 indexer_debounce_ms 동안 모아 인덱서별로 한 번만 실행하고,
+실행마다 세대(generation) 번호를 붙여 각 요청이 자신의 파일을 포함하는 실행을 기다릴 수 있게 합니다.
+
+    generation = indexer_trigger.request_run("resume_a.pdf", "job_b.pdf")
+    result = indexer_trigger.wait(generation)   # 이 파일들을 포함하는 실행의 결과
+
+이미 실행 중이라 거절된(409) 인덱서는 그 실행이 업로드 전에 시작됐을 수 있으므로
+indexer_conflict_retry_seconds 후 다음 세대로 다시 실행합니다 (트리거 스레드는 기다리지 않고 그 사이 요청은 그 세대에 병합).
+wait()는 기본적으로 재실행 세대까지 따라가서 합친 결과를 반환하고, follow_retries=False면 409 결과를 바로 반환합니다.
+"""
+import datetime
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from ..config import settings
+from .indexer_monitor import indexer_monitor, monitor_enabled
+from .retriever_cache import retriever_cache
+from .metrics import INDEXER_TRIGGER
+
+logger = logging.getLogger(__name__)
+
+# 보관할 최근 실행 결과 수
+RESULT_HISTORY = 32
+
+class IndexerTrigger:
+    """업로드 이벤트를 모아 인덱서를 한 번씩 실행하는 백그라운드 트리거"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._next_generation = 1  # 다음 실행에 붙을 세대 번호
+        self._completed_generation = 0
+        self._results: Dict[int, Dict[str, Any]] = {}
+        self._pending: List[str] = []
+        self._first_event_at: Optional[float] = None
+        self._deadline = 0.0
+        self._worker: Optional[threading.Thread] = None
+        self._retry_names: Optional[List[str]] = None  # 409로 다시 실행할 인덱서 (다음 세대에 실행)
+        self._conflict_retries = 0
+
+    def request_run(self, *filenames: str, immediate: bool = False) -> int:
+        """
+        인덱서 실행 요청 (debounce 구간 안의 요청은 한 번의 실행으로 병합)
+
+        Args:
+            filenames: 이번 실행에 포함되어야 하는 Blob 이름 (로그용)
+            immediate: 대기 없이 바로 실행 (수동 실행 API)
+
+        Returns:
+            int: 이 파일들을 포함하는 실행의 세대 번호
+        """
+        INDEXER_TRIGGER.labels("request").inc()
+        with self._condition:
+            now = time.monotonic()
+            if self._first_event_at is None:
+                self._first_event_at = now
+            self._pending.extend(filenames)
+            # 요청이 계속 들어와도 첫 요청 후 indexer_debounce_max_ms 안에는 실행
+            self._deadline = now if immediate else min(
+                now + settings.indexer_debounce_ms / 1000,
+                self._first_event_at + settings.indexer_debounce_max_ms / 1000
+            )
+            self._ensure_worker()
+            self._condition.notify_all()
+            return self._next_generation
+
+    def _ensure_worker(self):
+        """(self._condition 보유 상태에서 호출)"""
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run_loop, name="indexer-trigger", daemon=True)
+            self._worker.start()
+
+    def wait(self, generation: int, timeout: Optional[float] = None, follow_retries: bool = True) -> Dict[str, Any]:
+        """
+        해당 세대의 실행이 끝날 때까지 대기 후 결과 반환 (시간 초과 시 오류 결과)
+
+        Args:
+            follow_retries: 409로 다시 실행을 예약한 경우 그 세대까지 기다려 결과를 합침
+                (False면 409 결과와 retry_generation을 바로 반환)
+        """
+        timeout = settings.indexer_trigger_wait_seconds if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        combined: Optional[Dict[str, Any]] = None
+        with self._condition:
+            while True:
+                finished = self._condition.wait_for(
+                    lambda: self._completed_generation >= generation, max(0.0, deadline - time.monotonic())
+                )
+                if not finished:
+                    return {"status": "error", "message": f"인덱서 실행 대기 시간 초과 ({timeout:.0f}초)", "generation": generation}
+                result = self._results.get(generation) or {"status": "success", "message": "이후 실행에 포함됨", "generation": generation}
+                combined = dict(result) if combined is None else self._merge(combined, result)
+                if not (follow_retries and "retry_generation" in result):
+                    return combined
+                generation = result["retry_generation"]
+
+    @staticmethod
+    def started_indexers(result: Dict[str, Any]) -> List[str]:
+        """실행 결과에서 실제로 실행을 시작한 인덱서 이름 (실패/409 제외)"""
+        if result.get("status") == "error":
+            return []
+        return [item["indexer_name"] for item in result.get("indexers", []) if item.get("status") == "started"]
+
+    @staticmethod
+    def _merge(first: Dict[str, Any], retry: Dict[str, Any]) -> Dict[str, Any]:
+        """처음 실행 결과에 재실행한 인덱서의 결과를 덮어씀 (started_at은 처음 실행 기준 유지)"""
+        merged = dict(first)
+        retried = {item["indexer_name"]: item for item in retry.get("indexers", [])}
+        merged["indexers"] = [retried.get(item["indexer_name"], item) for item in first.get("indexers", [])]
+        merged["generation"] = retry.get("generation")
+        if "retry_generation" in retry:
+            merged["retry_generation"] = retry["retry_generation"]
+        else:
+            merged.pop("retry_generation", None)
+        return merged
+
+    def _run_loop(self):
+        while True:
+            with self._condition:
+                # debounce: 마지막 요청 후 대기 시간이 지날 때까지 (새 요청이 오면 마감 시각이 늦춰짐)
+                while self._first_event_at is not None and time.monotonic() < self._deadline:
+                    self._condition.wait(self._deadline - time.monotonic())
+                if self._first_event_at is None:
+                    self._worker = None
+                    return
+                generation = self._next_generation
+                self._next_generation += 1
+                filenames, self._pending = self._pending, []
+                # 새 요청이 없으면 409였던 인덱서만, 있으면 모든 인덱서를 실행
+                indexer_names = None if filenames else self._retry_names
+                self._retry_names = None
+                self._first_event_at = None
+
+            if filenames:
+                logger.info(f"인덱서 실행 #{generation}: 요청 {len(filenames)}건 병합 ({', '.join(filenames[:5])}{' ...' if len(filenames) > 5 else ''})")
+            else:
+                INDEXER_TRIGGER.labels("conflict_retry").inc()
+                logger.info(f"인덱서 재실행 #{generation}: 실행 중이던 인덱서 {', '.join(indexer_names or [])}")
+            started_at = datetime.datetime.now(datetime.timezone.utc)
+            result = self._run(indexer_names)
+            result["generation"] = generation
+            # 요청자가 indexer_monitor.wait_for_run()으로 이 실행의 완료를 기다릴 수 있도록
+            result["started_at"] = started_at.isoformat()
+            indexer_monitor.wake()
+            if not monitor_enabled():
+                # 모니터가 없으면 실행 완료를 알 수 없으므로 실행 시점에 캐시를 버림 (이후 색인분은 TTL로 반영)
+                retriever_cache.invalidate(f"인덱서 실행 #{generation}")
+            result["merged_requests"] = len(filenames)
+            busy = [item["indexer_name"] for item in result.get("indexers", []) if item.get("status_code") == 409]
+
+            with self._condition:
+                if busy and self._conflict_retries < settings.indexer_conflict_max_retries:
+                    # 기다리지 않고 다음 세대로 재실행 예약 (그 사이 들어온 요청도 그 세대에 병합됨)
+                    self._conflict_retries += 1
+                    self._retry_names = sorted(set(self._retry_names or []) | set(busy))
+                    if not self._pending:
+                        # 이미 대기 중인 요청이 있으면 그 실행(모든 인덱서)에 포함되므로 마감 시각을 늦추지 않음
+                        self._first_event_at = time.monotonic()
+                        self._deadline = self._first_event_at + settings.indexer_conflict_retry_seconds
+                    result["retry_generation"] = self._next_generation
+                    logger.info(f"실행 중인 인덱서 재시도 예정 (#{self._next_generation}, {settings.indexer_conflict_retry_seconds}초 후): {', '.join(busy)}")
+                else:
+                    if busy:
+                        logger.warning(f"실행 중인 인덱서 재시도 횟수 초과: {', '.join(busy)}")
+                    self._conflict_retries = 0
+                self._results[generation] = result
+                self._results.pop(generation - RESULT_HISTORY, None)
+                self._completed_generation = generation
+                self._condition.notify_all()
+
+    def _run(self, indexer_names: Optional[List[str]]) -> Dict[str, Any]:
+        """인덱서 실행 (indexer_names가 없으면 모든 인덱서)"""
+        from .document_analyzer import document_analyzer
+        INDEXER_TRIGGER.labels("run").inc()
+        return document_analyzer.run_indexer(indexer_names)
+
+# 전역 인덱서 트리거 인스턴스
+indexer_trigger = IndexerTrigger()
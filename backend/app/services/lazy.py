@@ -0,0 +1,77 @@
+"""
+지연 생성 서비스 (시작 시간 단축)
+
+Azure SDK / openai / LangChain을 사용하는 서비스는 import 비용과 초기화(인덱스 조회 등 네트워크 호출) 비용이 큽니다.
+전역 인스턴스를 LazyService로 감싸 두면 모듈 import 시에는 아무 것도 만들지 않고,
+속성에 처음 접근할 때(또는 시작 후 백그라운드 preload_services()에서) 인스턴스를 생성합니다.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+_registry: List["LazyService"] = []
+
+class LazyService:
+    """첫 속성 접근 시 factory()로 인스턴스를 만들어 모든 속성 접근/설정을 위임하는 프록시"""
+    
+    def __init__(self, factory: Callable[[], Any], name: str):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "init_seconds", None)
+        _registry.append(self)
+    
+    def _get(self) -> Any:
+        instance = object.__getattribute__(self, "_instance")
+        if instance is None:
+            with object.__getattribute__(self, "_lock"):
+                instance = object.__getattribute__(self, "_instance")
+                if instance is None:
+                    started = time.perf_counter()
+                    instance = object.__getattribute__(self, "_factory")()
+                    object.__setattr__(self, "init_seconds", time.perf_counter() - started)
+                    object.__setattr__(self, "_instance", instance)
+                    logger.info(f"서비스 초기화 완료: {self._name} ({self.init_seconds:.2f}초)")
+        return instance
+    
+    def override(self, factory: Callable[[], Any]):
+        """생성 함수 교체 (이미 만든 인스턴스는 버리고 다음 접근 시 새 함수로 생성, 가짜 서비스 주입용)"""
+        with object.__getattribute__(self, "_lock"):
+            object.__setattr__(self, "_factory", factory)
+            object.__setattr__(self, "_instance", None)
+    
+    @property
+    def is_loaded(self) -> bool:
+        return object.__getattribute__(self, "_instance") is not None
+    
+    def __getattr__(self, name: str) -> Any:
+        # 프록시 자체 속성이 아닌 경우에만 호출됨
+        return getattr(self._get(), name)
+    
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._get(), name, value)
+    
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<LazyService {self._name} ({state})>"
+
+def preload_services() -> Dict[str, float]:
+    """
+    등록된 모든 지연 서비스를 생성 (서버 시작 후 백그라운드 스레드에서 호출)
+    
+    Returns:
+        dict: 서비스 이름 → 초기화 시간(초)
+    """
+    timings: Dict[str, float] = {}
+    for service in list(_registry):
+        try:
+            service._get()
+            timings[service._name] = service.init_seconds or 0.0
+        except Exception as e:
+            # 실패해도 첫 요청 시 다시 시도됨
+            logger.error(f"서비스 미리 초기화 실패: {service._name} ({str(e)})")
+    return timings
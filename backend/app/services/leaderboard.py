@@ -0,0 +1,145 @@
+"""
+채용공고별 지원자 점수 인덱스 (리더보드)
+
+분석이 끝날 때마다 구조화된 점수를 채용공고 단위로 SQLite에 저장해 두고,
+리더보드 조회는 (채용공고, 점수) 인덱스만 읽으므로 LLM 호출이나 Blob 재조회가 없습니다.
+"""
+import datetime
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, List, Optional
+from ..config import settings
+from .lazy import LazyService
+from .scoring import average_score
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidate_scores (
+    job_filename TEXT NOT NULL,
+    resume_filename TEXT NOT NULL,
+    document_score INTEGER,
+    interview_score INTEGER,
+    document_scores TEXT,
+    interview_scores TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (job_filename, resume_filename)
+);
+CREATE INDEX IF NOT EXISTS idx_scores_document ON candidate_scores(job_filename, document_score DESC);
+CREATE INDEX IF NOT EXISTS idx_scores_interview ON candidate_scores(job_filename, interview_score DESC);
+"""
+
+# 정렬 기준 → 점수 컬럼
+SORT_COLUMNS = {
+    "document": "document_score",
+    "interview": "interview_score",
+}
+
+class LeaderboardService:
+    """채용공고별 지원자 점수 인덱스"""
+    
+    def __init__(self):
+        os.makedirs(settings.chroma_persist_dir, exist_ok=True)
+        self.db_file = os.path.join(settings.chroma_persist_dir, "leaderboard.db")
+        self._local = threading.local()
+        
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.executescript(SCHEMA)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """현재 스레드의 SQLite 커넥션 반환"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=settings.sqlite_busy_timeout_seconds)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def _record(self, job_filename: str, resume_filename: str, kind: str, scores: Dict[str, Optional[int]], overall: Optional[int]):
+        now = datetime.datetime.now().isoformat()
+        with self._connection() as conn:
+            conn.execute(
+                f"""
+                INSERT INTO candidate_scores (job_filename, resume_filename, {kind}_score, {kind}_scores, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (job_filename, resume_filename) DO UPDATE SET
+                    {kind}_score = excluded.{kind}_score,
+                    {kind}_scores = excluded.{kind}_scores,
+                    updated_at = excluded.updated_at
+                """,
+                (job_filename, resume_filename, overall, json.dumps(scores, ensure_ascii=False), now)
+            )
+    
+    def record_document_scores(self, job_filename: str, resume_filename: str, scores: Dict[str, Optional[int]]):
+        """서류 매칭 점수 저장 (전반적 적합도를 대표 점수로 사용)"""
+        try:
+            self._record(job_filename, resume_filename, "document", scores, scores.get("overall_fit"))
+        except Exception as e:
+            logger.warning(f"리더보드 점수 저장 실패 ({job_filename}, {resume_filename}): {str(e)}")
+    
+    def record_interview_scores(self, job_filename: str, resume_filename: str, scores: Dict[str, Optional[int]]):
+        """면접 평가 점수 저장 (항목 평균을 대표 점수로 사용)"""
+        try:
+            self._record(job_filename, resume_filename, "interview", scores, average_score(scores))
+        except Exception as e:
+            logger.warning(f"리더보드 점수 저장 실패 ({job_filename}, {resume_filename}): {str(e)}")
+    
+    def get_leaderboard(self, job_filename: str, sort_by: str = "document", limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """
+        채용공고별 지원자 순위 조회
+        
+        Args:
+            job_filename: 채용공고 파일명
+            sort_by: 정렬 기준 (document: 서류 점수, interview: 면접 점수)
+            limit: 결과 제한 수
+            offset: 건너뛸 결과 수
+            
+        Returns:
+            dict: 전체 지원자 수와 순위 목록 (점수 없는 지원자는 맨 뒤)
+        """
+        if sort_by not in SORT_COLUMNS:
+            return {
+                "status": "error",
+                "message": f"지원하지 않는 정렬 기준입니다: {sort_by} (document, interview 중 선택)"
+            }
+        column = SORT_COLUMNS[sort_by]
+        conn = self._connection()
+        total = conn.execute(
+            "SELECT COUNT(*) FROM candidate_scores WHERE job_filename = ?", (job_filename,)
+        ).fetchone()[0]
+        rows = conn.execute(
+            f"""
+            SELECT * FROM candidate_scores WHERE job_filename = ?
+            ORDER BY {column} IS NULL, {column} DESC, resume_filename
+            LIMIT ? OFFSET ?
+            """,
+            (job_filename, limit, offset)
+        ).fetchall()
+        
+        candidates: List[Dict[str, Any]] = []
+        for rank, row in enumerate(rows, start=offset + 1):
+            candidates.append({
+                "rank": rank,
+                "resume_filename": row["resume_filename"],
+                "document_score": row["document_score"],
+                "interview_score": row["interview_score"],
+                "document_scores": json.loads(row["document_scores"]) if row["document_scores"] else None,
+                "interview_scores": json.loads(row["interview_scores"]) if row["interview_scores"] else None,
+                "updated_at": row["updated_at"]
+            })
+        return {
+            "status": "success",
+            "job_filename": job_filename,
+            "sort_by": sort_by,
+            "total": total,
+            "candidates": candidates
+        }
+
+# 전역 리더보드 인스턴스 (처음 사용할 때 DB 파일을 열므로 그 전에 저장 경로를 바꿀 수 있음)
+leaderboard_service = LazyService(LeaderboardService, "leaderboard_service")
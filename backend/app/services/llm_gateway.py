@@ -0,0 +1,417 @@
+"""
+Azure OpenAI 공용 게이트웨이
+
+모든 LLM/STT 호출이 이 게이트웨이를 거치도록 하여 배포(deployment)별 부하를 한 곳에서 관리합니다.
+- 하나의 HTTP 커넥션 풀(httpx)을 모든 클라이언트가 공유
+- 배포별 분당 요청 수 / 분당 토큰 수를 토큰 버킷으로 제한
+- 429 응답 시 Retry-After를 지키고 지수 백오프로 재시도
+- 스로틀링이 관찰되면 동시 실행 수를 절반으로 줄이고, 성공하면 천천히 다시 늘림 (AIMD)
+"""
+import asyncio
+import collections
+import functools
+import logging
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+from ..config import settings
+from .token_budget import count_tokens
+from .metrics import LLM_RETRIES, track_stage
+
+# httpx / openai / LangChain은 import 비용이 커서 실제 호출 시점에 불러옴 (서버 시작 시간 단축)
+if TYPE_CHECKING:
+    import httpx
+    import openai
+    from langchain_core.runnables import Runnable
+    from langchain_openai import AzureChatOpenAI
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=None)
+def retryable_errors() -> Tuple[type, ...]:
+    """재시도 대상 오류 (429 이외에는 일시적인 네트워크/서버 오류만)"""
+    import openai
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
+
+def _is_rate_limit(error: Exception) -> bool:
+    import openai
+    return isinstance(error, openai.RateLimitError)
+
+class TokenBucket:
+    """분당 한도를 초 단위로 보충하는 토큰 버킷 (예약 방식: 부족하면 대기 시간을 반환)"""
+    
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(per_minute, 1))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def reserve(self, amount: float) -> float:
+        """amount만큼 예약하고, 버킷이 다시 채워질 때까지 기다려야 하는 시간(초)을 반환"""
+        with self._lock:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+    
+    def adjust(self, delta: float):
+        """예상치와 실제 사용량의 차이를 반영 (양수면 반환, 음수면 추가 차감)"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + delta)
+    
+    def pause(self, seconds: float):
+        """Retry-After 동안 새 요청이 나가지 않도록 버킷을 비움"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+class AdaptiveConcurrencyLimiter:
+    """
+    스로틀링에 따라 동시 실행 한도를 조정하는 제한기 (AIMD)
+    
+    동기 호출(스레드)과 비동기 호출(이벤트 루프)이 같은 한도를 공유합니다.
+    비동기 대기자는 슬롯이 반납될 때 Future로 직접 깨우므로 이벤트 루프에서 폴링하지 않습니다.
+    """
+    
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(max_limit, 1)
+        self.min_limit = max(min(min_limit, self.max_limit), 1)
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        self._async_waiters: "collections.deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]" = collections.deque()
+    
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+    
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+    
+    async def acquire_async(self):
+        with self._cond:
+            if self.in_flight < int(self.limit) and not self._async_waiters:
+                self.in_flight += 1
+                return
+            loop = asyncio.get_running_loop()
+            waiter = loop.create_future()
+            self._async_waiters.append((loop, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._cond:
+                try:
+                    self._async_waiters.remove((loop, waiter))
+                except ValueError:
+                    pass  # 이미 슬롯을 받았으면 _grant가 반납함
+            raise
+    
+    def _grant(self, waiter: asyncio.Future):
+        """(대기자의 이벤트 루프에서 실행) 슬롯 전달, 그 사이 취소됐으면 반납"""
+        if waiter.cancelled():
+            self._return_slot()
+        else:
+            waiter.set_result(None)
+    
+    def _return_slot(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._wake_waiters()
+    
+    def _wake_waiters(self):
+        """빈 슬롯을 비동기 대기자에게 먼저 넘기고 동기 대기자를 깨움 (self._cond 보유 상태에서 호출)"""
+        while self._async_waiters and self.in_flight < int(self.limit):
+            loop, waiter = self._async_waiters.popleft()
+            self.in_flight += 1
+            try:
+                loop.call_soon_threadsafe(self._grant, waiter)
+            except RuntimeError:  # 이벤트 루프가 이미 닫힘
+                self.in_flight -= 1
+        self._cond.notify_all()
+    
+    def release(self, outcome: str = "success"):
+        """
+        슬롯 반납
+        
+        Args:
+            outcome: success (한도를 천천히 늘림) | throttled (429, 한도를 절반으로) | error (그 외 실패, 한도 유지)
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == "throttled":
+                self.limit = max(float(self.min_limit), self.limit / 2)
+            elif outcome == "success":
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._wake_waiters()
+
+class DeploymentBudget:
+    """배포 하나에 대한 요청/토큰 버킷 + 동시 실행 제한기"""
+    
+    def __init__(self, name: str, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.limiter = AdaptiveConcurrencyLimiter(max_concurrency)
+        self.throttled_count = 0
+    
+    def reserve(self, estimated_tokens: int) -> float:
+        """요청 1건 + 예상 토큰을 예약하고 필요한 대기 시간 반환"""
+        return max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": int(self.limiter.limit),
+            "in_flight": self.limiter.in_flight,
+            "throttled_count": self.throttled_count,
+        }
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """429/503 응답의 retry-after-ms / retry-after 헤더 값(초)"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+def _prompt_text(prompt: Any) -> str:
+    """LLM 입력(str, PromptValue, 메시지 목록)을 토큰 추정용 문자열로 변환"""
+    if isinstance(prompt, str):
+        return prompt
+    if hasattr(prompt, "to_string"):
+        return prompt.to_string()
+    if isinstance(prompt, list):
+        return "\n".join(str(getattr(message, "content", message)) for message in prompt)
+    return str(prompt)
+
+class LLMGateway:
+    """LLM/STT 호출 공용 게이트웨이"""
+    
+    def __init__(self):
+        self._http_client: Optional["httpx.Client"] = None
+        self._http_async_client: Optional["httpx.AsyncClient"] = None
+        self._http_lock = threading.Lock()
+        
+        self._budgets: Dict[str, DeploymentBudget] = {}
+        self._budgets_lock = threading.Lock()
+    
+    def _create_http_clients(self):
+        """공용 HTTP 커넥션 풀 (최초 1회 생성)"""
+        with self._http_lock:
+            if self._http_client is None:
+                import httpx
+                limits = httpx.Limits(
+                    max_connections=settings.llm_http_max_connections,
+                    max_keepalive_connections=settings.llm_http_max_connections
+                )
+                timeout = httpx.Timeout(settings.llm_request_timeout_seconds, connect=10.0)
+                self._http_async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+                self._http_client = httpx.Client(limits=limits, timeout=timeout)
+    
+    @property
+    def http_client(self) -> "httpx.Client":
+        if self._http_client is None:
+            self._create_http_clients()
+        return self._http_client
+    
+    @property
+    def http_async_client(self) -> "httpx.AsyncClient":
+        if self._http_client is None:
+            self._create_http_clients()
+        return self._http_async_client
+    
+    def budget(self, deployment: str) -> DeploymentBudget:
+        """배포별 예산 (llm_deployment_limits에 없으면 기본 한도 사용)"""
+        with self._budgets_lock:
+            if deployment not in self._budgets:
+                limits = settings.llm_deployment_limits.get(deployment, {})
+                self._budgets[deployment] = DeploymentBudget(
+                    deployment,
+                    requests_per_minute=limits.get("requests_per_minute", settings.llm_requests_per_minute),
+                    tokens_per_minute=limits.get("tokens_per_minute", settings.llm_tokens_per_minute),
+                    max_concurrency=limits.get("max_concurrency", settings.llm_max_concurrency)
+                )
+            return self._budgets[deployment]
+    
+    def _backoff_seconds(self, error: Exception, attempt: int) -> float:
+        """Retry-After가 있으면 그 값을, 없으면 지수 백오프 + 지터"""
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            return retry_after
+        return min(settings.llm_backoff_max_seconds, settings.llm_backoff_base_seconds * (2 ** attempt)) * random.uniform(0.5, 1.0)
+    
+    def _on_throttled(self, budget: DeploymentBudget, error: Exception, wait: float):
+        if _is_rate_limit(error):
+            budget.throttled_count += 1
+            budget.requests.pause(wait)
+            budget.tokens.pause(wait)
+    
+    def _before_retry(self, deployment: str, budget: DeploymentBudget, error: Exception, attempt: int) -> float:
+        """재시도 전 기다릴 시간 (429면 슬롯을 반납하기 전에 배포 전체의 요청도 그 시간 동안 멈춤)"""
+        backoff = self._backoff_seconds(error, attempt)
+        self._on_throttled(budget, error, backoff)
+        LLM_RETRIES.labels(deployment, type(error).__name__).inc()
+        logger.warning(f"LLM 호출 재시도 ({deployment}, {attempt + 1}/{settings.llm_max_retries}, {backoff:.1f}초 후): {type(error).__name__}")
+        return backoff
+    
+    def call(self, deployment: str, func: Callable[[], Any], estimated_tokens: int = 0) -> Any:
+        """예산/동시 실행 제한을 지키면서 func를 호출 (재시도 포함)"""
+        budget = self.budget(deployment)
+        for attempt in range(settings.llm_max_retries + 1):
+            wait = budget.reserve(estimated_tokens)
+            if wait > 0:
+                time.sleep(wait)
+                
+            budget.limiter.acquire()
+            outcome = "error"
+            try:
+                result = func()
+                outcome = "success"
+            except retryable_errors() as e:
+                outcome = "throttled" if _is_rate_limit(e) else "error"
+                if attempt >= settings.llm_max_retries:
+                    raise
+                backoff = self._before_retry(deployment, budget, e, attempt)
+            finally:
+                budget.limiter.release(outcome)
+                
+            if outcome == "success":
+                self._record_usage(budget, result, estimated_tokens)
+                return result
+            # 백오프 동안에는 슬롯을 다른 호출에 양보
+            time.sleep(backoff)
+    
+    async def acall(self, deployment: str, func: Callable[[], Any], estimated_tokens: int = 0) -> Any:
+        """call()의 비동기 버전 (func는 코루틴을 반환)"""
+        budget = self.budget(deployment)
+        for attempt in range(settings.llm_max_retries + 1):
+            wait = budget.reserve(estimated_tokens)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                
+            await budget.limiter.acquire_async()
+            outcome = "error"
+            try:
+                result = await func()
+                outcome = "success"
+            except retryable_errors() as e:
+                outcome = "throttled" if _is_rate_limit(e) else "error"
+                if attempt >= settings.llm_max_retries:
+                    raise
+                backoff = self._before_retry(deployment, budget, e, attempt)
+            finally:
+                budget.limiter.release(outcome)
+                
+            if outcome == "success":
+                self._record_usage(budget, result, estimated_tokens)
+                return result
+            await asyncio.sleep(backoff)
+    
+    @staticmethod
+    def _record_usage(budget: DeploymentBudget, result: Any, estimated_tokens: int):
+        """응답의 실제 토큰 사용량으로 토큰 버킷 보정"""
+        usage = getattr(result, "usage_metadata", None) or {}
+        total_tokens = usage.get("total_tokens")
+        if total_tokens:
+            budget.tokens.adjust(estimated_tokens - total_tokens)
+    
+    def _create_chat_model(
+        self,
+        deployment: str,
+        temperature: float,
+        api_version: str,
+        azure_endpoint: str,
+        api_key: str
+    ) -> "AzureChatOpenAI":
+        """공용 HTTP 클라이언트를 사용하는 AzureChatOpenAI 생성 (재시도는 게이트웨이가 담당)"""
+        from langchain_openai import AzureChatOpenAI
+        return AzureChatOpenAI(
+            model=deployment,
+            temperature=temperature,
+            api_version=api_version,
+            azure_endpoint=azure_endpoint,
+            azure_deployment=deployment,
+            api_key=api_key,
+            max_retries=0,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
+        )
+    
+    def chat_model(
+        self,
+        deployment: Optional[str] = None,
+        temperature: float = 0,
+        api_version: Optional[str] = None,
+        azure_endpoint: Optional[str] = None,
+        api_key: Optional[str] = None
+    ) -> "Runnable":
+        """
+        게이트웨이를 거치는 채팅 모델 (Runnable)
+        
+        기존 AzureChatOpenAI와 같이 invoke/ainvoke/batch 및 LCEL 체인 구성에 사용할 수 있고,
+        AIMessage를 반환합니다.
+        """
+        deployment = deployment or settings.azure_openai_deployment_name
+        llm = self._create_chat_model(
+            deployment=deployment,
+            temperature=temperature,
+            api_version=api_version or settings.azure_openai_api_version,
+            azure_endpoint=azure_endpoint or settings.azure_openai_endpoint,
+            api_key=api_key or settings.azure_openai_api_key
+        )
+        
+        def invoke(prompt: Any):
+            estimated = count_tokens(_prompt_text(prompt)) + settings.llm_expected_output_tokens
+            with track_stage("llm_call"):
+                return self.call(deployment, lambda: llm.invoke(prompt), estimated)
+        
+        async def ainvoke(prompt: Any):
+            estimated = count_tokens(_prompt_text(prompt)) + settings.llm_expected_output_tokens
+            with track_stage("llm_call"):
+                return await self.acall(deployment, lambda: llm.ainvoke(prompt), estimated)
+            
+        from langchain_core.runnables import RunnableLambda
+        return RunnableLambda(invoke, afunc=ainvoke, name=f"gateway:{deployment}")
+    
+    def openai_client(self, api_key: str, api_version: str, azure_endpoint: str) -> "openai.AzureOpenAI":
+        """공용 HTTP 클라이언트를 사용하는 openai.AzureOpenAI (STT 등 직접 호출용)"""
+        import openai
+        return openai.AzureOpenAI(
+            api_key=api_key,
+            api_version=api_version,
+            azure_endpoint=azure_endpoint,
+            max_retries=0,
+            http_client=self.http_client
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """배포별 현재 동시 실행 한도 / 스로틀링 횟수"""
+        with self._budgets_lock:
+            return {name: budget.stats() for name, budget in self._budgets.items()}
+
+# 전역 게이트웨이 인스턴스
+llm_gateway = LLMGateway()
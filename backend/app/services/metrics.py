@@ -0,0 +1,196 @@
+"""
+Prometheus 메트릭
+
+파이프라인 단계(Blob 업로드, 인덱서 실행, 인덱싱 대기, 검색 읽기, LLM 호출, STT)별
+지연 시간 히스토그램과 결과(outcome)별 카운터, 진행 중 요청 게이지, 페이로드 크기 히스토그램을 제공합니다.
+모든 단계 메트릭에는 요청을 처리 중인 API 경로(endpoint)가 라벨로 붙습니다.
+
+워커가 여러 개인 경우 PROMETHEUS_MULTIPROC_DIR 환경변수를 지정하면 모든 워커의 값을 합산해 노출합니다.
+"""
+import contextvars
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+from .tracing import span
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    REGISTRY,
+)
+
+# 현재 요청의 ASGI scope (미들웨어가 설정, 스레드풀로도 전파됨)
+_current_scope: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("current_scope", default=None)
+
+def current_endpoint() -> str:
+    """현재 요청의 라우트 경로 템플릿 (파일명 등 경로 파라미터로 라벨이 늘어나지 않도록 템플릿 사용)"""
+    scope = _current_scope.get()
+    if scope is None:
+        return "background"
+    # 라우팅이 끝나면 scope["route"]에 매칭된 라우트가 기록됨
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+# 단계별 지연 시간 (인덱싱 대기/LLM 호출은 수십 초까지 걸리므로 버킷을 넓게 잡음)
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+PAYLOAD_BUCKETS = (1024, 10 * 1024, 100 * 1024, 512 * 1024, 1024 ** 2, 5 * 1024 ** 2, 20 * 1024 ** 2, 100 * 1024 ** 2)
+
+STAGE_DURATION = Histogram(
+    "interview_stage_duration_seconds",
+    "파이프라인 단계별 소요 시간",
+    ["stage", "endpoint", "outcome"],
+    buckets=STAGE_BUCKETS
+)
+STAGE_TOTAL = Counter(
+    "interview_stage_total",
+    "파이프라인 단계별 실행 횟수",
+    ["stage", "endpoint", "outcome"]
+)
+STAGE_IN_FLIGHT = Gauge(
+    "interview_stage_in_flight",
+    "현재 실행 중인 파이프라인 단계 수",
+    ["stage"],
+    multiprocess_mode="livesum"
+)
+PAYLOAD_SIZE = Histogram(
+    "interview_payload_bytes",
+    "요청 본문/업로드 파일 크기",
+    ["kind", "endpoint"],
+    buckets=PAYLOAD_BUCKETS
+)
+HTTP_DURATION = Histogram(
+    "interview_http_request_duration_seconds",
+    "HTTP 요청 처리 시간 (스트리밍 응답은 본문 전송 완료까지)",
+    ["endpoint", "method", "status"],
+    buckets=STAGE_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    "interview_http_requests_in_flight",
+    "현재 처리 중인 HTTP 요청 수",
+    multiprocess_mode="livesum"
+)
+LLM_RETRIES = Counter(
+    "interview_llm_retries_total",
+    "LLM/STT 호출 재시도 횟수",
+    ["deployment", "reason"]
+)
+INDEXER_TRIGGER = Counter(
+    "interview_indexer_trigger_total",
+    "인덱서 실행 요청/실제 실행/409 재시도 횟수 (request 대비 run이 적을수록 많이 병합됨)",
+    ["kind"]
+)
+SINGLE_FLIGHT = Counter(
+    "interview_single_flight_total",
+    "동일 분석 요청 처리 횟수 (leader: 실제 실행, follower: 진행 중인 결과를 공유한 중복 요청)",
+    ["operation", "role"]
+)
+RETRIEVER_CACHE = Counter(
+    "interview_retriever_cache_total",
+    "RAG 리트리버 결과 캐시 (hit / miss / invalidate: 새 문서 색인으로 전체 무효화)",
+    ["result"]
+)
+
+# 서비스 함수 반환값에 들어 있는 오류 표시 (dict가 아닌 문자열로 오류를 돌려주는 함수용)
+ERROR_MARKERS = ("오류", "찾을 수 없습니다", "실패")
+
+def _outcome(result: Any) -> str:
+    """서비스 함수 반환값으로 결과 분류 (이 저장소의 함수들은 예외 대신 오류 dict/문자열을 반환)"""
+    if result is False:
+        return "timeout"
+    if isinstance(result, dict) and result.get("status") == "error":
+        return "error"
+    if isinstance(result, str) and any(marker in result[:200] for marker in ERROR_MARKERS):
+        return "error"
+    return "success"
+
+def _record_stage(stage: str, started: float, outcome: str):
+    endpoint = current_endpoint()
+    STAGE_DURATION.labels(stage, endpoint, outcome).observe(time.perf_counter() - started)
+    STAGE_TOTAL.labels(stage, endpoint, outcome).inc()
+
+@contextmanager
+def track_stage(stage: str):
+    """
+    with 블록의 소요 시간을 단계 메트릭으로 기록 (예외가 나면 outcome=error)
+    
+    블록 안에서 결과를 판정하려면 yield된 dict의 "outcome"을 바꿉니다.
+    """
+    state = {"outcome": "success"}
+    STAGE_IN_FLIGHT.labels(stage).inc()
+    started = time.perf_counter()
+    try:
+        # 같은 단계를 요청 트레이스(Server-Timing)에도 구간으로 기록
+        with span(stage) as current:
+            yield state
+            if current is not None:
+                current.attributes["outcome"] = state["outcome"]
+    except Exception:
+        state["outcome"] = "error"
+        raise
+    finally:
+        STAGE_IN_FLIGHT.labels(stage).dec()
+        _record_stage(stage, started, state["outcome"])
+
+def observe_stage(stage: str) -> Callable:
+    """서비스 메서드를 단계 메트릭으로 감싸는 데코레이터 (반환값으로 outcome 판정)"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track_stage(stage) as state:
+                result = func(*args, **kwargs)
+                state["outcome"] = _outcome(result)
+                return result
+        return wrapper
+    return decorator
+
+def observe_payload(kind: str, size: Optional[int]):
+    """페이로드 크기(바이트) 기록"""
+    if size is not None:
+        PAYLOAD_SIZE.labels(kind, current_endpoint()).observe(size)
+
+def metrics_payload() -> tuple:
+    """/metrics 응답 본문과 Content-Type (다중 워커면 모든 워커 값을 합산)"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+class MetricsMiddleware:
+    """요청마다 API 경로 라벨을 설정하고 HTTP 지연 시간/진행 중 요청 수/본문 크기를 기록하는 ASGI 미들웨어"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+            
+        token = _current_scope.set(scope)
+        status_code = {"value": 500}
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_code["value"] = message["status"]
+            await send(message)
+            
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            endpoint = current_endpoint()
+            HTTP_DURATION.labels(endpoint, scope["method"], str(status_code["value"])).observe(time.perf_counter() - started)
+            for name, value in scope.get("headers", []):
+                if name == b"content-length":
+                    PAYLOAD_SIZE.labels("request_body", endpoint).observe(int(value))
+                    break
+            _current_scope.reset(token)
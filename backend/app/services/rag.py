@@ -1,36 +1,77 @@
-from langchain_openai import AzureChatOpenAI
 from langchain_openai import AzureOpenAIEmbeddings
 import os
+from typing import AsyncIterator, List, Optional
 from dotenv import load_dotenv
+from ..config import settings
+from .llm_gateway import llm_gateway
+from .token_budget import token_budget_manager
+from .retriever_cache import retriever_cache
 
 load_dotenv()
 
 os.environ["OPENAI_API_KEY"] = os.getenv("AZURE_OPENAI_API_KEY", "")
 embeddings = AzureOpenAIEmbeddings(model=os.getenv("AZURE_OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002"))
 
-llm = AzureChatOpenAI(
-    model=os.getenv("AZURE_OPENAI_MODEL_1", "gpt-4"),
+# 채팅 모델은 공용 게이트웨이 경유 (배포별 요청/토큰 한도 공유)
+llm = llm_gateway.chat_model(
+    deployment=os.getenv("AZURE_OPENAI_MODEL_1", "gpt-4"),
     temperature=0,
     api_version="2024-08-01-preview",
     azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT", ""),
-    azure_deployment=os.getenv("AZURE_OPENAI_MODEL_1", "gpt-4"),
+    api_key=os.getenv("AZURE_OPENAI_API_KEY", ""),
 )
 
 from langchain_community.retrievers import AzureAISearchRetriever
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
 
-retriever = AzureAISearchRetriever(
-        service_name=os.getenv("AZURE_AI_SEARCH_SERVICE_NAME", ""),
-        top_k=5,
-        index_name=os.getenv("AZURE_AI_SEARCH_INDEX_NAME", ""), # ai search 서비스에서 사용할 인덱스 이름
-        content_key="chunk", # 검색된 결과에서 문서의 page_content로 사용할 키, 주의) 인덱스에서 검색대상될 필드 명이 아니다.
-        api_key=os.getenv("AZURE_AI_SEARCH_API_KEY", "") # Azure Search Service 의 key
-    )
+class SearchBackendRetriever(BaseRetriever):
+    """DocumentAnalyzer의 검색 백엔드(search_backend=local)로 top-k 문서를 찾는 리트리버"""
+    top_k: int = 5
+    
+    def _get_relevant_documents(self, query: str, *, run_manager) -> list:
+        from .document_analyzer import document_analyzer
+        return [
+            Document(page_content=result.get("chunk") or "", metadata={"title": result.get("title"), "score": result.get("@search.score")})
+            for result in document_analyzer.search_backend.retrieve(query, self.top_k)
+        ]
+
+class CachedRetriever(BaseRetriever):
+    """검색 결과를 retriever_cache에 보관하는 리트리버 래퍼 (같은 질의는 인덱스가 바뀔 때까지 재검색하지 않음)"""
+    retriever: BaseRetriever
+    
+    def _get_relevant_documents(self, query: str, *, run_manager) -> list:
+        documents = retriever_cache.get(query)
+        if documents is None:
+            generation = retriever_cache.generation
+            documents = self.retriever.invoke(query)
+            retriever_cache.put(query, documents, generation)
+        return documents
+    
+    async def _aget_relevant_documents(self, query: str, *, run_manager) -> list:
+        documents = retriever_cache.get(query)
+        if documents is None:
+            generation = retriever_cache.generation
+            documents = await self.retriever.ainvoke(query)
+            retriever_cache.put(query, documents, generation)
+        return documents
+
+if settings.search_backend == "local":
+    search_retriever = SearchBackendRetriever(top_k=5)
+else:
+    search_retriever = AzureAISearchRetriever(
+            service_name=os.getenv("AZURE_AI_SEARCH_SERVICE_NAME", ""),
+            top_k=5,
+            index_name=os.getenv("AZURE_AI_SEARCH_INDEX_NAME", ""), # ai search 서비스에서 사용할 인덱스 이름
+            content_key="chunk", # 검색된 결과에서 문서의 page_content로 사용할 키, 주의) 인덱스에서 검색대상될 필드 명이 아니다.
+            api_key=os.getenv("AZURE_AI_SEARCH_API_KEY", "") # Azure Search Service 의 key
+        )
+retriever = CachedRetriever(retriever=search_retriever)
 
 
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
-from langchain_openai import AzureChatOpenAI
 
 prompt = ChatPromptTemplate.from_template(
     """당신은 면접관을 위한 지원자 평가 및 분석 전문가입니다.
@@ -41,12 +82,12 @@ prompt = ChatPromptTemplate.from_template(
     Question: {question}"""
     )
 
-llm2 = AzureChatOpenAI(
-    model=os.getenv("AZURE_OPENAI_MODEL_1", "gpt-4o"),
+llm2 = llm_gateway.chat_model(
+    deployment=os.getenv("AZURE_OPENAI_MODEL_1", "gpt-4o"),
     temperature=0,
     api_version="2024-08-01-preview",
     azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT", ""),
-    azure_deployment=os.getenv("AZURE_OPENAI_MODEL_1", "gpt-4o"),
+    api_key=os.getenv("AZURE_OPENAI_API_KEY", ""),
 )
 
 
@@ -60,6 +101,25 @@ chain = (
     | StrOutputParser()
 )
 
+# context를 이미 가진 경우 (같은 지원자에 대한 여러 질문이 그 지원자의 문서를 공유)
+answer_chain = prompt | llm2 | StrOutputParser()
+
+def batch_concurrency(max_concurrency: Optional[int]) -> int:
+    """abatch 동시 실행 수 (요청 값은 rag_max_concurrency 이하로 제한)"""
+    return max(1, min(max_concurrency or settings.rag_max_concurrency, settings.rag_max_concurrency))
+
+def _batch_config(max_concurrency: Optional[int]) -> dict:
+    return {"max_concurrency": batch_concurrency(max_concurrency)}
+
+def _question_with_context(question: str, resume_text: str = "", job_posting_text: str = "") -> str:
+    """질문 + 참고용 이력서/채용공고"""
+    context = ""
+    if resume_text:
+        context += f"\n[이력서 참고]\n{resume_text}"
+    if job_posting_text:
+        context += f"\n[채용공고 참고]\n{job_posting_text}"
+    return f"{question}{context}"
+
 # 함수로 만들어서 다른 곳에서 사용 가능하게 하기
 def analyze_candidate_profile(question: str) -> str:
     """
@@ -88,7 +148,8 @@ def analyze_candidate_match(resume_text: str, job_posting_text: str) -> dict:
     Returns:
         dict: 분석 결과 + 추천 질문
     """
-    analysis_question = f"""
+    def build_question(job_posting_text: str, resume_text: str) -> str:
+        return f"""
     다음 지원자와 채용공고를 분석해서 깔끔하게 요약해주세요:
     
     [채용공고]
@@ -122,23 +183,25 @@ def analyze_candidate_match(resume_text: str, job_posting_text: str) -> dict:
     5. [성장 가능성 질문]
     """
     
+    # 토큰 예산을 넘는 원문은 정책(압축/자르기)에 따라 줄여서 전송
+    analysis_question, token_usage = token_budget_manager.fit(
+        "rag_match", build_question,
+        job_posting_text=job_posting_text, resume_text=resume_text
+    )
+    
     result = analyze_candidate_profile(analysis_question)
     return {
         "analysis": result,
-        "status": "success"
+        "status": "success",
+        # 검색된 문서(context)는 체인 내부에서 붙으므로 질문 부분의 토큰만 집계
+        "token_usage": token_budget_manager.completion_usage(token_usage, result)
     }
 
 def ask_specific_question(question: str, resume_text: str = "", job_posting_text: str = "") -> dict:
     """
     특정 질문에 대한 답변 (자유 질의응답)
     """
-    context = ""
-    if resume_text:
-        context += f"\n[이력서 참고]\n{resume_text}"
-    if job_posting_text:
-        context += f"\n[채용공고 참고]\n{job_posting_text}"
-    
-    full_question = f"{question}{context}"
+    full_question = _question_with_context(question, resume_text, job_posting_text)
     result = analyze_candidate_profile(full_question)
     
     return {
@@ -147,5 +210,54 @@ def ask_specific_question(question: str, resume_text: str = "", job_posting_text
         "answer": result
     }
 
+async def aanalyze_candidate_profile(question: str) -> str:
+    """analyze_candidate_profile의 비동기 버전 (이벤트 루프를 막지 않음)"""
+    try:
+        return await chain.ainvoke(question)
+    except Exception as e:
+        return f"분석 중 오류가 발생했습니다: {str(e)}"
+
+async def aask_questions(
+    questions: List[str],
+    resume_text: str = "",
+    job_posting_text: str = "",
+    shared_context: Optional[str] = None,
+    max_concurrency: Optional[int] = None
+) -> AsyncIterator[dict]:
+    """
+    같은 지원자에 대한 여러 질문에 동시에 답변하고 완료되는 순서대로 반환
+    
+    shared_context(예: 지원자 이력서 원문)가 있으면 검색하지 않고 모든 질문이 그 context를 공유합니다.
+    없으면 질문마다 검색합니다.
+    
+    Args:
+        questions: 면접관 질문 목록
+        resume_text / job_posting_text: 질문에 함께 붙일 참고 원문
+        shared_context: 모든 질문이 공유할 지원자 문서
+        max_concurrency: 동시 실행 수 (기본값: rag_max_concurrency)
+        
+    Yields:
+        dict: {"index": 입력 순서, "question", "answer", "status"}
+    """
+    full_questions = [_question_with_context(question, resume_text, job_posting_text) for question in questions]
+    config = _batch_config(max_concurrency)
+    
+    if shared_context is not None:
+        runs = answer_chain.abatch_as_completed(
+            [{"context": shared_context, "question": question} for question in full_questions],
+            config=config, return_exceptions=True
+        )
+    else:
+        runs = chain.abatch_as_completed(full_questions, config=config, return_exceptions=True)
+    
+    async for index, answer in runs:
+        failed = isinstance(answer, Exception)
+        yield {
+            "index": index,
+            "question": questions[index],
+            "answer": f"분석 중 오류가 발생했습니다: {str(answer)}" if failed else answer,
+            "status": "error" if failed else "success"
+        }
+
 # 기존 테스트 코드는 주석 처리
 # chain.invoke("roundrobin team이란? 예시코드")
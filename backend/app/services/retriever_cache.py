@@ -0,0 +1,77 @@
+"""
+RAG 리트리버 결과 캐시
+
+같은 지원자에 대한 질문이 이어지면 체인이 매번 같은 검색을 다시 보냅니다 (Azure AI Search 왕복).
+정규화한 질의 + 인덱스 세대(generation)를 키로 검색 결과를 retriever_cache_ttl_seconds 동안 보관합니다.
+
+새 문서가 색인되면 invalidate()로 세대를 올려 이전 결과를 모두 버립니다.
+- 로컬 검색 인덱스: 문서를 색인할 때
+- Azure AI Search: 인덱서 모니터가 실행 완료를 확인했을 때, 활성 인덱스가 바뀌었을 때
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from ..config import settings
+from .metrics import RETRIEVER_CACHE
+from .single_flight import make_key
+
+logger = logging.getLogger(__name__)
+
+class RetrieverCache:
+    """TTL + 최대 개수(LRU) 제한이 있는 검색 결과 캐시"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.generation = 0
+
+    def _key(self, query: str) -> str:
+        return make_key("retrieve", query, self.generation)
+
+    def get(self, query: str) -> Optional[Any]:
+        """캐시된 검색 결과 (없거나 만료됐으면 None)"""
+        if not settings.retriever_cache_enabled:
+            return None
+        with self._lock:
+            key = self._key(query)
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry[0]:
+                self._entries.move_to_end(key)
+                RETRIEVER_CACHE.labels("hit").inc()
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+        RETRIEVER_CACHE.labels("miss").inc()
+        return None
+
+    def put(self, query: str, documents: Any, generation: int):
+        """
+        검색 결과 저장
+
+        Args:
+            generation: 검색을 시작할 때의 세대 (검색 중에 새 문서가 색인됐다면 저장하지 않음)
+        """
+        if not settings.retriever_cache_enabled:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            key = self._key(query)
+            self._entries[key] = (time.monotonic() + settings.retriever_cache_ttl_seconds, documents)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.retriever_cache_max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, reason: str):
+        """새 문서가 색인됐을 때 호출 (세대를 올리고 이전 결과를 모두 버림)"""
+        with self._lock:
+            self.generation += 1
+            dropped = len(self._entries)
+            self._entries.clear()
+        RETRIEVER_CACHE.labels("invalidate").inc()
+        logger.info(f"리트리버 캐시 무효화 ({reason}): 세대 {self.generation}, 버린 결과 {dropped}건")
+
+# 전역 리트리버 캐시 인스턴스
+retriever_cache = RetrieverCache()
@@ -0,0 +1,82 @@
+"""
+분석 결과 점수 구조화
+
+LLM에게 마크다운 평가 끝에 점수 JSON 블록을 덧붙이도록 요청하고,
+응답에서 JSON 블록을 떼어내 구조화된 점수(dict)로 반환합니다.
+JSON 블록이 없거나 깨진 경우에는 마크다운의 "항목: XX/100점" 문구에서 추출합니다.
+"""
+import json
+import re
+from typing import Dict, Optional, Tuple
+
+# 서류 매칭 점수 (JSON 키 → 마크다운 항목명)
+MATCH_SCORE_FIELDS: Dict[str, str] = {
+    "overall_fit": "전반적 적합도",
+    "tech_stack_match": "기술 스택 매칭",
+    "experience_fit": "경력 충족도",
+}
+
+# 면접 평가 점수
+INTERVIEW_SCORE_FIELDS: Dict[str, str] = {
+    "communication": "의사소통 능력",
+    "technical": "기술적 역량",
+    "teamwork": "협업 및 팀워크",
+    "growth_potential": "성장 가능성",
+    "job_fit": "직무 적합성",
+}
+
+JSON_BLOCK_PATTERN = re.compile(r"```json\s*(\{.*?\})\s*```", re.DOTALL)
+
+def score_format_instruction(fields: Dict[str, str]) -> str:
+    """프롬프트 끝에 붙일 점수 JSON 출력 지시문"""
+    example = ", ".join(f'"{key}": 0' for key in fields)
+    labels = ", ".join(f"{key}={label}" for key, label in fields.items())
+    return f"""
+마지막으로, 위 평가의 점수를 아래 형식의 JSON 코드 블록으로 한 번 더 출력해주세요 (0~100 정수, {labels}):
+```json
+{{{example}}}
+```
+"""
+
+def _clamp(value) -> Optional[int]:
+    try:
+        return max(0, min(100, int(round(float(value)))))
+    except (TypeError, ValueError):
+        return None
+
+def extract_scores(analysis: str, fields: Dict[str, str]) -> Tuple[str, Dict[str, Optional[int]]]:
+    """
+    분석 결과에서 점수 추출
+    
+    Returns:
+        (JSON 블록을 제거한 마크다운, {필드: 점수 또는 None})
+    """
+    analysis = analysis or ""
+    scores: Dict[str, Optional[int]] = {key: None for key in fields}
+    
+    block = None
+    for block in JSON_BLOCK_PATTERN.finditer(analysis):
+        pass
+    if block is not None:
+        try:
+            parsed = json.loads(block.group(1))
+            for key in fields:
+                scores[key] = _clamp(parsed.get(key))
+        except (ValueError, AttributeError):
+            pass
+        analysis = (analysis[:block.start()] + analysis[block.end():]).rstrip()
+        # JSON 블록 앞에 남은 안내 문구 제거
+        analysis = re.sub(r"\n[^\n]{0,60}JSON[^\n]{0,60}$", "", analysis).rstrip()
+        
+    # JSON에서 얻지 못한 항목은 마크다운 문구에서 추출
+    for key, label in fields.items():
+        if scores[key] is None:
+            match = re.search(rf"{re.escape(label)}\**\s*[:：]?\s*\**\s*(\d{{1,3}})\s*/\s*100", analysis)
+            if match:
+                scores[key] = _clamp(match.group(1))
+    return analysis, scores
+
+def average_score(scores: Dict[str, Optional[int]]) -> Optional[int]:
+    """추출된 점수들의 평균 (하나도 없으면 None)"""
+    values = [value for value in scores.values() if value is not None]
+    return round(sum(values) / len(values)) if values else None
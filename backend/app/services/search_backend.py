@@ -0,0 +1,421 @@
+"""
+문서 검색 백엔드
+
+DocumentAnalyzer(파일명 조회, 인덱싱 대기)와 RAG 리트리버(top-k 검색)는 이 인터페이스로만 검색합니다.
+
+- azure: Azure AI Search (Blob 인덱서가 문서를 색인하므로 업로드 후 인덱서 실행/대기가 필요)
+- local: 내장 인덱스 (업로드 시점에 바로 색인, 네트워크 없이 메모리에서 검색)
+    - 디스크에 저장하는 역색인(BM25) + NumPy 벡터 행렬(해시 임베딩, 코사인 유사도)
+    - 색인할 때는 index.log.jsonl에 한 줄만 추가하고, 로그가 쌓이면 백그라운드에서 스냅샷(index.json / vectors.npy)으로 압축
+    - 서버 재시작 시 스냅샷을 불러온 뒤 로그를 재생
+    - 단일 프로세스 전용 (워커가 여러 개면 azure 사용)
+
+검색 결과는 Azure Blob 인덱서와 같은 필드(chunk, title, metadata_storage_name 등)의 dict로 반환하므로
+기존 파일명 매칭 로직을 백엔드와 무관하게 그대로 사용합니다.
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from ..config import settings
+from .retriever_cache import retriever_cache
+
+logger = logging.getLogger(__name__)
+
+# 로컬 인덱스의 문서 필드 (Azure Blob 인덱서가 만드는 필드와 같은 이름)
+LOCAL_INDEX_FIELDS = ["chunk_id", "parent_id", "chunk", "title", "metadata_storage_name"]
+LOCAL_INDEX_NAME = "local"
+
+# 파일명을 담는 필드 (필드:값 질의는 파일명 정확 일치로 조회)
+_NAME_FIELDS = ("title", "metadata_storage_name", "parent_id")
+
+# 밑줄/기호로 분리 (resume_홍길동.pdf → resume, 홍길동, pdf)
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+_HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+# 벡터 행렬 초기 용량 (문서 수가 넘으면 두 배씩 늘림)
+VECTOR_INITIAL_CAPACITY = 64
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def tokenize(text: str) -> List[str]:
+    """
+    검색용 토큰 분리
+    
+    한글 토큰은 조사/어미가 붙어도 매칭되도록 두 글자 단위(bigram)도 함께 추가합니다 (파이썬을 → 파이썬을, 파이, 이썬, 썬을).
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall((text or "").lower()):
+        tokens.append(token)
+        if len(token) > 2 and _HANGUL_PATTERN.search(token):
+            tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+    return tokens
+
+def extract_text(filename: str, content: bytes) -> Optional[str]:
+    """업로드 파일에서 색인할 텍스트 추출 (추출할 수 없으면 None)"""
+    if filename.lower().endswith(".pdf"):
+        try:
+            import io
+            from pypdf import PdfReader
+        except ImportError:  # 선택 의존성
+            logger.warning(f"pypdf가 설치되지 않아 PDF를 로컬 검색 인덱스에 색인하지 않습니다: {filename}")
+            return None
+        try:
+            return "\n".join(page.extract_text() or "" for page in PdfReader(io.BytesIO(content)).pages)
+        except Exception as e:
+            logger.warning(f"PDF 텍스트 추출 실패: {filename} ({str(e)})")
+            return None
+    for encoding in ("utf-8", "cp949"):
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return None
+
+class SearchBackend(ABC):
+    """검색 백엔드 인터페이스 (search/field_names가 없으면 생성 시 TypeError)"""
+    
+    # 업로드 시점에 바로 색인하는지 (True면 인덱서 실행/인덱싱 대기가 필요 없음)
+    indexes_on_upload = False
+    index_name = ""
+    
+    @abstractmethod
+    def search(self, search_text: str = "*", top: Optional[int] = None, select: Optional[List[str]] = None, **kwargs) -> Iterable[Dict[str, Any]]:
+        """
+        Azure AI Search 단순 질의 방식의 검색 ("*", "구문", 필드:값, 일반 텍스트)
+        
+        Returns:
+            결과 문서 dict (select 필드 + @search.score)
+        """
+    
+    def retrieve(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """질문과 관련도가 높은 문서 top_k개 (RAG context용)"""
+        return list(self.search(search_text=query, top=top_k))
+    
+    @abstractmethod
+    def field_names(self) -> List[str]:
+        """인덱스 필드 이름 목록"""
+    
+    def index_document(self, name: str, content: bytes) -> bool:
+        """업로드된 파일을 색인 (업로드 시점 색인을 지원하지 않으면 False)"""
+        return False
+
+class AzureSearchBackend(SearchBackend):
+    """Azure AI Search (문서는 Blob 인덱서가 색인)"""
+    
+    def __init__(self, search_client, index_client, index_name: str):
+        self.search_client = search_client
+        self.index_client = index_client
+        self.index_name = index_name
+    
+    def search(self, search_text: str = "*", top: Optional[int] = None, select: Optional[List[str]] = None, **kwargs) -> Iterable[Dict[str, Any]]:
+        return self.search_client.search(search_text=search_text, top=top, select=select, **kwargs)
+    
+    def field_names(self) -> List[str]:
+        return [field.name for field in self.index_client.get_index(self.index_name).fields]
+
+class LocalSearchBackend(SearchBackend):
+    """
+    내장 검색 인덱스 (역색인 BM25 + NumPy 해시 벡터)
+    
+    문서는 슬롯 번호로 관리하고 벡터 행렬의 같은 행에 저장합니다.
+    같은 파일을 다시 업로드하면 같은 슬롯을 덮어쓰고, 내용 해시가 같으면 아무 것도 하지 않습니다.
+    """
+    
+    indexes_on_upload = True
+    index_name = LOCAL_INDEX_NAME
+    
+    def __init__(self, directory: Optional[str] = None):
+        import numpy as np
+        self._np = np
+        self.directory = directory or settings.local_search_dir
+        self.dimensions = settings.local_search_vector_dim
+        self._index_path = os.path.join(self.directory, "index.json")
+        self._vectors_path = os.path.join(self.directory, "vectors.npy")
+        self._log_path = os.path.join(self.directory, "index.log.jsonl")
+        self._lock = threading.RLock()  # 메모리 인덱스 (검색과 반영)
+        self._write_lock = threading.Lock()  # 로그 추가/압축 (쓰는 쪽끼리만 직렬화, 검색은 막지 않음)
+        
+        self._documents: List[Optional[Dict[str, Any]]] = []  # 슬롯별 문서
+        self._by_name: Dict[str, int] = {}  # 파일명 → 슬롯
+        self._postings: Dict[str, Dict[int, int]] = {}  # 토큰 → {슬롯: 출현 횟수}
+        self._lengths: List[int] = []  # 슬롯별 토큰 수
+        self._total_length = 0
+        # 벡터 행렬은 여유 용량을 두고 늘림 (앞의 len(self._documents)행만 사용)
+        self._vectors = np.zeros((VECTOR_INITIAL_CAPACITY, self.dimensions), dtype=np.float32)
+        self._log_records = 0
+        self._compacting = False
+        
+        os.makedirs(self.directory, exist_ok=True)
+        self._load()
+        self._log = open(self._log_path, "a", encoding="utf-8")
+    
+    def field_names(self) -> List[str]:
+        return list(LOCAL_INDEX_FIELDS)
+        
+    # ---------- 색인 ----------
+    
+    def index_document(self, name: str, content: bytes) -> bool:
+        content_hash = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            slot = self._by_name.get(name)
+            if slot is not None and self._documents[slot].get("content_sha256") == content_hash:
+                return True
+                
+        text = extract_text(name, content)
+        if text is None:
+            return False
+        document = {
+            "chunk_id": f"{name}_0",
+            "parent_id": name,
+            "chunk": text,
+            "title": name,
+            "metadata_storage_name": name,
+            "content_sha256": content_hash,
+        }
+        tokens = tokenize(f"{name}\n{text}")
+        vector = self._embed(tokens)
+        
+        with self._write_lock:
+            # 로그에 먼저 기록한 뒤 메모리에 반영 (로그 순서 = 반영 순서)
+            self._log.write(json.dumps({"op": "put", "doc": document}, ensure_ascii=False) + "\n")
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._log_records += 1
+            with self._lock:
+                self._apply(document, tokens, vector)
+            compact = self._log_records >= settings.local_search_compact_min_records and not self._compacting
+            if compact:
+                self._compacting = True
+        if compact:
+            threading.Thread(target=self._compact, name="local-search-compact", daemon=True).start()
+        retriever_cache.invalidate(f"로컬 색인 {name}")
+        logger.info(f"로컬 검색 인덱스에 색인: {name} (토큰 {len(tokens)}개)")
+        return True
+    
+    def _apply(self, document: Dict[str, Any], tokens: List[str], vector):
+        """문서를 메모리 인덱스에 반영 (self._lock 보유 상태에서 호출)"""
+        name = document["title"]
+        slot = self._by_name.get(name)
+        if slot is None:
+            slot = len(self._documents)
+            self._documents.append(None)
+            self._lengths.append(0)
+            if slot >= len(self._vectors):
+                self._grow(slot + 1)
+        else:
+            self._remove_postings(slot)
+        self._documents[slot] = document
+        self._by_name[name] = slot
+        self._add_postings(slot, tokens)
+        self._vectors[slot] = vector
+    
+    def _grow(self, required: int):
+        """벡터 행렬 용량을 두 배씩 늘림 (문서마다 행렬 전체를 복사하지 않도록)"""
+        capacity = max(len(self._vectors) * 2, required, VECTOR_INITIAL_CAPACITY)
+        grown = self._np.zeros((capacity, self.dimensions), dtype=self._np.float32)
+        grown[:len(self._vectors)] = self._vectors
+        self._vectors = grown
+    
+    def _add_postings(self, slot: int, tokens: List[str]):
+        for token, count in Counter(tokens).items():
+            self._postings.setdefault(token, {})[slot] = count
+        self._lengths[slot] = len(tokens)
+        self._total_length += len(tokens)
+    
+    def _remove_postings(self, slot: int):
+        document = self._documents[slot]
+        for token in set(tokenize(f"{document['title']}\n{document['chunk']}")):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(slot, None)
+                if not postings:
+                    del self._postings[token]
+        self._total_length -= self._lengths[slot]
+        self._lengths[slot] = 0
+    
+    def _embed(self, tokens: List[str]):
+        """토큰 해시 임베딩 (crc32로 차원/부호 결정, 로그 빈도 가중치, 단위 벡터로 정규화)"""
+        np = self._np
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token, count in Counter(tokens).items():
+            hashed = zlib.crc32(token.encode("utf-8"))
+            vector[hashed % self.dimensions] += (1.0 if hashed & 0x80000000 else -1.0) * (1.0 + math.log(count))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+        
+    # ---------- 저장 / 불러오기 ----------
+    
+    def _compact(self):
+        """
+        현재 인덱스를 새 스냅샷으로 교체한 뒤 로그를 비움 (백그라운드 스레드)
+        
+        쓰기 잠금만 잡으므로 압축 중에도 검색은 계속되고, 색인은 압축이 끝날 때까지 기다립니다.
+        """
+        try:
+            with self._write_lock:
+                count = len(self._documents)
+                payload = {
+                    "dimensions": self.dimensions,
+                    "documents": self._documents,
+                    "lengths": self._lengths,
+                    "postings": self._postings,
+                }
+                # 쓰는 쪽은 모두 _write_lock을 거치므로 그 사이 인덱스가 바뀌지 않음
+                temp_path = f"{self._index_path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                with open(f"{self._vectors_path}.tmp", "wb") as f:
+                    self._np.save(f, self._vectors[:count])
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(f"{self._vectors_path}.tmp", self._vectors_path)
+                os.replace(temp_path, self._index_path)
+                
+                # 스냅샷 교체 후 로그를 비움 (그 사이 중단되어도 재생은 같은 슬롯을 덮어쓰므로 멱등)
+                compacted_records = self._log_records
+                self._log.truncate(0)
+                self._log.flush()
+                os.fsync(self._log.fileno())
+                self._log_records = 0
+            logger.info(f"로컬 검색 인덱스 압축 완료: 문서 {count}개, 로그 {compacted_records}건 정리")
+        except Exception as e:
+            logger.error(f"로컬 검색 인덱스 압축 실패: {str(e)}")
+        finally:
+            self._compacting = False
+    
+    def _load(self):
+        """스냅샷을 불러온 뒤 로그 재생"""
+        np = self._np
+        if os.path.exists(self._index_path):
+            try:
+                with open(self._index_path, "r", encoding="utf-8") as f:
+                    payload = json.load(f)
+                vectors = np.load(self._vectors_path)
+                if payload.get("dimensions") != self.dimensions or len(vectors) != len(payload["documents"]):
+                    raise ValueError("벡터 차원 또는 문서 수가 맞지 않습니다")
+            except Exception as e:
+                logger.error(f"로컬 검색 인덱스 스냅샷 로드 실패, 로그만 재생: {str(e)}")
+            else:
+                self._documents = payload["documents"]
+                self._lengths = payload["lengths"]
+                self._total_length = sum(self._lengths)
+                # JSON 키는 문자열이므로 슬롯 번호로 변환
+                self._postings = {token: {int(slot): count for slot, count in postings.items()} for token, postings in payload["postings"].items()}
+                self._by_name = {document["title"]: slot for slot, document in enumerate(self._documents) if document}
+                self._vectors = np.zeros((max(len(vectors) * 2, VECTOR_INITIAL_CAPACITY), self.dimensions), dtype=np.float32)
+                self._vectors[:len(vectors)] = vectors
+        self._replay_log()
+        logger.info(f"로컬 검색 인덱스 로드: 문서 {len(self._by_name)}개, 토큰 {len(self._postings)}개 (로그 재생 {self._log_records}건)")
+    
+    def _replay_log(self):
+        """스냅샷 이후 추가된 문서 반영 (쓰다 중단된 마지막 줄은 잘라냄)"""
+        try:
+            with open(self._log_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        valid = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                document = json.loads(line)["doc"]
+            except (ValueError, KeyError):
+                break
+            tokens = tokenize(f"{document['title']}\n{document['chunk']}")
+            self._apply(document, tokens, self._embed(tokens))
+            self._log_records += 1
+            valid += len(line)
+        if valid < len(data):
+            with open(self._log_path, "r+b") as f:
+                f.truncate(valid)
+        
+    # ---------- 검색 ----------
+    
+    def search(self, search_text: str = "*", top: Optional[int] = None, select: Optional[List[str]] = None, **kwargs) -> Iterator[Dict[str, Any]]:
+        query = (search_text or "*").strip()
+        with self._lock:
+            if query == "*":
+                ranked = [(slot, 1.0) for slot, document in enumerate(self._documents) if document]
+            elif query.startswith('"') and query.endswith('"') and len(query) > 1:
+                ranked = self._phrase_search(query.strip('"'))
+            elif ":" in query and query.split(":", 1)[0] in LOCAL_INDEX_FIELDS:
+                field, value = query.split(":", 1)
+                ranked = self._field_search(field, value.strip())
+            else:
+                ranked = self._hybrid_search(query)
+            if top:
+                ranked = ranked[:top]
+            results = [self._result(self._documents[slot], score, select) for slot, score in ranked]
+        return iter(results)
+    
+    def retrieve(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._result(self._documents[slot], score, None) for slot, score in self._hybrid_search(query)[:top_k]]
+    
+    @staticmethod
+    def _result(document: Dict[str, Any], score: float, select: Optional[List[str]]) -> Dict[str, Any]:
+        fields = select or LOCAL_INDEX_FIELDS
+        result = {field: document.get(field) for field in fields}
+        result["@search.score"] = score
+        return result
+    
+    def _field_search(self, field: str, value: str) -> List[Tuple[int, float]]:
+        """필드:값 (파일명 필드는 정확 일치 우선, 그 외에는 부분 일치)"""
+        if field in _NAME_FIELDS and value in self._by_name:
+            return [(self._by_name[value], 1.0)]
+        needle = value.lower()
+        return [(slot, 1.0) for slot, document in enumerate(self._documents)
+                if document and needle in str(document.get(field, "")).lower()]
+    
+    def _phrase_search(self, phrase: str) -> List[Tuple[int, float]]:
+        """구문 검색 (구문이 그대로 포함된 문서만, BM25 순)"""
+        needle = phrase.lower()
+        return [(slot, score) for slot, score in self._bm25(tokenize(phrase))
+                if needle in f"{self._documents[slot]['title']}\n{self._documents[slot]['chunk']}".lower()]
+    
+    def _bm25(self, tokens: List[str]) -> List[Tuple[int, float]]:
+        """BM25 점수 내림차순 (슬롯, 점수)"""
+        live = len(self._by_name)
+        if not live:
+            return []
+        average_length = self._total_length / live or 1.0
+        scores: Dict[int, float] = {}
+        for token in set(tokens):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (live - len(postings) + 0.5) / (len(postings) + 0.5))
+            for slot, count in postings.items():
+                norm = count + BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[slot] / average_length)
+                scores[slot] = scores.get(slot, 0.0) + idf * count * (BM25_K1 + 1) / norm
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    
+    def _hybrid_search(self, query: str) -> List[Tuple[int, float]]:
+        """BM25(최고점 기준 정규화)와 벡터 코사인 유사도의 가중 합"""
+        tokens = tokenize(query)
+        if not tokens or not self._by_name:
+            return []
+        weight = settings.local_search_vector_weight
+        keyword_scores = self._bm25(tokens)
+        best = keyword_scores[0][1] if keyword_scores else 1.0
+        combined = {slot: (1 - weight) * score / best for slot, score in keyword_scores}
+        if weight > 0:
+            similarities = self._vectors[:len(self._documents)] @ self._embed(tokens)
+            for slot in self._by_name.values():
+                similarity = float(similarities[slot])
+                if similarity > 0:
+                    combined[slot] = combined.get(slot, 0.0) + weight * similarity
+        return sorted(combined.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,76 @@
+"""
+동일 분석 요청 single-flight
+
+면접관이 버튼을 두 번 누르거나 여러 면접관이 같은 지원자를 동시에 열면 같은 입력의 분석 요청이 겹칩니다.
+정규화한 입력으로 키를 만들어 진행 중인 실행이 있으면 새로 시작하지 않고 그 결과를 함께 기다립니다.
+완료된 결과는 보관하지 않으므로 (캐시가 아님) 실행이 끝난 뒤의 요청은 다시 분석합니다.
+
+한 요청이 연결을 끊어도 공유 중인 실행은 취소되지 않습니다 (asyncio.shield).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Callable, Dict
+from fastapi.concurrency import run_in_threadpool
+from ..config import settings
+from .metrics import SINGLE_FLIGHT
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+def _normalize(value: Any) -> Any:
+    """키 비교용 정규화 (문자열은 앞뒤 공백 제거 + 연속 공백을 하나로)"""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    return value
+
+def make_key(operation: str, *inputs: Any) -> str:
+    """작업 이름 + 정규화한 입력의 SHA-256"""
+    payload = json.dumps(_normalize(list(inputs)), ensure_ascii=False, sort_keys=True, default=str)
+    return f"{operation}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+class SingleFlight:
+    """키별로 진행 중인 실행을 하나만 유지하는 실행기"""
+    
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+    
+    async def run(self, operation: str, inputs: tuple, func: Callable, *args, **kwargs) -> Any:
+        """
+        func(*args, **kwargs)를 스레드풀에서 실행 (같은 키의 실행이 진행 중이면 그 결과를 공유)
+        
+        Args:
+            operation: 작업 이름 (메트릭 라벨)
+            inputs: 결과를 결정하는 입력값 (정규화 후 키로 사용)
+            func: 실행할 동기 함수
+        """
+        if not settings.single_flight_enabled:
+            return await run_in_threadpool(func, *args, **kwargs)
+            
+        key = make_key(operation, *inputs)
+        future = self._in_flight.get(key)
+        if future is not None:
+            SINGLE_FLIGHT.labels(operation, "follower").inc()
+            logger.info(f"진행 중인 동일 요청 결과 공유: {operation}")
+            with span("single_flight_wait", operation=operation):
+                return await asyncio.shield(future)
+                
+        SINGLE_FLIGHT.labels(operation, "leader").inc()
+        future = asyncio.ensure_future(run_in_threadpool(func, *args, **kwargs))
+        self._in_flight[key] = future
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(future)
+    
+    def _finish(self, key: str, future: asyncio.Future):
+        self._in_flight.pop(key, None)
+        # 기다리던 요청이 모두 끊긴 경우에도 예외가 "조회되지 않음" 경고로 남지 않도록 확인
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"공유 실행 실패: {key.split(':')[0]} ({str(future.exception())})")
+
+# 전역 single-flight 인스턴스
+single_flight = SingleFlight()
@@ -3,20 +3,34 @@
 Azure OpenAI gpt-4o-transcribe 모델을 사용한 음성-텍스트 변환 및 면접 분석
 """
 import os
+import re
 import logging
 import tempfile
-from typing import Optional, Dict, Any
-import openai
-from azure.storage.blob import BlobServiceClient
-from langchain_openai import AzureChatOpenAI
+from typing import Optional, Dict, Any, List
 from ..config import settings
+from .llm_gateway import llm_gateway
+from .token_budget import token_budget_manager, count_tokens
+from .scoring import INTERVIEW_SCORE_FIELDS, score_format_instruction, extract_scores
+from .metrics import observe_stage, observe_payload
+from .tracing import span, traced
+from .lazy import LazyService
+from .blob_inventory import blob_inventory
+from .storage_backend import create_storage_backend
 
 logger = logging.getLogger(__name__)
 
+# 면접관 질문으로 보이는 문장 (질문/답변 구간 경계 판단용)
+QUESTION_PATTERN = re.compile(r"(\?|까요|니까|나요|세요|주시겠어요|인가요|있나요)\s*$")
+
 class SpeechAnalysisService:
     """면접 녹음 STT 및 분석 서비스"""
     
-    def __init__(self):
+    def __init__(self, openai_client=None, storage=None):
+        """
+        Args:
+            openai_client: STT용 openai.AzureOpenAI (없으면 설정값으로 생성)
+            storage: 파일 저장소 (없으면 storage_backend 설정으로 생성)
+        """
         # Azure OpenAI 클라이언트 설정 (STT용) - GPT-4o-transcribe 전용
         # 🔧 .env 파일 설정값 사용
         stt_endpoint = settings.azureopenai_endpoint or "https://user04-openai-eastus2.openai.azure.com/"
@@ -24,44 +38,36 @@ class SpeechAnalysisService:
         stt_api_version = settings.azureopenai_api_version  # .env에서 로드: 2025-03-20
         self.stt_model = settings.azureopenai_transcription_model  # .env에서 로드: gpt-4o-transcribe-eastus2
             
-        print(f"🔧 STT용 Azure OpenAI 설정 (.env 파일 연동):")
-        print(f"   Endpoint: {stt_endpoint}")
-        print(f"   API Key: {stt_key[:10]}...{stt_key[-5:] if stt_key else 'NONE'}")
-        print(f"   API Version: {stt_api_version}")
-        print(f"   Model: {self.stt_model}")
+        # API 키 값은 로그에 남기지 않음 (설정 여부만 기록)
+        logger.info(
+            f"STT용 Azure OpenAI 설정: endpoint={stt_endpoint}, api_version={stt_api_version}, "
+            f"model={self.stt_model}, api_key={'설정됨' if stt_key else '없음'}"
+        )
         
-        self.openai_client = openai.AzureOpenAI(
+        # 공용 게이트웨이의 HTTP 커넥션 풀 사용 (호출은 llm_gateway.call로 한도 적용)
+        self.openai_client = openai_client or llm_gateway.openai_client(
             api_key=stt_key,
             api_version=stt_api_version,
             azure_endpoint=stt_endpoint
         )
         
-        # LangChain Azure OpenAI 클라이언트 (분석용)
-        self.llm = AzureChatOpenAI(
-            model=settings.azure_openai_deployment_name,
-            temperature=0.3,
-            api_version=settings.azure_openai_api_version,
-            azure_endpoint=settings.azure_openai_endpoint,
-            azure_deployment=settings.azure_openai_deployment_name,
+        # LangChain Azure OpenAI 클라이언트 (분석용, 공용 게이트웨이 경유)
+        self.llm = llm_gateway.chat_model(
+            deployment=settings.azure_openai_deployment_name,
+            temperature=0.3
         )
         
-        # Azure Blob Storage 클라이언트
-        if settings.azure_storage_account_name and settings.azure_storage_account_key:
-            self.blob_service_client = BlobServiceClient(
-                account_url=f"https://{settings.azure_storage_account_name}.blob.core.windows.net",
-                credential=settings.azure_storage_account_key
-            )
-            self.container_name = settings.azure_storage_container_name
-        else:
-            self.blob_service_client = None
-            self.container_name = None
+        # 파일 저장소 (storage_backend: Azure Blob Storage 또는 로컬 파일 시스템)
+        self.container_name = storage.container if storage is not None else settings.azure_storage_container_name
+        self.storage = storage or create_storage_backend(self.container_name)
     
 
 
+    @observe_stage("blob_upload")
     def upload_audio_file(self, file_content: bytes, filename: str) -> Dict[str, Any]:
-        """면접 녹음 파일을 Azure Blob Storage에 업로드"""
+        """면접 녹음 파일을 저장소에 업로드"""
         try:
-            if not self.blob_service_client or not self.container_name:
+            if self.storage is None:
                 return {
                     "status": "error",
                     "message": "Azure Storage가 설정되지 않았습니다."
@@ -70,13 +76,10 @@ class SpeechAnalysisService:
             # 면접 파일명 앞에 prefix 추가
             interview_filename = f"interview_{filename}"
             
-            blob_client = self.blob_service_client.get_blob_client(
-                container=self.container_name,
-                blob=interview_filename
-            )
-            
             # 파일 업로드
-            blob_client.upload_blob(file_content, overwrite=True)
+            observe_payload("audio_upload", len(file_content))
+            self.storage.put(interview_filename, file_content)
+            blob_inventory.invalidate(self.container_name)
             
             logger.info(f"면접 녹음 파일 업로드 완료: {interview_filename}")
             
@@ -92,6 +95,7 @@ class SpeechAnalysisService:
                 "message": f"면접 녹음 파일 업로드 중 오류 발생: {str(e)}"
             }
     
+    @observe_stage("stt")
     def transcribe_audio(self, file_content: bytes, filename: str) -> Dict[str, Any]:
         """음성 파일을 텍스트로 변환 (STT)"""
         processing_status = "UNKNOWN"
@@ -103,7 +107,7 @@ class SpeechAnalysisService:
             
             # 1단계: 파일 처리
             processing_status = "파일 처리 중"
-            print(f"📋 [1단계] 파일 처리 시작: {filename}")
+            logger.debug(f"[1단계] 파일 처리 시작: {filename}")
             
             # 원본 파일 확장자 추출
             file_ext = os.path.splitext(filename)[1].lower()
@@ -111,39 +115,37 @@ class SpeechAnalysisService:
                 file_ext = ".wav"  # 기본값
             
             # 🎵 모든 파일 타입 직접 지원 (Azure Playground 확인됨)
-            print(f"🎵 {file_ext} 파일 - Azure OpenAI 직접 지원")
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
-                temp_file.write(file_content)
-                temp_file_path = temp_file.name
+            logger.debug(f"{file_ext} 파일 - Azure OpenAI 직접 지원")
+            with span("stt_temp_file", bytes=len(file_content)):
+                with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
+                    temp_file.write(file_content)
+                    temp_file_path = temp_file.name
             file_status = f"{file_ext} 파일 처리 완료 (직접 지원)"
             
-            print(f"✅ [1단계] 파일 처리 성공: {file_status}")
+            logger.debug(f"[1단계] 파일 처리 성공: {file_status}")
             processing_status = "API 호출 준비 중"
             
             try:
                 # 2단계: Azure OpenAI API 호출
-                print(f"📋 [2단계] Azure OpenAI API 호출 시작")
-                print(f"   🎯 모델: gpt-4o-transcribe-eastus2")
-                print(f"   📁 파일: {temp_file_path}")
-                print(f"   🌏 언어: ko")
-                print(f"   🔗 API 버전: 2025-03-20")
+                logger.debug(f"[2단계] Azure OpenAI API 호출 시작: model={self.stt_model}, file={temp_file_path}, language=ko")
                 
                 processing_status = "Azure OpenAI API 호출 중"
                 api_status = "API 호출 전송 중"
                 
                 # 🔥 gpt-4o-transcribe-eastus2 모델만 사용
-                with open(temp_file_path, "rb") as audio_file:
-                    transcript = self.openai_client.audio.transcriptions.create(
-                        model=self.stt_model,  # .env에서 로드된 모델명 사용
-                        file=audio_file,
-                        language="ko"
-                    )
+                def create_transcription():
+                    # 재시도 시 파일을 처음부터 다시 읽도록 호출마다 새로 엶
+                    with open(temp_file_path, "rb") as audio_file:
+                        return self.openai_client.audio.transcriptions.create(
+                            model=self.stt_model,  # .env에서 로드된 모델명 사용
+                            file=audio_file,
+                            language="ko"
+                        )
+                
+                transcript = llm_gateway.call(self.stt_model, create_transcription)
                 
                 api_status = "API 호출 성공"
                 transcribed_text = transcript.text
-                print(f"✅ [2단계] Azure OpenAI API 호출 성공")
-                print(f"🎯 사용된 모델: gpt-4o-transcribe-eastus2")
-                print(f"📝 변환된 텍스트 길이: {len(transcribed_text)}자")
                 logger.info(f"STT 완료 (모델: gpt-4o-transcribe-eastus2): {len(transcribed_text)}자")
                 
                 processing_status = "완료"
@@ -181,17 +183,12 @@ class SpeechAnalysisService:
             else:
                 error_stage = processing_status
             
-            print(f"💥 [오류 발생] 단계: {error_stage}")
-            print(f"💥 오류 타입: {type(e).__name__}")
-            print(f"💥 오류 메시지: {str(e)}")
-            print(f"📊 처리 상태: {processing_status}")
-            print(f"📁 파일 상태: {file_status}")
-            print(f"🔗 API 상태: {api_status}")
-            
-            import traceback
-            print(f"💥 상세 스택 트레이스:\n{traceback.format_exc()}")
-            
-            logger.error(f"STT 오류 ({error_stage}): {str(e)}")
+            # 스택 트레이스는 exc_info로 로그 레코드에 포함
+            logger.error(
+                f"STT 오류 ({error_stage}): {type(e).__name__}: {str(e)} "
+                f"[처리 상태: {processing_status}, 파일 상태: {file_status}, API 상태: {api_status}]",
+                exc_info=True
+            )
             
             # 사용자 친화적 에러 메시지 생성
             if "404" in str(e):
@@ -211,12 +208,14 @@ class SpeechAnalysisService:
                 "technical_error": str(e)
             }
     
+    @traced("interview_analysis")
     def analyze_interview_content(self, transcription: str, job_description: str = "") -> Dict[str, Any]:
         """면접 내용 분석"""
         try:
             logger.info(f"면접 분석 시작: {len(transcription)}자")
             
-            prompt = f"""
+            def build_prompt(transcription: str, job_description: str) -> str:
+                return f"""
 당신은 전문 면접관이자 HR 컨설턴트입니다. 다음 면접 내용을 분석하여 지원자를 평가해주세요.
 
 **면접 내용:**
@@ -261,16 +260,40 @@ class SpeechAnalysisService:
 1. 레퍼런스 체크 시 확인할 사항
 2. 실무 테스트 추천 영역
 3. 온보딩 시 중점 지원 사항
-"""
+""" + score_format_instruction(INTERVIEW_SCORE_FIELDS)
+            
+            # 긴 면접은 질문/답변 구간별로 병렬 요약(map)한 뒤 요약본으로 평가(reduce)
+            interview_content = transcription
+            window_count = 0
+            if count_tokens(transcription) > settings.interview_map_reduce_threshold_tokens:
+                windows = self._split_qa_windows(transcription)
+                window_count = len(windows)
+                logger.info(f"긴 면접 내용 → map-reduce 분석: {window_count}개 구간")
+                interview_content = (
+                    "(면접이 길어 질문/답변 구간별 요약으로 제공됩니다)\n\n"
+                    + self._summarize_windows(windows, job_description)
+                )
+            
+            # 토큰 예산을 넘는 원문은 정책(압축/자르기)에 따라 줄여서 전송
+            with span("prompt_budget"):
+                prompt, token_usage = token_budget_manager.fit(
+                    "interview_analysis", build_prompt,
+                    transcription=interview_content, job_description=job_description
+                )
             
             result = self.llm.invoke(prompt)
+            analysis, scores = extract_scores(result.content, INTERVIEW_SCORE_FIELDS)
             
             logger.info("면접 분석 완료")
             
             return {
                 "status": "success",
-                "analysis": result.content,
-                "text_length": len(transcription)
+                "analysis": analysis,
+                "scores": scores,
+                "text_length": len(transcription),
+                "analysis_mode": "map_reduce" if window_count else "single",
+                "window_count": window_count,
+                "token_usage": token_budget_manager.completion_usage(token_usage, result)
             }
             
         except Exception as e:
@@ -280,6 +303,63 @@ class SpeechAnalysisService:
                 "message": f"면접 분석 중 오류 발생: {str(e)}"
             }
     
+    def _split_qa_windows(self, transcription: str) -> List[str]:
+        """
+        STT 결과를 질문/답변 구간으로 분할
+        
+        구간이 interview_window_tokens에 가까워지면 다음 질문 문장에서 새 구간을 시작하고,
+        질문이 없이 길게 이어지면 1.5배 지점에서 강제로 나눕니다.
+        """
+        sentences = [
+            sentence
+            for line in transcription.splitlines()
+            for sentence in re.split(r"(?<=[.!?])\s+", line.strip())
+            if sentence
+        ]
+        target = settings.interview_window_tokens
+        windows: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for sentence in sentences:
+            tokens = count_tokens(sentence)
+            is_question = bool(QUESTION_PATTERN.search(sentence))
+            if current and (
+                (is_question and current_tokens >= target) or current_tokens + tokens > target * 1.5
+            ):
+                windows.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(sentence)
+            current_tokens += tokens
+        if current:
+            windows.append(" ".join(current))
+        return windows
+    
+    @traced("map_summarize")
+    def _summarize_windows(self, windows: List[str], job_description: str) -> str:
+        """각 구간을 병렬로 요약 (map 단계) 후 구간 순서대로 합침"""
+        job_hint = f"\n**채용공고 정보:**\n{job_description}\n" if job_description else ""
+        prompts = [
+            f"""
+다음은 긴 면접 녹취의 {index + 1}/{len(windows)}번째 구간입니다. 최종 평가에 쓸 수 있도록 요약해주세요.
+{job_hint}
+**면접 구간:**
+{window}
+
+아래 항목을 간결하게 정리해주세요 (녹취에 없는 내용은 추측하지 마세요):
+- 질문: 이 구간에서 나온 질문 요지
+- 답변 요지: 지원자의 핵심 답변 (구체적 경험, 기술, 수치 포함)
+- 관찰된 강점
+- 관찰된 약점/아쉬운 점
+- 인상적이거나 추가 확인이 필요한 발언 (가능하면 원문 인용)
+"""
+            for index, window in enumerate(windows)
+        ]
+        # 게이트웨이가 배포별 한도를 지키므로 구간 수만큼 동시에 보내도 안전
+        results = self.llm.batch(prompts, config={"max_concurrency": settings.interview_map_concurrency})
+        return "\n\n".join(
+            f"### 구간 {index + 1}\n{result.content}" for index, result in enumerate(results)
+        )
+    
     def upload_and_transcribe(self, file_content: bytes, filename: str) -> Dict[str, Any]:
         """업로드 + STT 한 번에 처리"""
         try:
@@ -310,28 +390,28 @@ class SpeechAnalysisService:
     def get_interview_files_list(self) -> Dict[str, Any]:
         """저장된 면접 녹음 파일 목록 조회"""
         try:
-            if not self.blob_service_client or not self.container_name:
+            if self.storage is None:
                 return {
                     "status": "error",
                     "message": "Azure Storage가 설정되지 않았습니다."
                 }
             
-            container_client = self.blob_service_client.get_container_client(self.container_name)
-            
             interview_files = []
             
-            # interview_ prefix가 있는 파일들만 조회
-            blobs = container_client.list_blobs(name_starts_with="interview_")
+            # 컨테이너 인벤토리(캐시)에서 interview_ prefix가 있는 파일들만 조회
+            blobs, inventory_etag = blob_inventory.entries(self.container_name, self.storage.list)
             
             for blob in blobs:
+                if not blob["name"].startswith("interview_"):
+                    continue
                 # interview_ prefix 제거한 표시명
-                display_name = blob.name.replace("interview_", "")
+                display_name = blob["name"].replace("interview_", "")
                 
                 interview_files.append({
-                    "name": blob.name,  # 전체 파일명 (interview_포함)
+                    "name": blob["name"],  # 전체 파일명 (interview_포함)
                     "display_name": display_name,  # 표시용 파일명
-                    "size": blob.size,
-                    "last_modified": blob.last_modified.isoformat() if blob.last_modified else None
+                    "size": blob["size"],
+                    "last_modified": blob["last_modified"].isoformat() if blob["last_modified"] else None
                 })
             
             logger.info(f"면접 파일 목록 조회 완료: {len(interview_files)}개")
@@ -339,7 +419,8 @@ class SpeechAnalysisService:
             return {
                 "status": "success",
                 "interview_files": interview_files,
-                "total_files": len(interview_files)
+                "total_files": len(interview_files),
+                "inventory_etag": inventory_etag  # 조건부 GET용 (라우터에서 ETag 헤더로 옮김)
             }
             
         except Exception as e:
@@ -349,8 +430,8 @@ class SpeechAnalysisService:
                 "message": f"면접 파일 목록 조회 중 오류 발생: {str(e)}"
             }
 
-# 전역 서비스 인스턴스
-speech_service = SpeechAnalysisService()
+# 전역 서비스 인스턴스 (첫 사용 시 생성)
+speech_service = LazyService(SpeechAnalysisService, "speech_service")
 
 # 편의 함수들
 def upload_interview_file(file_content: bytes, filename: str) -> Dict[str, Any]:
@@ -0,0 +1,292 @@
+"""
+SQLite + FTS5 기반 면접 분석 결과 저장소 서비스
+
+- analyses 테이블에 원본 레코드를 저장하고, analyses_fts(FTS5)가 트리거로 동기화됩니다.
+- 검색은 BM25 순위로 필요한 페이지만 조회하므로 전체 저장소를 메모리에 올리지 않습니다.
+- WAL 모드로 열어 여러 워커 프로세스가 동시에 읽고 쓸 수 있습니다.
+  메모리 사본이 없으므로 다른 프로세스의 저장 내용이 다음 조회에 바로 보입니다.
+"""
+import logging
+import os
+import re
+import sqlite3
+import threading
+import uuid
+import json
+from typing import Dict, Any, List, Optional
+from ..config import settings
+from .vector_index import VectorSearchMixin
+
+logger = logging.getLogger(__name__)
+
+# 검색 대상 컬럼 (FTS5 인덱스 컬럼 순서와 동일)
+SEARCH_COLUMNS = ["candidate_name", "position", "summary", "strengths", "weaknesses"]
+
+# BM25 컬럼 가중치 (이름/직무 일치를 본문 일치보다 우선)
+BM25_WEIGHTS = (3.0, 2.0, 1.0, 1.0, 1.0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    candidate_name TEXT NOT NULL DEFAULT '',
+    position TEXT NOT NULL DEFAULT '',
+    summary TEXT NOT NULL DEFAULT '',
+    strengths TEXT NOT NULL DEFAULT '',
+    weaknesses TEXT NOT NULL DEFAULT '',
+    document_type TEXT NOT NULL DEFAULT 'interview_analysis'
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_position ON analyses(position);
+CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts USING fts5(
+    candidate_name, position, summary, strengths, weaknesses,
+    content='analyses', content_rowid='rowid', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS analyses_ai AFTER INSERT ON analyses BEGIN
+    INSERT INTO analyses_fts(rowid, candidate_name, position, summary, strengths, weaknesses)
+    VALUES (new.rowid, new.candidate_name, new.position, new.summary, new.strengths, new.weaknesses);
+END;
+CREATE TRIGGER IF NOT EXISTS analyses_ad AFTER DELETE ON analyses BEGIN
+    INSERT INTO analyses_fts(analyses_fts, rowid, candidate_name, position, summary, strengths, weaknesses)
+    VALUES ('delete', old.rowid, old.candidate_name, old.position, old.summary, old.strengths, old.weaknesses);
+END;
+CREATE TRIGGER IF NOT EXISTS analyses_au AFTER UPDATE ON analyses BEGIN
+    INSERT INTO analyses_fts(analyses_fts, rowid, candidate_name, position, summary, strengths, weaknesses)
+    VALUES ('delete', old.rowid, old.candidate_name, old.position, old.summary, old.strengths, old.weaknesses);
+    INSERT INTO analyses_fts(rowid, candidate_name, position, summary, strengths, weaknesses)
+    VALUES (new.rowid, new.candidate_name, new.position, new.summary, new.strengths, new.weaknesses);
+END;
+"""
+
+DOCUMENT_COLUMNS = ["id"] + SEARCH_COLUMNS + ["document_type"]
+
+class SQLiteStoreService(VectorSearchMixin):
+    """SQLite + FTS5 저장소 서비스 클래스 (TempStoreService와 동일한 인터페이스)"""
+    
+    def __init__(self):
+        """SQLite 저장소 초기화"""
+        try:
+            self.storage_dir = settings.chroma_persist_dir
+            os.makedirs(self.storage_dir, exist_ok=True)
+            self.db_file = os.path.join(self.storage_dir, "interview_analysis.db")
+            
+            # 스레드별 커넥션 (FastAPI 스레드풀에서 동시에 호출됨)
+            self._local = threading.local()
+            
+            conn = self._connection()
+            # WAL 모드는 DB 파일에 기록되므로 최초 1회 설정으로 모든 프로세스에 적용됨
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.executescript(SCHEMA)
+            
+            # 기존 JSON 저장소가 있으면 최초 1회 가져오기
+            self._import_json_store()
+            
+            logger.info(f"SQLite 저장소 초기화 완료: {self.db_file}")
+            
+        except Exception as e:
+            logger.error(f"저장소 초기화 중 오류 발생: {str(e)}")
+            raise Exception(f"저장소 초기화 실패: {str(e)}")
+    
+    def _connection(self) -> sqlite3.Connection:
+        """현재 스레드의 SQLite 커넥션 반환"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=settings.sqlite_busy_timeout_seconds)
+            conn.row_factory = sqlite3.Row
+            # WAL에서는 NORMAL로도 커밋 단위 일관성이 보장됨 (체크포인트 시에만 fsync)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def _import_json_store(self):
+        """JSON 스냅샷 + JSONL 로그 저장소의 레코드를 빈 DB로 가져옴"""
+        conn = self._connection()
+        if conn.execute("SELECT 1 FROM analyses LIMIT 1").fetchone():
+            return
+            
+        documents: Dict[str, Any] = {}
+        snapshot_file = os.path.join(self.storage_dir, "interview_analysis.json")
+        log_file = os.path.join(self.storage_dir, "interview_analysis.log.jsonl")
+        try:
+            if os.path.exists(snapshot_file):
+                with open(snapshot_file, 'r', encoding='utf-8') as f:
+                    documents.update(json.load(f))
+            if os.path.exists(log_file):
+                with open(log_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            break
+                        if entry.get("op") == "put":
+                            documents[entry["doc"]["id"]] = entry["doc"]
+        except Exception as e:
+            logger.warning(f"기존 JSON 저장소 읽기 실패, 가져오기 생략: {str(e)}")
+            return
+            
+        if not documents:
+            return
+            
+        with conn:
+            conn.executemany(
+                f"INSERT OR IGNORE INTO analyses ({', '.join(DOCUMENT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in DOCUMENT_COLUMNS)})",
+                [
+                    tuple({"document_type": "interview_analysis", **doc}.get(column, "") for column in DOCUMENT_COLUMNS)
+                    for doc in documents.values()
+                ]
+            )
+        logger.info(f"기존 JSON 저장소에서 {len(documents)}건 가져오기 완료")
+    
+    @staticmethod
+    def _build_match_query(query: str) -> str:
+        """사용자 검색어를 FTS5 MATCH 식으로 변환 (단어별 접두어 AND 검색)"""
+        terms = re.findall(r"\w+", query)
+        return " ".join(f'"{term}"*' for term in terms)
+    
+    def save_analysis_result(
+        self,
+        candidate_name: str,
+        position: str,
+        summary: str,
+        strengths: str,
+        weaknesses: str
+    ) -> str:
+        """
+        분석 결과를 저장소에 저장합니다.
+        
+        Args:
+            candidate_name: 지원자 이름
+            position: 지원 직무
+            summary: 평가 요약
+            strengths: 강점
+            weaknesses: 약점
+            
+        Returns:
+            str: 생성된 UUID
+        """
+        try:
+            document_id = str(uuid.uuid4())
+            
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    f"INSERT INTO analyses ({', '.join(DOCUMENT_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (document_id, candidate_name, position, summary, strengths, weaknesses, "interview_analysis")
+                )
+            
+            # 의미 검색용 임베딩 대기열에 추가 (배치로 처리됨)
+            self._index_vectors({
+                "id": document_id,
+                "candidate_name": candidate_name,
+                "position": position,
+                "summary": summary,
+                "strengths": strengths,
+                "weaknesses": weaknesses
+            })
+            
+            logger.info(f"분석 결과 저장 완료: {document_id}")
+            return document_id
+            
+        except Exception as e:
+            logger.error(f"분석 결과 저장 중 오류 발생: {str(e)}")
+            raise Exception(f"분석 결과 저장 실패: {str(e)}")
+    
+    def get_analysis_result(self, document_id: str) -> Dict[str, Any]:
+        """
+        저장된 분석 결과를 조회합니다.
+        
+        Args:
+            document_id: 문서 ID
+            
+        Returns:
+            Dict: 분석 결과
+        """
+        try:
+            row = self._connection().execute(
+                f"SELECT {', '.join(DOCUMENT_COLUMNS)} FROM analyses WHERE id = ?",
+                (document_id,)
+            ).fetchone()
+            if row is None:
+                raise Exception(f"문서를 찾을 수 없습니다: {document_id}")
+                
+            return dict(row)
+            
+        except Exception as e:
+            logger.error(f"분석 결과 조회 중 오류 발생: {str(e)}")
+            raise Exception(f"분석 결과 조회 실패: {str(e)}")
+    
+    def iter_analysis_results(self):
+        """저장된 모든 분석 결과 (벡터 재색인용, 전체를 메모리에 올리지 않고 순서대로 읽음)"""
+        cursor = self._connection().execute(f"SELECT {', '.join(DOCUMENT_COLUMNS)} FROM analyses ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(500)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(row)
+    
+    def search_analyses(
+        self,
+        query: str,
+        limit: int = 10,
+        position: Optional[str] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        분석 결과를 BM25 순위로 검색합니다.
+        
+        Args:
+            query: 검색 쿼리
+            limit: 결과 제한 수 (페이지 크기)
+            position: 지원 직무 필터 (정확히 일치)
+            offset: 건너뛸 결과 수 (페이지 이동)
+            
+        Returns:
+            list: 검색 결과 (similarity_score가 높을수록 관련도 높음)
+        """
+        try:
+            match_query = self._build_match_query(query)
+            if not match_query:
+                return []
+                
+            columns = ", ".join(f"a.{column}" for column in DOCUMENT_COLUMNS)
+            weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+            sql = (
+                f"SELECT {columns}, bm25(analyses_fts, {weights}) AS rank "
+                "FROM analyses_fts JOIN analyses a ON a.rowid = analyses_fts.rowid "
+                "WHERE analyses_fts MATCH ?"
+            )
+            params: List[Any] = [match_query]
+            if position:
+                sql += " AND a.position = ?"
+                params.append(position)
+            sql += " ORDER BY rank LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+            
+            results = []
+            for row in self._connection().execute(sql, params):
+                result = dict(row)
+                # bm25()는 관련도가 높을수록 더 작은(음수) 값을 반환
+                result["similarity_score"] = -result.pop("rank")
+                results.append(result)
+                
+            return results
+            
+        except Exception as e:
+            logger.error(f"분석 결과 검색 중 오류 발생: {str(e)}")
+            raise Exception(f"분석 결과 검색 실패: {str(e)}")
+    
+    def get_collection_stats(self) -> Dict[str, Any]:
+        """컬렉션 통계 정보를 반환합니다."""
+        try:
+            count = self._connection().execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            return {
+                "collection_name": "interview_analysis",
+                "document_count": count,
+                "persist_directory": self.storage_dir,
+                "storage_type": "SQLite + FTS5"
+            }
+        except Exception as e:
+            logger.error(f"컬렉션 통계 조회 중 오류 발생: {str(e)}")
+            return {"error": str(e)}
@@ -0,0 +1,275 @@
+"""
+파일 저장소 백엔드
+
+업로드 문서, 면접 녹음, 저장된 분석 결과는 모두 이 인터페이스(put / get / get_range / list / delete / properties)로 읽고 씁니다.
+
+- azure: Azure Blob Storage (storage_backend=azure, 기본값)
+- local: 로컬 파일 시스템 (storage_backend=local, 온프레미스/오프라인 배포용)
+    - local_storage_dir/<컨테이너>/<이름> 에 저장하고 메타데이터는 .meta/<이름>.json에 보관
+    - 임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 항상 완전한 파일을 봄
+    - 범위 읽기는 seek 후 필요한 바이트만 읽음
+
+없는 객체는 StorageObjectNotFound, 조건부 읽기(If-None-Match)에서 바뀌지 않은 객체는 StorageNotModified를 발생시킵니다.
+"""
+import datetime
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+class StorageObjectNotFound(Exception):
+    """저장소에 없는 객체"""
+    
+    def __init__(self, name: str):
+        super().__init__(f"BlobNotFound: {name}")
+        self.name = name
+
+class StorageNotModified(Exception):
+    """조건부 읽기에서 ETag가 같아 본문을 읽지 않음"""
+
+class StoredObject:
+    """저장된 객체 정보 (BlobProperties와 같은 속성 이름)"""
+    
+    __slots__ = ("name", "size", "last_modified", "etag", "metadata")
+    
+    def __init__(self, name: str, size: int, last_modified: Optional[datetime.datetime], etag: Optional[str], metadata: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.size = size
+        self.last_modified = last_modified
+        self.etag = etag
+        self.metadata = metadata or {}
+
+class StorageBackend(ABC):
+    """파일 저장소 인터페이스 (컨테이너 하나 단위, 빠진 메서드가 있으면 생성 시 TypeError)"""
+    
+    container = ""
+    
+    @abstractmethod
+    def put(self, name: str, data: bytes, metadata: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """저장 (같은 이름이 있으면 덮어씀), 새 ETag 반환"""
+    
+    @abstractmethod
+    def get(self, name: str, if_none_match: Optional[str] = None) -> Tuple[bytes, StoredObject]:
+        """
+        전체 읽기
+        
+        Args:
+            if_none_match: 이 ETag와 같으면 본문을 읽지 않고 StorageNotModified 발생
+        """
+    
+    @abstractmethod
+    def get_range(self, name: str, offset: int, length: Optional[int] = None) -> bytes:
+        """offset부터 length 바이트 읽기 (length가 없으면 끝까지)"""
+    
+    @abstractmethod
+    def list(self, prefix: str = "") -> List[StoredObject]:
+        """이름이 prefix로 시작하는 객체 목록 (이름 순)"""
+    
+    @abstractmethod
+    def delete(self, name: str):
+        """삭제 (없으면 StorageObjectNotFound)"""
+    
+    @abstractmethod
+    def properties(self, name: str) -> Optional[StoredObject]:
+        """객체 정보 + 메타데이터 (없으면 None)"""
+    
+    def exists(self, name: str) -> bool:
+        return self.properties(name) is not None
+
+class AzureStorageBackend(StorageBackend):
+    """Azure Blob Storage 컨테이너"""
+    
+    def __init__(self, blob_service_client, container: str):
+        self.blob_service_client = blob_service_client
+        self.container = container
+    
+    def _blob(self, name: str):
+        return self.blob_service_client.get_blob_client(container=self.container, blob=name)
+    
+    @staticmethod
+    def _info(properties) -> StoredObject:
+        return StoredObject(properties.name, properties.size, properties.last_modified, properties.etag, getattr(properties, "metadata", None))
+    
+    def put(self, name: str, data: bytes, metadata: Optional[Dict[str, str]] = None) -> Optional[str]:
+        result = self._blob(name).upload_blob(data, overwrite=True, metadata=metadata)
+        return (result or {}).get("etag")
+    
+    def get(self, name: str, if_none_match: Optional[str] = None) -> Tuple[bytes, StoredObject]:
+        from azure.core import MatchConditions
+        from azure.core.exceptions import ResourceNotFoundError, ResourceNotModifiedError
+        try:
+            if if_none_match:
+                downloader = self._blob(name).download_blob(etag=if_none_match, match_condition=MatchConditions.IfModified)
+            else:
+                downloader = self._blob(name).download_blob()
+        except ResourceNotModifiedError:
+            raise StorageNotModified(name)
+        except ResourceNotFoundError:
+            raise StorageObjectNotFound(name)
+        return downloader.readall(), self._info(downloader.properties)
+    
+    def get_range(self, name: str, offset: int, length: Optional[int] = None) -> bytes:
+        from azure.core.exceptions import ResourceNotFoundError
+        try:
+            return self._blob(name).download_blob(offset=offset, length=length).readall()
+        except ResourceNotFoundError:
+            raise StorageObjectNotFound(name)
+    
+    def list(self, prefix: str = "") -> List[StoredObject]:
+        container_client = self.blob_service_client.get_container_client(self.container)
+        return [self._info(blob) for blob in container_client.list_blobs(name_starts_with=prefix or None)]
+    
+    def delete(self, name: str):
+        from azure.core.exceptions import ResourceNotFoundError
+        try:
+            self._blob(name).delete_blob()
+        except ResourceNotFoundError:
+            raise StorageObjectNotFound(name)
+    
+    def properties(self, name: str) -> Optional[StoredObject]:
+        from azure.core.exceptions import ResourceNotFoundError
+        try:
+            return self._info(self._blob(name).get_blob_properties())
+        except ResourceNotFoundError:
+            return None
+
+class LocalStorageBackend(StorageBackend):
+    """로컬 파일 시스템 디렉터리 (컨테이너 = 디렉터리)"""
+    
+    META_DIR = ".meta"
+    
+    def __init__(self, root: str, container: str):
+        self.container = container
+        self.directory = os.path.abspath(os.path.join(root, container))
+        self._meta_directory = os.path.join(self.directory, self.META_DIR)
+        os.makedirs(self._meta_directory, exist_ok=True)
+    
+    def _path(self, name: str) -> str:
+        """객체 이름 → 파일 경로 (컨테이너 밖을 가리키는 이름은 거부)"""
+        path = os.path.abspath(os.path.join(self.directory, name))
+        if not path.startswith(self.directory + os.sep) or name.startswith("."):
+            raise ValueError(f"허용되지 않는 객체 이름: {name}")
+        return path
+    
+    def _meta_path(self, name: str) -> str:
+        return os.path.join(self._meta_directory, f"{name}.json")
+    
+    @staticmethod
+    def _etag(stat: os.stat_result) -> str:
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    
+    def _info(self, name: str, stat: os.stat_result, metadata: Optional[Dict[str, str]] = None) -> StoredObject:
+        return StoredObject(
+            name,
+            stat.st_size,
+            datetime.datetime.fromtimestamp(stat.st_mtime, tz=datetime.timezone.utc),
+            self._etag(stat),
+            metadata
+        )
+    
+    def _read_metadata(self, name: str) -> Dict[str, str]:
+        try:
+            with open(self._meta_path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 목록 조회에서 제외되도록 숨김 파일 이름으로 씀
+        temp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp{os.getpid()}-{threading.get_ident()}")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    
+    def put(self, name: str, data: bytes, metadata: Optional[Dict[str, str]] = None) -> Optional[str]:
+        path = self._path(name)
+        # 메타데이터를 먼저 써서 파일이 보이는 시점에는 항상 메타데이터가 있음
+        if metadata:
+            self._write_atomic(self._meta_path(name), json.dumps(metadata, ensure_ascii=False).encode("utf-8"))
+        elif os.path.exists(self._meta_path(name)):
+            os.remove(self._meta_path(name))
+        self._write_atomic(path, bytes(data))
+        return self._etag(os.stat(path))
+    
+    def _read(self, path: str, offset: int, length: Optional[int]) -> bytes:
+        """offset부터 필요한 범위만 읽음 (length가 없으면 끝까지)"""
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            end = size if length is None else min(size, offset + length)
+            if offset >= end:
+                return b""
+            f.seek(offset)
+            return f.read(end - offset)
+    
+    def get(self, name: str, if_none_match: Optional[str] = None) -> Tuple[bytes, StoredObject]:
+        path = self._path(name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise StorageObjectNotFound(name)
+        info = self._info(name, stat, self._read_metadata(name))
+        if if_none_match and if_none_match == info.etag:
+            raise StorageNotModified(name)
+        try:
+            return self._read(path, 0, None), info
+        except FileNotFoundError:
+            raise StorageObjectNotFound(name)
+    
+    def get_range(self, name: str, offset: int, length: Optional[int] = None) -> bytes:
+        try:
+            return self._read(self._path(name), offset, length)
+        except FileNotFoundError:
+            raise StorageObjectNotFound(name)
+    
+    def list(self, prefix: str = "") -> List[StoredObject]:
+        objects = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or entry.name.startswith(".") or not entry.name.startswith(prefix):
+                continue
+            try:
+                objects.append(self._info(entry.name, entry.stat()))
+            except FileNotFoundError:  # 목록 조회 중 삭제됨
+                continue
+        return sorted(objects, key=lambda info: info.name)
+    
+    def delete(self, name: str):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            raise StorageObjectNotFound(name)
+        if os.path.exists(self._meta_path(name)):
+            os.remove(self._meta_path(name))
+    
+    def properties(self, name: str) -> Optional[StoredObject]:
+        try:
+            stat = os.stat(self._path(name))
+        except FileNotFoundError:
+            return None
+        return self._info(name, stat, self._read_metadata(name))
+
+def create_storage_backend(container: Optional[str]) -> Optional[StorageBackend]:
+    """
+    설정(storage_backend)에 맞는 저장소 생성
+    
+    Returns:
+        저장소 (azure인데 Storage 계정/컨테이너가 설정되지 않았으면 None)
+    """
+    if settings.storage_backend == "local":
+        return LocalStorageBackend(settings.local_storage_dir, container or "default")
+    if not (container and settings.azure_storage_account_name and settings.azure_storage_account_key):
+        return None
+    from azure.storage.blob import BlobServiceClient
+    return AzureStorageBackend(
+        BlobServiceClient(
+            account_url=f"https://{settings.azure_storage_account_name}.blob.core.windows.net",
+            credential=settings.azure_storage_account_key
+        ),
+        container
+    )
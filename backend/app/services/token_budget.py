@@ -0,0 +1,195 @@
+"""
+프롬프트 토큰 예산 관리
+
+이력서/채용공고/면접 STT 같은 원문을 프롬프트에 넣기 전에 tiktoken으로 토큰 수를 세고,
+엔드포인트별 예산(prompt_token_budgets)을 넘으면 정책에 따라 줄입니다.
+- truncate: 앞부분만 남기고 자름
+- compress: 다른 입력과 겹치는 핵심 문장을 우선 남기는 추출식 압축 (원래 순서 유지)
+"""
+import logging
+import re
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Tuple
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARKER = "\n...(토큰 예산 초과로 이하 생략)"
+COMPRESSION_MARKER = "\n...(토큰 예산 초과로 일부 문장 생략)"
+
+_encoding = None
+_encoding_failed = False
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    """tiktoken 인코딩 (최초 1회 로드, 사용할 수 없으면 None)"""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(settings.token_encoding_name)
+                except Exception as e:
+                    _encoding_failed = True
+                    logger.warning(f"tiktoken 인코딩을 불러올 수 없어 글자 수 기반 추정을 사용합니다: {str(e)}")
+    return _encoding
+
+def count_tokens(text: str) -> int:
+    """텍스트의 토큰 수 (tiktoken을 쓸 수 없으면 한글 기준 2자당 1토큰으로 추정)"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return max(1, len(text) // 2)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """앞에서부터 max_tokens 토큰만 남김"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    budget = max(max_tokens - count_tokens(TRUNCATION_MARKER), 0)
+    encoding = _get_encoding()
+    if encoding is None:
+        head = text[:budget * 2]
+    else:
+        head = encoding.decode(encoding.encode(text, disallowed_special=())[:budget])
+    return head + TRUNCATION_MARKER
+
+def _split_sentences(text: str) -> List[str]:
+    """줄/문장 단위 분할 (이력서·공고의 항목, STT 문장)"""
+    sentences = []
+    for line in text.splitlines():
+        sentences.extend(part for part in re.split(r"(?<=[.!?。])\s+", line.strip()) if part)
+    return sentences
+
+def _terms(text: str) -> List[str]:
+    return [term.lower() for term in re.findall(r"\w{2,}", text)]
+
+def compress_to_tokens(text: str, max_tokens: int, reference: str = "") -> str:
+    """
+    추출식 압축: 문장별 점수(참조 텍스트와 겹치는 단어 + 문서 내 빈도)가 높은 문장을
+    예산에 맞을 때까지 골라 원래 순서대로 이어 붙임
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    sentences = _split_sentences(text)
+    if len(sentences) <= 1:
+        return truncate_to_tokens(text, max_tokens)
+        
+    document_freq = Counter(_terms(text))
+    reference_terms = set(_terms(reference))
+    scored = []
+    for index, sentence in enumerate(sentences):
+        terms = _terms(sentence)
+        if not terms:
+            score = 0.0
+        else:
+            score = sum(
+                (3.0 if term in reference_terms else 0.0) + min(document_freq[term], 5) * 0.2
+                for term in terms
+            ) / len(terms) ** 0.5
+        # 첫 문장들(이름, 지원 분야, 공고 제목 등)은 가산점
+        if index < 3:
+            score += 2.0
+        scored.append((score, index, count_tokens(sentence) + 1))
+        
+    budget = max_tokens - count_tokens(COMPRESSION_MARKER)
+    selected = []
+    used = 0
+    for score, index, tokens in sorted(scored, key=lambda item: (-item[0], item[1])):
+        if used + tokens > budget:
+            continue
+        selected.append(index)
+        used += tokens
+        
+    if not selected:
+        return truncate_to_tokens(text, max_tokens)
+    return "\n".join(sentences[index] for index in sorted(selected)) + COMPRESSION_MARKER
+
+def _allocate(section_tokens: Dict[str, int], available: int) -> Dict[str, int]:
+    """남은 예산을 섹션별로 배분 (작은 섹션은 그대로 두고 큰 섹션끼리 나눠 가짐)"""
+    allocation: Dict[str, int] = {}
+    remaining = dict(section_tokens)
+    while remaining:
+        share = available // len(remaining)
+        small = {name: tokens for name, tokens in remaining.items() if tokens <= share}
+        if not small:
+            for name in remaining:
+                allocation[name] = share
+            break
+        for name, tokens in small.items():
+            allocation[name] = tokens
+            available -= tokens
+            del remaining[name]
+    return allocation
+
+class TokenBudgetManager:
+    """엔드포인트별 프롬프트 토큰 예산 적용"""
+    
+    def budget_for(self, endpoint: str) -> Tuple[int, str]:
+        """(프롬프트 토큰 예산, 정책) - prompt_token_budgets에 없으면 기본값"""
+        budget = settings.prompt_token_budgets.get(endpoint, settings.prompt_token_budget_default)
+        policy = settings.prompt_budget_policies.get(endpoint, settings.prompt_budget_default_policy)
+        return budget, policy
+    
+    def fit(self, endpoint: str, build: Callable[..., str], **sections: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        섹션 원문을 예산에 맞게 줄여 프롬프트를 생성합니다.
+        
+        Args:
+            endpoint: 예산 설정 키 (예: "analyze_match")
+            build: 섹션 값을 키워드 인자로 받아 프롬프트 문자열을 만드는 함수
+            **sections: 프롬프트에 들어갈 원문 (이력서, 채용공고, STT 등)
+            
+        Returns:
+            (프롬프트, 토큰 사용 정보)
+        """
+        budget, policy = self.budget_for(endpoint)
+        overhead = count_tokens(build(**{name: "" for name in sections}))
+        section_tokens = {name: count_tokens(text) for name, text in sections.items()}
+        original_tokens = overhead + sum(section_tokens.values())
+        
+        reduced: List[str] = []
+        if original_tokens > budget:
+            allocation = _allocate(section_tokens, max(budget - overhead, 0))
+            fitted = {}
+            for name, text in sections.items():
+                if section_tokens[name] <= allocation[name]:
+                    fitted[name] = text
+                    continue
+                if policy == "compress":
+                    reference = "\n".join(other for other_name, other in sections.items() if other_name != name)
+                    fitted[name] = compress_to_tokens(text, allocation[name], reference)
+                else:
+                    fitted[name] = truncate_to_tokens(text, allocation[name])
+                reduced.append(name)
+            sections = fitted
+            logger.info(f"프롬프트 토큰 예산 적용 ({endpoint}, {policy}): {original_tokens} → 예산 {budget}, 축소 섹션 {reduced}")
+            
+        prompt = build(**sections)
+        usage = {
+            "prompt_tokens": count_tokens(prompt),
+            "original_prompt_tokens": original_tokens,
+            "prompt_budget": budget,
+            "policy": policy,
+            "reduced_sections": reduced
+        }
+        return prompt, usage
+    
+    @staticmethod
+    def completion_usage(usage: Dict[str, Any], result: Any) -> Dict[str, Any]:
+        """LLM 응답의 실제 사용량(usage_metadata)을 토큰 정보에 추가 (없으면 응답 텍스트로 계산)"""
+        metadata = getattr(result, "usage_metadata", None) or {}
+        content = getattr(result, "content", result)
+        completion_tokens = metadata.get("output_tokens") or count_tokens(str(content))
+        usage = dict(usage)
+        if metadata.get("input_tokens"):
+            usage["prompt_tokens"] = metadata["input_tokens"]
+        usage["completion_tokens"] = completion_tokens
+        usage["total_tokens"] = usage["prompt_tokens"] + completion_tokens
+        return usage
+
+# 전역 토큰 예산 관리자
+token_budget_manager = TokenBudgetManager()
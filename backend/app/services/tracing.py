@@ -0,0 +1,265 @@
+"""
+요청 단위 단계 추적 (Server-Timing + OTLP JSON 트레이스 파일)
+
+요청마다 트레이스를 만들고, 서비스 코드의 span() 구간(Blob 업로드, 인덱싱 대기, LLM 호출 등)을 기록합니다.
+- 응답 헤더 Server-Timing에 단계별 소요 시간을 담아 브라우저 개발자 도구에서 바로 확인
+- settings.trace_export_file을 지정하면 요청별 트레이스를 OTLP 호환 JSON(한 줄에 한 요청)으로 저장
+  (스트리밍 응답은 헤더 전송 이후의 단계가 트레이스 파일에만 기록됨)
+"""
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "interview-analysis-backend"
+
+class Span:
+    """추적 구간 하나"""
+    
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+    
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+    
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+class Trace:
+    """요청 하나의 span 모음 (스레드풀에서 동시에 추가될 수 있음)"""
+    
+    def __init__(self, name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self.root = self.start_span(name, parent_id, {})
+    
+    def start_span(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]) -> Span:
+        span = Span(name, parent_id, attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+    
+    def server_timing(self) -> str:
+        """
+        Server-Timing 헤더 값 (루트 제외, 같은 이름의 구간은 합산)
+        
+        예: blob_upload;dur=120.5, index_wait;desc="x2";dur=20011.3, total;dur=20240.1
+        """
+        totals: Dict[str, List[float]] = {}
+        with self._lock:
+            spans = [span for span in self.spans if span is not self.root and span.end_ns is not None]
+        for span in spans:
+            name = re.sub(r"[^A-Za-z0-9_.-]", "_", span.name)
+            entry = totals.setdefault(name, [0.0, 0])
+            entry[0] += span.duration_ms
+            entry[1] += 1
+        metrics = [
+            f'{name};desc="x{count}";dur={duration:.1f}' if count > 1 else f"{name};dur={duration:.1f}"
+            for name, (duration, count) in totals.items()
+        ]
+        metrics.append(f"total;dur={self.root.duration_ms:.1f}")
+        return ", ".join(metrics)
+    
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON (ExportTraceServiceRequest) 형식으로 변환"""
+        def attribute(key: str, value: Any) -> Dict[str, Any]:
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            if isinstance(value, float):
+                return {"key": key, "value": {"doubleValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+            
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [
+                        {
+                            "traceId": self.trace_id,
+                            "spanId": span.span_id,
+                            "parentSpanId": span.parent_id or "",
+                            "name": span.name,
+                            "kind": 2 if span is self.root else 1,  # SERVER / INTERNAL
+                            "startTimeUnixNano": str(span.start_ns),
+                            "endTimeUnixNano": str(span.end_ns or time.time_ns()),
+                            "attributes": [attribute(key, value) for key, value in span.attributes.items()],
+                            "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+                        }
+                        for span in spans
+                    ]
+                }]
+            }]
+        }
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+def current_trace_id() -> Optional[str]:
+    """현재 요청의 트레이스 ID (요청 밖이면 None)"""
+    trace = _current_trace.get()
+    return trace.trace_id if trace is not None else None
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """
+    현재 요청 트레이스에 구간 기록 (요청 밖에서 호출되면 아무 것도 하지 않음)
+    
+    yield된 Span의 attributes에 값을 추가할 수 있습니다.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get() or trace.root
+    current = trace.start_span(name, parent.span_id, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.error = f"{type(e).__name__}: {str(e)[:200]}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+def traced(name: str):
+    """함수 전체를 하나의 구간으로 기록하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class TraceExporter:
+    """
+    트레이스 파일 기록 스레드
+    
+    요청 처리(이벤트 루프)에서는 큐에 넣기만 하고, 직렬화와 파일 쓰기는 백그라운드 스레드가
+    큐에 쌓인 트레이스를 모아서 한 번에 처리합니다 (logging_setup의 QueueListener와 같은 방식).
+    """
+    
+    def __init__(self):
+        self._queue: "queue.Queue[Optional[Trace]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def submit(self, trace: Trace):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.stop)
+        self._queue.put(trace)
+    
+    def stop(self):
+        """큐에 남은 트레이스를 모두 기록하고 스레드 종료"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=5)
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            traces = [trace for trace in batch if trace is not None]
+            if traces:
+                self._write(traces)
+            if len(traces) != len(batch):
+                return
+    
+    @staticmethod
+    def _write(traces: List[Trace]):
+        try:
+            lines = "".join(json.dumps(trace.to_otlp(), ensure_ascii=False) + "\n" for trace in traces)
+            with open(settings.trace_export_file, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except Exception as e:
+            logger.warning(f"트레이스 파일 저장 실패 ({len(traces)}건): {str(e)}")
+
+_exporter = TraceExporter()
+
+def export_trace(trace: Trace):
+    """트레이스를 설정된 파일에 한 줄로 추가 (JSON Lines, 백그라운드 스레드에서 기록)"""
+    if settings.trace_export_file:
+        _exporter.submit(trace)
+
+def shutdown_tracing():
+    """남은 트레이스를 파일에 기록"""
+    _exporter.stop()
+
+def _parse_traceparent(value: str):
+    """W3C traceparent 헤더에서 (trace_id, parent_span_id) 추출"""
+    match = re.fullmatch(r"[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}", value.strip())
+    return (match.group(1), match.group(2)) if match else (None, None)
+
+class TracingMiddleware:
+    """요청마다 트레이스를 시작하고 응답에 Server-Timing 헤더를 추가하는 ASGI 미들웨어"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+            
+        headers = dict(scope.get("headers", []))
+        trace_id, parent_id = _parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        trace = Trace(f"{scope['method']} {scope['path']}", trace_id, parent_id)
+        trace.root.attributes.update({"http.method": scope["method"], "http.target": scope["path"]})
+        token = _current_trace.set(trace)
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                trace.root.attributes["http.status_code"] = message["status"]
+                if settings.server_timing_enabled:
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"server-timing", trace.server_timing().encode("latin-1"))
+                    ]
+            await send(message)
+            
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            trace.root.error = f"{type(e).__name__}: {str(e)[:200]}"
+            raise
+        finally:
+            trace.root.end_ns = time.time_ns()
+            route = scope.get("route")
+            if route is not None:
+                trace.root.name = f"{scope['method']} {route.path}"
+            _current_trace.reset(token)
+            export_trace(trace)
@@ -0,0 +1,336 @@
+"""
+면접 분석 결과 벡터 인덱스 서비스 (ChromaDB HNSW)
+
+- 저장 시점에 분석 결과를 큐에 넣고, 백그라운드 스레드가 모아서 한 번에 임베딩합니다.
+- 임베딩은 Settings.azure_openai_embedding_model 배포를 사용하고,
+  인덱스는 chroma_persist_dir 아래에 영구 저장됩니다.
+  (로컬 영구 인덱스는 단일 프로세스 전용이므로, 워커가 여러 개면 chroma_server_host로 ChromaDB 서버를 지정합니다)
+- "이 지원자와 비슷한 지원자" 조회는 저장된 임베딩을 그대로 사용하므로 API 호출이 없습니다.
+- 임베딩에 실패한 문서는 지수 백오프 시각이 지나면 다시 배치에 넣고 (vector_embedding_max_retries회까지, 그동안 새 문서는 계속 임베딩),
+  저장소에는 있지만 인덱스에 없는 분석 결과는 벡터 인덱스를 처음 사용할 때 백그라운드에서 채웁니다 (reindex_vectors).
+"""
+import heapq
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "interview_analysis_vectors"
+
+def build_embedding_text(document: Dict[str, Any]) -> str:
+    """임베딩 대상 텍스트 구성 (키워드 검색과 같은 필드 사용)"""
+    return "\n".join([
+        f"지원 직무: {document.get('position', '')}",
+        f"평가 요약: {document.get('summary', '')}",
+        f"강점: {document.get('strengths', '')}",
+        f"약점: {document.get('weaknesses', '')}",
+    ])
+
+class AnalysisVectorIndex:
+    """분석 결과 임베딩 + ChromaDB 영구 HNSW 인덱스"""
+    
+    def __init__(self):
+        import chromadb
+        from langchain_openai import AzureOpenAIEmbeddings
+        
+        self.persist_dir = os.path.join(settings.chroma_persist_dir, "vector_index")
+        os.makedirs(self.persist_dir, exist_ok=True)
+        
+        if settings.chroma_server_host:
+            # 여러 워커 프로세스가 하나의 인덱스를 공유할 때는 ChromaDB 서버 사용
+            self.client = chromadb.HttpClient(host=settings.chroma_server_host, port=settings.chroma_server_port)
+        else:
+            self.client = chromadb.PersistentClient(path=self.persist_dir)
+        self.collection = self.client.get_or_create_collection(
+            name=COLLECTION_NAME,
+            metadata={"hnsw:space": "cosine"}
+        )
+        
+        self.embeddings = AzureOpenAIEmbeddings(
+            azure_deployment=settings.azure_openai_embedding_model,
+            api_version=settings.azure_openai_api_version,
+            azure_endpoint=settings.azure_openai_endpoint,
+            api_key=settings.azure_openai_api_key,
+            chunk_size=settings.vector_embedding_batch_size
+        )
+        
+        # 저장 요청을 모아서 임베딩하는 백그라운드 스레드
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._attempts: Dict[str, int] = {}  # 문서 ID → 실패한 임베딩 시도 횟수
+        self._retries: List[Tuple[float, int, Dict[str, Any]]] = []  # (재시도 시각, 순번, 문서) 힙 (쓰기 스레드만 사용)
+        self._retry_seq = itertools.count()
+        self._worker = threading.Thread(
+            target=self._embed_loop, name="vector-index-embedder", daemon=True
+        )
+        self._worker.start()
+        
+        logger.info(f"벡터 인덱스 초기화 완료: {self.persist_dir} ({self.collection.count()}건)")
+    
+    def enqueue(self, document: Dict[str, Any]):
+        """저장된 분석 결과를 임베딩 대기열에 추가"""
+        self._queue.put(document)
+    
+    def _embed_loop(self):
+        """대기열의 문서(+ 재시도 시각이 된 문서)를 배치 단위로 임베딩하여 인덱스에 추가"""
+        batch_wait = settings.vector_embedding_batch_wait_ms / 1000
+        while True:
+            batch = self._due_retries()
+            if not batch:
+                try:
+                    batch = [self._queue.get(timeout=self._retry_wait())]
+                except queue.Empty:
+                    continue  # 재시도 시각이 됨
+            deadline = time.monotonic() + batch_wait
+            while len(batch) < settings.vector_embedding_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # 저장과 재색인이 같은 문서를 함께 넣었을 수 있음 (한 번의 upsert에는 같은 ID가 한 번만 들어가야 함)
+            batch = list({doc["id"]: doc for doc in batch}.values())
+                    
+            try:
+                self.add_documents(batch)
+            except Exception as e:
+                self._retry_later(batch, e)
+                continue
+            for doc in batch:
+                self._attempts.pop(doc["id"], None)
+    
+    def _due_retries(self) -> List[Dict[str, Any]]:
+        """재시도 시각이 지난 문서 (최대 배치 크기)"""
+        now = time.monotonic()
+        due = []
+        while self._retries and self._retries[0][0] <= now and len(due) < settings.vector_embedding_batch_size:
+            due.append(heapq.heappop(self._retries)[2])
+        return due
+    
+    def _retry_wait(self) -> Optional[float]:
+        """다음 재시도까지 남은 시간 (재시도할 문서가 없으면 None: 새 문서가 들어올 때까지 대기)"""
+        if not self._retries:
+            return None
+        return max(0.0, self._retries[0][0] - time.monotonic())
+    
+    def _retry_later(self, batch: List[Dict[str, Any]], error: Exception):
+        """
+        실패한 배치의 문서를 백오프 시각과 함께 재시도 힙에 넣음
+        
+        쓰기 스레드는 기다리지 않고 계속 새 문서를 임베딩하며, 재시도 시각이 지난 문서는 다음 배치에 포함됩니다.
+        재시도 횟수를 넘긴 문서는 버리고, 다음 reindex_vectors()에서 다시 색인됩니다.
+        """
+        now = time.monotonic()
+        retried = 0
+        for doc in batch:
+            count = self._attempts.get(doc["id"], 0) + 1
+            if count > settings.vector_embedding_max_retries:
+                self._attempts.pop(doc["id"], None)
+                logger.error(f"분석 결과 임베딩 재시도 횟수 초과, 서버 재시작 시 재색인에서 다시 시도: {doc['id']}")
+                continue
+            self._attempts[doc["id"]] = count
+            # 백오프는 문서별 실패 횟수 기준 (함께 묶인 새 문서가 오래 실패한 문서의 대기 시간을 물려받지 않도록)
+            delay = min(settings.vector_embedding_retry_base_seconds * 2 ** (count - 1), settings.vector_embedding_retry_max_seconds)
+            heapq.heappush(self._retries, (now + delay, next(self._retry_seq), doc))
+            retried += 1
+        if retried:
+            logger.warning(f"분석 결과 임베딩 실패 ({len(batch)}건), {retried}건 백오프 후 재시도 (대기 {len(self._retries)}건): {str(error)}")
+    
+    def missing_ids(self, document_ids: List[str]) -> List[str]:
+        """인덱스에 없는 문서 ID (대기열에 있는 문서 포함)"""
+        stored = set(self.collection.get(ids=document_ids, include=[])["ids"])
+        return [document_id for document_id in document_ids if document_id not in stored]
+    
+    def add_documents(self, documents: List[Dict[str, Any]]):
+        """문서 목록을 한 번의 임베딩 호출로 인덱스에 추가 (같은 ID는 덮어씀)"""
+        if not documents:
+            return
+        vectors = self.embeddings.embed_documents([build_embedding_text(doc) for doc in documents])
+        self.collection.upsert(
+            ids=[doc["id"] for doc in documents],
+            embeddings=vectors,
+            metadatas=[
+                {"candidate_name": doc.get("candidate_name", ""), "position": doc.get("position", "")}
+                for doc in documents
+            ]
+        )
+        logger.info(f"분석 결과 {len(documents)}건 임베딩 완료")
+    
+    def _query(self, vector: List[float], limit: int, position: Optional[str]) -> List[Tuple[str, float]]:
+        """벡터로 최근접 문서 조회 → (문서 ID, 코사인 유사도) 목록"""
+        if self.collection.count() == 0:
+            return []
+        result = self.collection.query(
+            query_embeddings=[vector],
+            n_results=limit,
+            where={"position": position} if position else None,
+            include=["distances"]
+        )
+        return [
+            (document_id, 1.0 - distance)
+            for document_id, distance in zip(result["ids"][0], result["distances"][0])
+        ]
+    
+    def search(self, query: str, limit: int = 10, position: Optional[str] = None) -> List[Tuple[str, float]]:
+        """자연어 질의와 의미적으로 가까운 분석 결과 조회"""
+        return self._query(self.embeddings.embed_query(query), limit, position)
+    
+    def find_similar(self, document_id: str, limit: int = 10, position: Optional[str] = None) -> List[Tuple[str, float]]:
+        """저장된 임베딩을 기준으로 비슷한 분석 결과 조회 (자기 자신 제외)"""
+        stored = self.collection.get(ids=[document_id], include=["embeddings"])
+        if not stored["ids"]:
+            raise Exception(f"벡터 인덱스에 없는 문서입니다 (임베딩 대기 중일 수 있습니다): {document_id}")
+            
+        matches = self._query(list(stored["embeddings"][0]), limit + 1, position)
+        return [match for match in matches if match[0] != document_id][:limit]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """인덱스 통계"""
+        return {
+            "indexed_count": self.collection.count(),
+            "pending_count": self._queue.qsize(),
+            "retrying_count": len(self._attempts),
+            "persist_directory": self.persist_dir
+        }
+
+_vector_index: Optional[AnalysisVectorIndex] = None
+_vector_index_lock = threading.Lock()
+_vector_index_failed = False
+
+# 한 번에 인덱스 포함 여부를 확인할 문서 수
+REINDEX_CHUNK_SIZE = 500
+
+def get_vector_index() -> Optional[AnalysisVectorIndex]:
+    """벡터 인덱스 싱글턴 (비활성화되었거나 초기화에 실패하면 None)"""
+    global _vector_index, _vector_index_failed
+    if not settings.vector_search_enabled or _vector_index_failed:
+        return None
+    if _vector_index is None:
+        with _vector_index_lock:
+            if _vector_index is None and not _vector_index_failed:
+                try:
+                    _vector_index = AnalysisVectorIndex()
+                except Exception as e:
+                    _vector_index_failed = True
+                    logger.warning(f"벡터 인덱스를 사용할 수 없습니다. 의미 검색이 비활성화됩니다: {str(e)}")
+    return _vector_index
+
+class VectorSearchMixin:
+    """저장소 서비스에 의미 검색 기능을 추가하는 믹스인 (get_analysis_result, iter_analysis_results 필요)"""
+    
+    _backfill_started = False
+    
+    def _get_vector_index(self) -> Optional[AnalysisVectorIndex]:
+        """벡터 인덱스 (처음 사용할 때 인덱스에 빠진 기존 분석 결과를 백그라운드에서 채움)"""
+        vector_index = get_vector_index()
+        if vector_index is None or self._backfill_started:
+            return vector_index
+        with _vector_index_lock:
+            if self._backfill_started:
+                return vector_index
+            self._backfill_started = True
+            threading.Thread(target=self._backfill_vectors, name="vector-index-backfill", daemon=True).start()
+        return vector_index
+    
+    def _backfill_vectors(self):
+        try:
+            self.reindex_vectors()
+        except Exception as e:
+            logger.error(f"벡터 인덱스 백필 실패: {str(e)}")
+    
+    def reindex_vectors(self, full: bool = False) -> int:
+        """
+        저장소의 분석 결과를 벡터 인덱스에 다시 색인
+        
+        Args:
+            full: True면 모든 문서를 다시 임베딩, False면 인덱스에 없는 문서만
+            
+        Returns:
+            int: 임베딩 대기열에 넣은 문서 수
+        """
+        vector_index = get_vector_index()
+        if vector_index is None:
+            raise Exception("벡터 인덱스가 비활성화되어 있습니다.")
+            
+        queued = 0
+        chunk: List[Dict[str, Any]] = []
+        
+        def flush():
+            nonlocal queued
+            if full:
+                missing = {doc["id"] for doc in chunk}
+            else:
+                missing = set(vector_index.missing_ids([doc["id"] for doc in chunk]))
+            for doc in chunk:
+                if doc["id"] in missing:
+                    vector_index.enqueue(doc)
+                    queued += 1
+            chunk.clear()
+            
+        for document in self.iter_analysis_results():
+            chunk.append(document)
+            if len(chunk) >= REINDEX_CHUNK_SIZE:
+                flush()
+        if chunk:
+            flush()
+        logger.info(f"벡터 인덱스 재색인: {queued}건 대기열에 추가 (전체 재색인: {full})")
+        return queued
+    
+    def _index_vectors(self, document: Dict[str, Any]):
+        """저장된 분석 결과를 임베딩 대기열에 추가 (벡터 인덱스가 없으면 무시)"""
+        vector_index = self._get_vector_index()
+        if vector_index is not None:
+            vector_index.enqueue(document)
+    
+    def _attach_documents(self, matches: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+        """(문서 ID, 유사도) 목록을 저장소 문서로 변환"""
+        results = []
+        for document_id, score in matches:
+            try:
+                result = dict(self.get_analysis_result(document_id))
+            except Exception:
+                continue
+            result["similarity_score"] = score
+            results.append(result)
+        return results
+    
+    def semantic_search(self, query: str, limit: int = 10, position: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        임베딩 기반 의미 검색
+        
+        Args:
+            query: 자연어 검색어
+            limit: 결과 제한 수
+            position: 지원 직무 필터
+            
+        Returns:
+            list: 검색 결과 (similarity_score = 코사인 유사도)
+        """
+        vector_index = self._get_vector_index()
+        if vector_index is None:
+            raise Exception("벡터 인덱스가 비활성화되어 있습니다.")
+        return self._attach_documents(vector_index.search(query, limit, position))
+    
+    def find_similar_candidates(self, document_id: str, limit: int = 10, position: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        지정한 분석 결과와 비슷한 지원자 조회
+        
+        Args:
+            document_id: 기준 문서 ID
+            limit: 결과 제한 수
+            position: 지원 직무 필터
+            
+        Returns:
+            list: 비슷한 지원자 목록 (similarity_score = 코사인 유사도)
+        """
+        vector_index = self._get_vector_index()
+        if vector_index is None:
+            raise Exception("벡터 인덱스가 비활성화되어 있습니다.")
+        return self._attach_documents(vector_index.find_similar(document_id, limit, position))
@@ -0,0 +1,6 @@
+"""
+오프라인 벤치마크 (Azure 서비스 없이 API 성능 측정)
+
+- fakes: Blob Storage / AI Search / Azure OpenAI(채팅, STT)의 프로세스 내 가짜 구현
+- run_benchmarks: 모든 라우터 엔드포인트에 동시 부하를 걸어 p50/p95/p99 지연 시간과 처리량 측정
+"""
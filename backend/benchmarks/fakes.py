@@ -0,0 +1,548 @@
+"""
+Azure 서비스의 프로세스 내 가짜 구현 (벤치마크/오프라인 실행용)
+
+서비스 코드가 실제로 호출하는 메서드만 같은 모양으로 구현합니다.
+- Blob Storage: 업로드/다운로드/삭제/목록 (메모리 저장)
+- AI Search: 인덱스 목록/스키마, 인덱서 실행/상태, 검색 (인덱서를 실행해야 Blob 내용이 검색됨)
+- Azure OpenAI: 채팅(점수 JSON 블록 포함 응답, usage_metadata 포함)과 STT
+
+각 가짜 서비스는 FaultInjector로 지연 시간, 스로틀링(429), 실패(500)를 주입할 수 있습니다.
+install_fakes()는 전역 서비스 인스턴스(document_analyzer, speech_service)가 가짜 클라이언트로 생성되도록 하고 llm_gateway의 채팅 모델을 교체합니다.
+"""
+import asyncio
+import datetime
+import enum
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+import httpx
+import openai
+from azure.core import MatchConditions
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError, ResourceNotModifiedError
+from langchain_core.messages import AIMessage
+
+class FaultInjector:
+    """
+    호출마다 지연 시간과 오류를 주입
+    
+    Args:
+        latency_ms: 기본 지연 시간
+        jitter_ms: 지연 시간에 더해지는 0~jitter_ms 사이의 임의 값
+        throttle_rate: 스로틀링(429) 오류 비율 (0~1)
+        failure_rate: 서버 오류(500) 비율 (0~1)
+        retry_after_ms: 스로틀링 응답의 retry-after-ms 헤더 값
+        seed: 난수 시드 (같은 시드면 같은 오류 패턴)
+    """
+    
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        throttle_rate: float = 0,
+        failure_rate: float = 0,
+        retry_after_ms: int = 100,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.failure_rate = failure_rate
+        self.retry_after_ms = retry_after_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.throttled = 0
+        self.failed = 0
+    
+    def _draw(self):
+        """(지연 초, 오류 종류) 결정"""
+        with self._lock:
+            self.calls += 1
+            delay = (self.latency_ms + self._random.uniform(0, self.jitter_ms)) / 1000
+            roll = self._random.random()
+            if roll < self.throttle_rate:
+                self.throttled += 1
+                return delay, "throttle"
+            if roll < self.throttle_rate + self.failure_rate:
+                self.failed += 1
+                return delay, "failure"
+            return delay, None
+    
+    def apply(self) -> Optional[str]:
+        """지연 후 주입할 오류 종류 반환 (없으면 None)"""
+        delay, fault = self._draw()
+        if delay > 0:
+            time.sleep(delay)
+        return fault
+    
+    async def apply_async(self) -> Optional[str]:
+        delay, fault = self._draw()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return fault
+    
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "throttled": self.throttled, "failed": self.failed}
+
+def _azure_error(fault: str, operation: str) -> HttpResponseError:
+    """Azure SDK 형식의 오류"""
+    status_code = 429 if fault == "throttle" else 500
+    error = HttpResponseError(message=f"({status_code}) fake {operation} {fault}")
+    error.status_code = status_code
+    return error
+
+def _raise_azure_fault(injector: FaultInjector, operation: str):
+    fault = injector.apply()
+    if fault:
+        raise _azure_error(fault, operation)
+
+def _openai_error(fault: str, retry_after_ms: int) -> openai.APIStatusError:
+    """openai SDK 형식의 오류 (게이트웨이의 재시도/Retry-After 처리를 그대로 거침)"""
+    request = httpx.Request("POST", "https://fake.openai.azure.com/openai/deployments/fake")
+    if fault == "throttle":
+        response = httpx.Response(429, headers={"retry-after-ms": str(retry_after_ms)}, request=request)
+        return openai.RateLimitError("fake rate limit", response=response, body=None)
+    response = httpx.Response(500, request=request)
+    return openai.InternalServerError("fake server error", response=response, body=None)
+
+# ---------------------------------------------------------------------------
+# Blob Storage
+# ---------------------------------------------------------------------------
+
+class FakeBlobStore:
+    """컨테이너/Blob을 메모리에 보관 (Blob 서비스와 가짜 인덱서가 공유)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.blobs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    
+    def put(self, container: str, name: str, data: bytes, metadata: Optional[Dict[str, str]] = None):
+        with self._lock:
+            self.blobs.setdefault(container, {})[name] = {
+                "data": data,
+                "metadata": dict(metadata or {}),
+                "last_modified": datetime.datetime.now(datetime.timezone.utc),
+                "etag": f'"0x{time.time_ns():X}"',
+            }
+            return self.blobs[container][name]["etag"]
+    
+    def get(self, container: str, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.blobs.get(container, {}).get(name)
+    
+    def delete(self, container: str, name: str) -> bool:
+        with self._lock:
+            return self.blobs.get(container, {}).pop(name, None) is not None
+    
+    def snapshot(self, container: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """컨테이너(지정하지 않으면 전체)의 Blob 복사본"""
+        with self._lock:
+            if container is not None:
+                return dict(self.blobs.get(container, {}))
+            merged: Dict[str, Dict[str, Any]] = {}
+            for blobs in self.blobs.values():
+                merged.update(blobs)
+            return merged
+
+class FakeDownloader:
+    def __init__(self, data: bytes, properties=None):
+        self._data = data
+        self.properties = properties
+    
+    def readall(self) -> bytes:
+        return self._data
+
+class FakeBlobClient:
+    def __init__(self, service: "FakeBlobServiceClient", container: str, blob: str):
+        self.service = service
+        self.container_name = container
+        self.blob_name = blob
+    
+    def upload_blob(self, data, overwrite: bool = False, metadata: Optional[Dict[str, str]] = None, **kwargs):
+        _raise_azure_fault(self.service.faults, "upload_blob")
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        elif not isinstance(data, (bytes, bytearray)):
+            data = data.read()
+        if not overwrite and self.service.store.get(self.container_name, self.blob_name) is not None:
+            raise HttpResponseError(message="BlobAlreadyExists")
+        etag = self.service.store.put(self.container_name, self.blob_name, bytes(data), metadata)
+        return {"etag": etag}
+    
+    def _require(self) -> Dict[str, Any]:
+        blob = self.service.store.get(self.container_name, self.blob_name)
+        if blob is None:
+            raise ResourceNotFoundError(message=f"BlobNotFound: {self.blob_name}")
+        return blob
+    
+    def download_blob(self, offset: Optional[int] = None, length: Optional[int] = None, etag: Optional[str] = None, match_condition=None, **kwargs) -> FakeDownloader:
+        _raise_azure_fault(self.service.faults, "download_blob")
+        blob = self._require()
+        if match_condition == MatchConditions.IfModified and etag == blob["etag"]:
+            raise ResourceNotModifiedError(message="Not Modified")
+        data = blob["data"]
+        if offset is not None:
+            data = data[offset:offset + length] if length is not None else data[offset:]
+        return FakeDownloader(data, self._properties(blob))
+    
+    def _properties(self, blob: Dict[str, Any]):
+        return SimpleNamespace(
+            name=self.blob_name,
+            size=len(blob["data"]),
+            last_modified=blob["last_modified"],
+            etag=blob["etag"],
+            metadata=dict(blob["metadata"])
+        )
+    
+    def get_blob_properties(self, **kwargs):
+        _raise_azure_fault(self.service.faults, "get_blob_properties")
+        return self._properties(self._require())
+    
+    def exists(self, **kwargs) -> bool:
+        _raise_azure_fault(self.service.faults, "exists")
+        return self.service.store.get(self.container_name, self.blob_name) is not None
+    
+    def delete_blob(self, **kwargs):
+        _raise_azure_fault(self.service.faults, "delete_blob")
+        if not self.service.store.delete(self.container_name, self.blob_name):
+            raise ResourceNotFoundError(message=f"BlobNotFound: {self.blob_name}")
+
+class FakeContainerClient:
+    def __init__(self, service: "FakeBlobServiceClient", container: str):
+        self.service = service
+        self.container_name = container
+    
+    def get_blob_client(self, blob: str) -> FakeBlobClient:
+        return FakeBlobClient(self.service, self.container_name, blob)
+    
+    def list_blobs(self, name_starts_with: Optional[str] = None, include=None, **kwargs):
+        _raise_azure_fault(self.service.faults, "list_blobs")
+        blobs = self.service.store.snapshot(self.container_name)
+        for name in sorted(blobs):
+            if name_starts_with and not name.startswith(name_starts_with):
+                continue
+            blob = blobs[name]
+            yield SimpleNamespace(
+                name=name,
+                size=len(blob["data"]),
+                last_modified=blob["last_modified"],
+                etag=blob["etag"],
+                metadata=dict(blob["metadata"])
+            )
+
+class FakeBlobServiceClient:
+    """azure.storage.blob.BlobServiceClient 대체"""
+    
+    def __init__(self, store: FakeBlobStore, faults: Optional[FaultInjector] = None):
+        self.store = store
+        self.faults = faults or FaultInjector()
+    
+    def get_blob_client(self, container: str, blob: str) -> FakeBlobClient:
+        return FakeBlobClient(self, container, blob)
+    
+    def get_container_client(self, container: str) -> FakeContainerClient:
+        return FakeContainerClient(self, container)
+
+# ---------------------------------------------------------------------------
+# AI Search
+# ---------------------------------------------------------------------------
+
+class _Status(enum.Enum):
+    RUNNING = "running"
+    SUCCESS = "success"
+    IN_PROGRESS = "inProgress"
+
+# Blob 인덱서가 만드는 필드 구성 (서비스 코드의 파일명/내용 필드 탐색 순서에 맞춤)
+INDEX_FIELDS = [
+    ("chunk_id", "Edm.String"),
+    ("parent_id", "Edm.String"),
+    ("chunk", "Edm.String"),
+    ("title", "Edm.String"),
+    ("metadata_storage_name", "Edm.String"),
+]
+
+class FakeSearchService:
+    """
+    인덱스 문서와 인덱서 상태 (검색/인덱스/인덱서 클라이언트가 공유)
+    
+    run_indexer()를 호출하면 indexing_delay_seconds 후에 그 시점의 Blob이 문서로 반영됩니다.
+    """
+    
+    def __init__(
+        self,
+        store: FakeBlobStore,
+        index_name: str = "rag-0000000000000",
+        indexer_name: str = "rag-indexer",
+        indexing_delay_seconds: float = 0.5
+    ):
+        self.store = store
+        self.index_name = index_name
+        self.indexer_name = indexer_name
+        self.indexing_delay_seconds = indexing_delay_seconds
+        self._lock = threading.Lock()
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.running = False
+        self.last_result: Optional[SimpleNamespace] = None
+        self.run_count = 0
+    
+    def start_indexer(self):
+        with self._lock:
+            if self.running:
+                # 실제 서비스와 같이 실행 중에 다시 실행하면 409
+                error = HttpResponseError(message="(409) Another indexer invocation is currently in progress")
+                error.status_code = 409
+                raise error
+            self.running = True
+            self.run_count += 1
+        timer = threading.Timer(self.indexing_delay_seconds, self._finish_indexing)
+        timer.daemon = True
+        timer.start()
+    
+    def _finish_indexing(self):
+        blobs = self.store.snapshot()
+        documents = {}
+        for name, blob in blobs.items():
+            try:
+                text = blob["data"].decode("utf-8")
+            except UnicodeDecodeError:
+                continue
+            documents[name] = {
+                "chunk_id": f"{name}_0",
+                "parent_id": name,
+                "chunk": text,
+                "title": name,
+                "metadata_storage_name": name,
+            }
+        with self._lock:
+            self.documents = documents
+            self.running = False
+            self.last_result = SimpleNamespace(
+                status=_Status.SUCCESS,
+                end_time=datetime.datetime.now(datetime.timezone.utc),
+                item_count=len(documents),
+                errors=[]
+            )
+    
+    def search(self, search_text: str) -> List[Dict[str, Any]]:
+        """간단한 질의 해석: * / "구문" / 필드:값 / 일반 텍스트 (부분 일치)"""
+        with self._lock:
+            documents = list(self.documents.values())
+        query = (search_text or "*").strip()
+        if query == "*":
+            return documents
+        if query.startswith('"') and query.endswith('"'):
+            term, fields = query.strip('"'), None
+        elif ":" in query and query.split(":", 1)[0] in dict(INDEX_FIELDS):
+            field, term = query.split(":", 1)
+            fields = [field]
+        else:
+            term, fields = query, None
+        term = term.lower()
+        matched = []
+        for document in documents:
+            values = [document[f] for f in fields] if fields else document.values()
+            if any(term in str(value).lower() for value in values):
+                matched.append(document)
+        return matched
+
+class FakeSearchClient:
+    """azure.search.documents.SearchClient 대체"""
+    
+    def __init__(self, service: FakeSearchService, index_name: str, faults: Optional[FaultInjector] = None):
+        self.service = service
+        self.index_name = index_name
+        self.faults = faults or FaultInjector()
+    
+    def search(self, search_text: str = "*", top: Optional[int] = None, select: Optional[List[str]] = None, **kwargs):
+        _raise_azure_fault(self.faults, "search")
+        results = self.service.search(search_text)[:top] if top else self.service.search(search_text)
+        if select:
+            results = [{key: document.get(key) for key in select} for document in results]
+        return iter([{**document, "@search.score": 1.0} for document in results])
+
+class FakeSearchIndexClient:
+    """azure.search.documents.indexes.SearchIndexClient 대체"""
+    
+    def __init__(self, service: FakeSearchService, faults: Optional[FaultInjector] = None):
+        self.service = service
+        self.faults = faults or FaultInjector()
+    
+    def list_indexes(self, **kwargs):
+        _raise_azure_fault(self.faults, "list_indexes")
+        return iter([SimpleNamespace(name=self.service.index_name)])
+    
+    def get_index(self, name: str, **kwargs):
+        _raise_azure_fault(self.faults, "get_index")
+        if name != self.service.index_name:
+            raise ResourceNotFoundError(message=f"No index with the name '{name}' was found")
+        return SimpleNamespace(
+            name=name,
+            fields=[SimpleNamespace(name=field, type=field_type) for field, field_type in INDEX_FIELDS]
+        )
+
+class FakeSearchIndexerClient:
+    """azure.search.documents.indexes.SearchIndexerClient 대체"""
+    
+    def __init__(self, service: FakeSearchService, faults: Optional[FaultInjector] = None):
+        self.service = service
+        self.faults = faults or FaultInjector()
+    
+    def get_indexers(self, **kwargs):
+        _raise_azure_fault(self.faults, "get_indexers")
+        return [SimpleNamespace(name=self.service.indexer_name, target_index_name=self.service.index_name)]
+    
+    def get_indexer_status(self, name: str, **kwargs):
+        _raise_azure_fault(self.faults, "get_indexer_status")
+        last_result = self.service.last_result
+        if self.service.running:
+            last_result = SimpleNamespace(status=_Status.IN_PROGRESS, end_time=None, item_count=0, errors=[])
+        return SimpleNamespace(name=name, status=_Status.RUNNING, last_result=last_result)
+    
+    def run_indexer(self, name: str, **kwargs):
+        _raise_azure_fault(self.faults, "run_indexer")
+        self.service.start_indexer()
+
+# ---------------------------------------------------------------------------
+# Azure OpenAI
+# ---------------------------------------------------------------------------
+
+FAKE_SCORES = {
+    "overall_fit": 78, "tech_stack_match": 82, "experience_fit": 70,
+    "communication": 80, "technical": 76, "teamwork": 84, "growth_potential": 88, "job_fit": 79,
+}
+
+class FakeChatModel:
+    """
+    AzureChatOpenAI 대체 (invoke/ainvoke)
+    
+    응답에는 마크다운 평가 본문과 점수 JSON 블록, 입력/출력 토큰 수(usage_metadata)가 들어갑니다.
+    """
+    
+    def __init__(self, deployment: str, faults: Optional[FaultInjector] = None, output_chars: int = 1500):
+        self.deployment = deployment
+        self.faults = faults or FaultInjector()
+        self.output_chars = output_chars
+    
+    def _response(self, prompt: Any) -> AIMessage:
+        from app.services.llm_gateway import _prompt_text
+        prompt_text = _prompt_text(prompt)
+        body = "## 평가 요약\n" + ("지원자의 경험과 역량을 검토한 결과입니다. " * (self.output_chars // 24 + 1))[:self.output_chars]
+        scores = ", ".join(f'"{key}": {value}' for key, value in FAKE_SCORES.items())
+        content = f"{body}\n\n```json\n{{{scores}}}\n```"
+        input_tokens = len(prompt_text) // 2
+        output_tokens = len(content) // 2
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens
+            }
+        )
+    
+    def invoke(self, prompt: Any, config=None, **kwargs) -> AIMessage:
+        fault = self.faults.apply()
+        if fault:
+            raise _openai_error(fault, self.faults.retry_after_ms)
+        return self._response(prompt)
+    
+    async def ainvoke(self, prompt: Any, config=None, **kwargs) -> AIMessage:
+        fault = await self.faults.apply_async()
+        if fault:
+            raise _openai_error(fault, self.faults.retry_after_ms)
+        return self._response(prompt)
+
+FAKE_TRANSCRIPT = (
+    "자기소개를 부탁드립니다. 안녕하세요, 백엔드 개발자로 3년간 일했습니다. "
+    "가장 어려웠던 프로젝트는 무엇인가요? 트래픽이 몰리는 결제 시스템의 성능을 개선한 경험이 있습니다. "
+)
+
+class FakeTranscriptions:
+    def __init__(self, faults: FaultInjector, repeat: int):
+        self.faults = faults
+        self.repeat = repeat
+    
+    def create(self, model: str, file, language: Optional[str] = None, **kwargs):
+        fault = self.faults.apply()
+        if fault:
+            raise _openai_error(fault, self.faults.retry_after_ms)
+        file.read()
+        return SimpleNamespace(text=FAKE_TRANSCRIPT * self.repeat)
+
+class FakeOpenAIClient:
+    """openai.AzureOpenAI 대체 (audio.transcriptions.create만 사용)"""
+    
+    def __init__(self, faults: Optional[FaultInjector] = None, transcript_repeat: int = 10):
+        self.audio = SimpleNamespace(transcriptions=FakeTranscriptions(faults or FaultInjector(), transcript_repeat))
+
+# ---------------------------------------------------------------------------
+# 연결
+# ---------------------------------------------------------------------------
+
+class FakeAzure:
+    """설치된 가짜 서비스 모음 (벤치마크 결과에 주입 통계를 남기기 위해 보관)"""
+    
+    def __init__(self, store: FakeBlobStore, search: FakeSearchService, faults: Dict[str, FaultInjector]):
+        self.store = store
+        self.search = search
+        self.faults = faults
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "faults": {name: injector.stats() for name, injector in self.faults.items()},
+            "indexer_runs": self.search.run_count,
+            "blobs": len(self.store.snapshot()),
+        }
+
+def install_fakes(
+    blob: Optional[FaultInjector] = None,
+    search: Optional[FaultInjector] = None,
+    llm: Optional[FaultInjector] = None,
+    stt: Optional[FaultInjector] = None,
+    indexing_delay_seconds: float = 0.5,
+    container_name: str = "fake-container"
+) -> FakeAzure:
+    """
+    전역 서비스 인스턴스의 Azure 클라이언트를 가짜 구현으로 교체
+    
+    app 모듈을 import한 뒤, 서비스를 처음 사용하기 전에 호출합니다 (이미 생성된 서비스는 가짜 클라이언트로 다시 생성).
+    LLM 호출은 가짜 모델로 바뀌지만 공용 게이트웨이(요청/토큰 한도, 재시도)는 그대로 거칩니다.
+    """
+    from app.config import settings
+    from app.services.document_analyzer import DocumentAnalyzer, document_analyzer
+    from app.services.speech_service import SpeechAnalysisService, speech_service
+    from app.services.llm_gateway import llm_gateway
+    from app.services.storage_backend import AzureStorageBackend
+    
+    faults = {
+        "blob": blob or FaultInjector(),
+        "search": search or FaultInjector(),
+        "llm": llm or FaultInjector(),
+        "stt": stt or FaultInjector(),
+    }
+    store = FakeBlobStore()
+    search_service = FakeSearchService(store, indexing_delay_seconds=indexing_delay_seconds)
+    blob_service_client = FakeBlobServiceClient(store, faults["blob"])
+    
+    # 채팅 모델 생성 지점을 교체 (서비스가 만드는 LLM도 게이트웨이 래핑을 그대로 거침)
+    llm_gateway._create_chat_model = lambda deployment, **kwargs: FakeChatModel(deployment, faults["llm"])
+    
+    # storage_backend=local이면 로컬 파일 시스템을 그대로 사용 (None이면 서비스가 설정대로 생성)
+    storage = None if settings.storage_backend == "local" else AzureStorageBackend(blob_service_client, container_name)
+    
+    # 서비스는 처음 사용할 때 가짜 클라이언트로 생성됨 (생성 중 인덱스 조회도 가짜 서비스로 감)
+    # search_backend=local이면 업로드 시 내장 인덱스에 색인되므로 검색 클라이언트는 쓰이지 않음
+    document_analyzer.override(lambda: DocumentAnalyzer(
+        index_client=FakeSearchIndexClient(search_service, faults["search"]),
+        indexer_client=FakeSearchIndexerClient(search_service, faults["search"]),
+        search_client_factory=lambda index_name: FakeSearchClient(search_service, index_name, faults["search"]),
+        storage=storage
+    ))
+    speech_service.override(lambda: SpeechAnalysisService(
+        openai_client=FakeOpenAIClient(faults["stt"]),
+        storage=storage
+    ))
+    
+    return FakeAzure(store, search_service, faults)
@@ -0,0 +1,128 @@
+"""
+app.main 시작 시간 프로파일러
+
+새 파이썬 프로세스에서 `python -X importtime`으로 app.main을 import하여
+모듈별 누적/자체 import 시간과 (--init 지정 시) 지연 서비스 초기화 시간을 보고합니다.
+--check를 지정하면 import 시간이 한도(settings.startup_import_budget_ms 또는 --budget-ms)를 넘을 때 종료 코드 1을 반환합니다.
+같은 검사를 tests/test_startup_time.py가 pytest로 수행합니다 (시작 시간 회귀 테스트).
+
+사용 예 (backend 디렉터리에서):
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --top 40 --init
+    python -m benchmarks.import_profile --check --repeat 5
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 자식 프로세스에서 실행할 코드 (import 시간과 서비스 초기화 시간을 JSON으로 출력)
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+result = {"import_ms": (time.perf_counter() - started) * 1000, "init_ms": {}}
+if "--init" in sys.argv:
+    from app.services.lazy import preload_services
+    result["init_ms"] = {name: seconds * 1000 for name, seconds in preload_services().items()}
+print("__PROFILE__" + json.dumps(result))
+"""
+
+LINE_PATTERN = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def run_probe(init: bool) -> Dict[str, Any]:
+    """새 프로세스에서 app.main import (매번 콜드 스타트)"""
+    env = dict(os.environ)
+    env.setdefault("CHROMA_PERSIST_DIR", tempfile.mkdtemp(prefix="import-profile-"))
+    env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    command = [sys.executable, "-X", "importtime", "-c", PROBE] + (["--init"] if init else [])
+    completed = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    marker = [line for line in completed.stdout.splitlines() if line.startswith("__PROFILE__")]
+    if completed.returncode != 0 or not marker:
+        raise RuntimeError(f"app.main import 실패:\n{completed.stderr[-2000:]}")
+        
+    modules = []
+    for line in completed.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            modules.append({
+                "module": match.group(4),
+                "self_ms": int(match.group(1)) / 1000,
+                "cumulative_ms": int(match.group(2)) / 1000,
+                "depth": len(match.group(3)) // 2,
+            })
+    result = json.loads(marker[0][len("__PROFILE__"):])
+    result["modules"] = modules
+    return result
+
+def measure_import(repeat: int = 1, init: bool = False) -> Tuple[float, Dict[str, Any]]:
+    """repeat회 콜드 스타트 측정 (import 시간 중앙값, 중앙값에 가장 가까운 측정 결과)"""
+    runs = [run_probe(init) for _ in range(max(1, repeat))]
+    median_ms = statistics.median(run["import_ms"] for run in runs)
+    result = min(runs, key=lambda run: abs(run["import_ms"] - median_ms))
+    result["runs_ms"] = [run["import_ms"] for run in runs]
+    return median_ms, result
+
+def by_package(modules: List[Dict[str, Any]]) -> Dict[str, float]:
+    """최상위 패키지별 자체 import 시간 합계 (app은 하위 모듈 단위로 구분)"""
+    totals: Dict[str, float] = {}
+    for module in modules:
+        name = module["module"]
+        key = ".".join(name.split(".")[:3]) if name.startswith("app.") else name.split(".")[0]
+        totals[key] = totals.get(key, 0.0) + module["self_ms"]
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+def report(result: Dict[str, Any], top: int):
+    print(f"app.main import: {result['import_ms']:.1f}ms")
+    for name, init_ms in result["init_ms"].items():
+        print(f"  + {name} 초기화: {init_ms:.1f}ms")
+        
+    print(f"\n누적 import 시간 상위 {top}개 모듈")
+    print(f"{'cumulative':>11} {'self':>9}  module")
+    for module in sorted(result["modules"], key=lambda m: m["cumulative_ms"], reverse=True)[:top]:
+        print(f"{module['cumulative_ms']:>9.1f}ms {module['self_ms']:>7.1f}ms  {'  ' * module['depth']}{module['module']}")
+        
+    print(f"\n패키지별 자체 import 시간 상위 {top}개")
+    for name, self_ms in list(by_package(result["modules"]).items())[:top]:
+        print(f"{self_ms:>9.1f}ms  {name}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="app.main import/초기화 시간 프로파일")
+    parser.add_argument("--top", type=int, default=25, help="표시할 모듈 수")
+    parser.add_argument("--init", action="store_true", help="지연 서비스 초기화 시간도 측정 (Azure 설정 필요)")
+    parser.add_argument("--repeat", type=int, default=1, help="반복 측정 횟수 (중앙값 사용)")
+    parser.add_argument("--check", action="store_true", help="import 시간이 한도를 넘으면 종료 코드 1")
+    parser.add_argument("--budget-ms", type=float, help="import 시간 한도 (기본값: settings.startup_import_budget_ms)")
+    parser.add_argument("--json", help="측정 결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+    
+    median_ms, result = measure_import(args.repeat, args.init)
+    report(result, args.top)
+    if args.repeat > 1:
+        print(f"\n{args.repeat}회 측정: " + ", ".join(f"{ms:.0f}ms" for ms in result["runs_ms"]) + f" (중앙값 {median_ms:.1f}ms)")
+        
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"import_ms": median_ms, "init_ms": result["init_ms"], "modules": result["modules"]}, f, ensure_ascii=False, indent=2)
+            
+    if args.check:
+        budget_ms = args.budget_ms
+        if budget_ms is None:
+            sys.path.insert(0, BACKEND_DIR)
+            from app.config import settings
+            budget_ms = settings.startup_import_budget_ms
+        if median_ms > budget_ms:
+            print(f"\n❌ 시작 시간 한도 초과: {median_ms:.1f}ms > {budget_ms:.0f}ms")
+            return 1
+        print(f"\n✅ 시작 시간 한도 이내: {median_ms:.1f}ms <= {budget_ms:.0f}ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
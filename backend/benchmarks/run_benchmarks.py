@@ -0,0 +1,355 @@
+"""
+API 엔드투엔드 벤치마크 (가짜 Azure 서비스 사용, 네트워크 불필요)
+
+모든 라우터 엔드포인트에 동시 요청을 보내 엔드포인트별 p50/p95/p99 지연 시간과 처리량을 측정합니다.
+요청은 ASGI 앱에 직접 전달되므로 미들웨어(메트릭, 추적)부터 서비스 코드까지 실제 경로를 그대로 거칩니다.
+
+사용 예 (backend 디렉터리에서):
+    python -m benchmarks.run_benchmarks --concurrency 8 --requests 40
+    python -m benchmarks.run_benchmarks --llm-latency-ms 800 --llm-throttle-rate 0.05
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json --max-regression 0.2
+
+--baseline으로 비교하면 p95가 기준보다 max-regression 비율 이상 느려진 엔드포인트를 표시하고 종료 코드 1을 반환합니다.
+기준 파일은 같은 장비에서 --save-baseline으로 측정한 결과만 사용하세요.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# app 설정이 로드되기 전에 가짜 환경 지정 (실제 키/엔드포인트는 사용되지 않음)
+_BENCH_DIR = tempfile.mkdtemp(prefix="interview-bench-")
+for _key, _value in {
+    "AZURE_OPENAI_API_KEY": "fake-key",
+    "AZURE_OPENAI_ENDPOINT": "https://fake.openai.azure.com",
+    "AZURE_AI_SEARCH_SERVICE_NAME": "fake-search",
+    "AZURE_AI_SEARCH_API_KEY": "fake-key",
+    "AZURE_AI_SEARCH_INDEX_NAME": "fake-index",
+    "AZURE_STORAGE_ACCOUNT_NAME": "fakestorage",
+    "AZURE_STORAGE_ACCOUNT_KEY": "ZmFrZS1rZXk=",
+    "AZURE_STORAGE_CONTAINER_NAME": "fake-container",
+    "LOG_LEVEL": "warning",
+    # 게이트웨이 한도는 가짜 모델 기준으로 넉넉하게 (스로틀링은 --llm-throttle-rate로 주입)
+    "LLM_REQUESTS_PER_MINUTE": "1000000",
+    "LLM_TOKENS_PER_MINUTE": "1000000000",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+# 벤치마크 실행 중 파일을 쓰는 모든 경로 설정 (_BENCH_DIR 아래로 옮김)
+BENCH_DIR_SETTINGS = ("chroma_persist_dir", "local_storage_dir", "local_search_dir")
+
+import httpx
+
+from .fakes import FaultInjector, install_fakes
+
+RESUME_TEXT = (
+    "이름: 홍길동\n경력: 백엔드 개발 3년 (Python, FastAPI, PostgreSQL, Redis)\n"
+    "프로젝트: 결제 시스템 성능 개선, 사내 검색 서비스 구축\n" * 5
+)
+JOB_TEXT = (
+    "채용 포지션: 백엔드 개발자\n필수 요건: Python 3년 이상, REST API 설계 경험\n"
+    "우대 사항: 대용량 트래픽 처리 경험, 클라우드(Azure) 사용 경험\n" * 5
+)
+AUDIO_BYTES = b"ID3" + os.urandom(32 * 1024)
+TRANSCRIPT = (
+    "자기소개를 부탁드립니다. 안녕하세요, 백엔드 개발자로 3년간 일했습니다. "
+    "협업 경험을 말씀해주세요. 코드 리뷰 문화를 팀에 정착시킨 경험이 있습니다. "
+) * 10
+
+class Scenario:
+    """엔드포인트 하나의 요청 생성기"""
+    
+    def __init__(self, name: str, send: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]], heavy: bool = False):
+        self.name = name
+        self.send = send
+        self.heavy = heavy
+
+def _files(*fields):
+    return [(field, (filename, content, "text/plain")) for field, filename, content in fields]
+
+def build_scenarios(run_id: str) -> List[Scenario]:
+    """모든 라우터 엔드포인트 시나리오 (i: 요청 번호, 업로드 파일명 충돌 방지용)"""
+    doc = "/api/document"
+    itv = "/api/interview"
+    analysis = {"metadata": {"analysis_type": "document"}, "results": {"document_analysis": "## 평가\n" + RESUME_TEXT}}
+    
+    def resume(i: int) -> str:
+        return f"bench_{run_id}_{i}.txt"
+        
+    return [
+        Scenario("GET /health", lambda c, i: c.get("/health")),
+        Scenario("GET /metrics", lambda c, i: c.get("/metrics")),
+        Scenario("POST /document/upload-resume", lambda c, i: c.post(
+            f"{doc}/upload-resume", files=_files(("file", resume(i), RESUME_TEXT.encode())))),
+        Scenario("POST /document/upload-job", lambda c, i: c.post(
+            f"{doc}/upload-job", files=_files(("file", resume(i), JOB_TEXT.encode())))),
+        Scenario("POST /document/upload-both", lambda c, i: c.post(
+            f"{doc}/upload-both",
+            files=_files(("resume_file", resume(i), RESUME_TEXT.encode()), ("job_file", resume(i), JOB_TEXT.encode()))
+        )),
+        Scenario("POST /document/analyze-files", lambda c, i: c.post(
+            f"{doc}/analyze-files", json={"resume_filename": "bench_seed.txt", "job_filename": "bench_seed.txt"})),
+        Scenario("POST /document/analyze-text", lambda c, i: c.post(
+            f"{doc}/analyze-text", json={"resume_text": RESUME_TEXT, "job_posting_text": JOB_TEXT})),
+        Scenario("POST /document/upload-and-analyze", lambda c, i: c.post(
+            f"{doc}/upload-and-analyze",
+            files=_files(("resume_file", f"full_{resume(i)}", RESUME_TEXT.encode()), ("job_file", f"full_{resume(i)}", JOB_TEXT.encode()))
+        ), heavy=True),
+        Scenario("POST /document/upload-and-analyze-fast", lambda c, i: c.post(
+            f"{doc}/upload-and-analyze-fast",
+            files=_files(("resume_file", f"fast_{resume(i)}", RESUME_TEXT.encode()), ("job_file", f"fast_{resume(i)}", JOB_TEXT.encode()))
+        ), heavy=True),
+        Scenario("POST /document/batch-analyze", lambda c, i: c.post(
+            f"{doc}/batch-analyze",
+            data={"job_filename": "bench_seed.txt", "resume_filenames": ",".join(f"bench_seed_{n}.txt" for n in range(4))}
+        ), heavy=True),
+        Scenario("POST /document/ask-questions", lambda c, i: c.post(
+            f"{doc}/ask-questions",
+            json={"questions": ["강점은 무엇인가요?", "협업 경험은?", "보완할 점은?"], "resume_filename": "bench_seed.txt"}
+        )),
+        Scenario("GET /document/leaderboard/{job_filename}", lambda c, i: c.get(f"{doc}/leaderboard/bench_seed.txt")),
+        Scenario("GET /document/files-list", lambda c, i: c.get(f"{doc}/files-list")),
+        Scenario("GET /document/debug-index", lambda c, i: c.get(f"{doc}/debug-index")),
+        Scenario("POST /document/run-indexer", lambda c, i: c.post(f"{doc}/run-indexer")),
+        Scenario("GET /document/indexer-status", lambda c, i: c.get(f"{doc}/indexer-status")),
+        Scenario("POST /document/integrated-analysis", lambda c, i: c.post(
+            f"{doc}/integrated-analysis",
+            json={"document_analysis": RESUME_TEXT, "interview_stt": TRANSCRIPT, "resume_filename": "bench_seed.txt", "job_filename": "bench_seed.txt"}
+        )),
+        Scenario("POST /document/save-analysis-result", lambda c, i: c.post(f"{doc}/save-analysis-result", json=analysis)),
+        Scenario("GET /document/get-saved-results", lambda c, i: c.get(f"{doc}/get-saved-results")),
+        Scenario("GET /document/load-analysis-result/{filename}", lambda c, i: c.get(
+            f"{doc}/load-analysis-result/analysis_result_bench_seed.json")),
+        Scenario("DELETE /document/delete-analysis-result/{filename}", lambda c, i: c.delete(
+            f"{doc}/delete-analysis-result/analysis_result_bench_{run_id}_{i}.json")),
+        Scenario("POST /interview/upload-audio", lambda c, i: c.post(
+            f"{itv}/upload-audio", files=[("file", (f"{resume(i)}.mp3", AUDIO_BYTES, "audio/mpeg"))])),
+        Scenario("POST /interview/transcribe", lambda c, i: c.post(
+            f"{itv}/transcribe", files=[("file", (f"{resume(i)}.mp3", AUDIO_BYTES, "audio/mpeg"))])),
+        Scenario("POST /interview/upload-and-transcribe", lambda c, i: c.post(
+            f"{itv}/upload-and-transcribe", files=[("file", (f"{resume(i)}.mp3", AUDIO_BYTES, "audio/mpeg"))])),
+        Scenario("POST /interview/analyze", lambda c, i: c.post(
+            f"{itv}/analyze", json={"transcription": TRANSCRIPT, "job_description": JOB_TEXT})),
+        Scenario("POST /interview/full-analysis", lambda c, i: c.post(
+            f"{itv}/full-analysis", files=[("audio_file", (f"{resume(i)}.mp3", AUDIO_BYTES, "audio/mpeg"))]), heavy=True),
+        Scenario("GET /interview/audio-files", lambda c, i: c.get(f"{itv}/audio-files")),
+        Scenario("POST /interview/transcribe-existing-file", lambda c, i: c.post(
+            f"{itv}/transcribe-existing-file", params={"filename": "interview_bench_seed.mp3"})),
+        Scenario("POST /interview/quick-analysis", lambda c, i: c.post(
+            f"{itv}/quick-analysis", json={"stt_result": TRANSCRIPT, "job_posting_content": JOB_TEXT, "resume_content": RESUME_TEXT})),
+    ]
+
+def seed(fake, run_id: str, requests: int):
+    """분석/조회 시나리오가 사용할 기존 데이터 (서비스의 저장소 + 검색 인덱스)"""
+    from app.services.document_analyzer import document_analyzer
+    storage = document_analyzer.storage  # storage_backend=local이면 로컬 파일 시스템
+    files = {
+        "resume_bench_seed.txt": RESUME_TEXT.encode(),
+        "job_bench_seed.txt": JOB_TEXT.encode(),
+        "interview_bench_seed.mp3": AUDIO_BYTES,
+        "analysis_result_bench_seed.json": json.dumps({"metadata": {}, "results": {}}).encode(),
+    }
+    for n in range(4):
+        files[f"resume_bench_seed_{n}.txt"] = RESUME_TEXT.encode()
+    for i in range(requests):
+        files[f"analysis_result_bench_{run_id}_{i}.json"] = b"{}"
+    for name, content in files.items():
+        storage.put(name, content)
+        
+    if document_analyzer.search_backend.indexes_on_upload:
+        # 로컬 검색 인덱스는 업로드 경로와 같이 직접 색인
+        for name, content in files.items():
+            if name.endswith(".txt"):
+                document_analyzer.search_backend.index_document(name, content)
+        return
+    fake.search.start_indexer()
+    while fake.search.running:
+        time.sleep(0.01)
+
+def percentile(values: List[float], q: float) -> float:
+    """최근접 순위 방식 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+def _is_app_error(response: httpx.Response) -> bool:
+    """HTTP 200이지만 {"status": "error"}를 반환한 경우 (이 API의 오류 관례)"""
+    if "application/json" not in response.headers.get("content-type", ""):
+        return False
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and body.get("status") == "error"
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int) -> Dict[str, Any]:
+    """시나리오 하나를 동시 실행하고 지연 시간 통계 계산"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    http_errors = 0
+    app_errors = 0
+    
+    async def one(i: int):
+        nonlocal http_errors, app_errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await scenario.send(client, i)
+                await response.aread()
+            except Exception:
+                http_errors += 1
+                return
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                http_errors += 1
+            elif _is_app_error(response):
+                app_errors += 1
+                
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "http_errors": http_errors,
+        "app_errors": app_errors,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2) if latencies else 0.0,
+        "throughput_rps": round(requests / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], max_regression: float, min_delta_ms: float) -> List[str]:
+    """p95 기준 회귀 엔드포인트 목록 (작은 절대 차이는 측정 잡음으로 보고 무시)"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("p95_ms"):
+            continue
+        delta = result["p95_ms"] - base["p95_ms"]
+        if delta > min_delta_ms and result["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            regressions.append(name)
+    return regressions
+
+def print_table(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]], regressions: List[str]):
+    header = f"{'endpoint':<52} {'n':>4} {'err':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>8}"
+    if baseline is not None:
+        header += f" {'p95 Δ':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        line = (
+            f"{name:<52} {r['requests']:>4} {r['http_errors'] + r['app_errors']:>4} "
+            f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['throughput_rps']:>8.1f}"
+        )
+        if baseline is not None:
+            base = baseline.get(name)
+            if base and base.get("p95_ms"):
+                line += f" {(r['p95_ms'] / base['p95_ms'] - 1) * 100:>+8.1f}%"
+            else:
+                line += f" {'new':>9}"
+            if name in regressions:
+                line += "  ← 회귀"
+        print(line)
+
+async def main_async(args: argparse.Namespace) -> int:
+    from app.config import settings
+    
+    # 저장소/인덱스/DB는 모두 임시 디렉터리 사용 (실제 데이터에 벤치마크 파일과 점수가 섞이지 않도록)
+    # .env 값보다 우선하도록 app.main(서비스 모듈)을 불러오기 전에 설정 객체를 직접 바꿈
+    for field in BENCH_DIR_SETTINGS:
+        setattr(settings, field, os.path.join(_BENCH_DIR, field))
+    
+    from app.main import app
+    
+    fake = install_fakes(
+        blob=FaultInjector(args.storage_latency_ms, args.jitter_ms, args.storage_throttle_rate, args.failure_rate, seed=args.seed),
+        search=FaultInjector(args.search_latency_ms, args.jitter_ms, args.search_throttle_rate, args.failure_rate, seed=args.seed),
+        llm=FaultInjector(args.llm_latency_ms, args.jitter_ms, args.llm_throttle_rate, args.failure_rate, seed=args.seed),
+        stt=FaultInjector(args.stt_latency_ms, args.jitter_ms, args.llm_throttle_rate, args.failure_rate, seed=args.seed),
+        indexing_delay_seconds=args.indexing_delay_seconds,
+        container_name=settings.azure_storage_container_name or "fake-container"
+    )
+    run_id = datetime.datetime.now().strftime("%H%M%S")
+    seed(fake, run_id, args.requests)
+    
+    scenarios = [s for s in build_scenarios(run_id) if not args.only or any(key in s.name for key in args.only)]
+    transport = httpx.ASGITransport(app=app)
+    results: Dict[str, Dict[str, Any]] = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for scenario in scenarios:
+            requests = args.heavy_requests if scenario.heavy else args.requests
+            results[scenario.name] = await run_scenario(client, scenario, requests, args.concurrency)
+            print(f"  {scenario.name}: p95 {results[scenario.name]['p95_ms']:.1f}ms", file=sys.stderr)
+            
+    baseline = None
+    regressions: List[str] = []
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"기준 파일이 없습니다: {args.baseline} (--save-baseline으로 먼저 생성)", file=sys.stderr)
+            return 2
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.max_regression, args.min_delta_ms)
+        
+    print_table(results, baseline, regressions)
+    print(f"\n가짜 서비스 통계: {json.dumps(fake.stats(), ensure_ascii=False)}")
+    
+    report = {
+        "meta": {
+            "created_at": datetime.datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("save_baseline", "baseline", "output")},
+        },
+        "results": results,
+    }
+    for path in (args.save_baseline, args.output):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"결과 저장: {path}")
+            
+    if regressions:
+        print(f"\n⚠️ p95 회귀 {len(regressions)}건: {', '.join(regressions)}")
+        return 1
+    return 0
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="가짜 Azure 서비스로 API 엔드포인트 벤치마크")
+    parser.add_argument("--concurrency", type=int, default=8, help="엔드포인트별 동시 요청 수")
+    parser.add_argument("--requests", type=int, default=40, help="엔드포인트별 요청 수")
+    parser.add_argument("--heavy-requests", type=int, default=8, help="업로드+인덱싱+분석 올인원 엔드포인트의 요청 수")
+    parser.add_argument("--only", nargs="*", help="이름에 해당 문자열이 포함된 엔드포인트만 실행")
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--stt-latency-ms", type=float, default=500)
+    parser.add_argument("--search-latency-ms", type=float, default=20)
+    parser.add_argument("--storage-latency-ms", type=float, default=15)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--llm-throttle-rate", type=float, default=0.0, help="LLM/STT 429 비율")
+    parser.add_argument("--search-throttle-rate", type=float, default=0.0)
+    parser.add_argument("--storage-throttle-rate", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="모든 가짜 서비스의 500 오류 비율")
+    parser.add_argument("--indexing-delay-seconds", type=float, default=0.5, help="인덱서 실행 후 문서가 검색되기까지 걸리는 시간")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--save-baseline", help="결과를 기준 파일로 저장")
+    parser.add_argument("--baseline", help="비교할 기준 파일")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="허용 p95 증가 비율")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="이보다 작은 p95 차이는 무시")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    return asyncio.run(main_async(parse_args(argv)))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+"""
+테스트 공통 설정
+
+app 설정이 로드되기 전에 저장 경로를 임시 디렉터리로 지정합니다 (테스트가 작업 트리에 파일을 만들지 않도록).
+실제 Azure 키/엔드포인트는 사용하지 않습니다.
+"""
+import os
+import tempfile
+
+_TEST_DIR = tempfile.mkdtemp(prefix="interview-tests-")
+for _key, _value in {
+    "CHROMA_PERSIST_DIR": os.path.join(_TEST_DIR, "chroma_db"),
+    "LOCAL_STORAGE_DIR": os.path.join(_TEST_DIR, "local_storage"),
+    "LOCAL_SEARCH_DIR": os.path.join(_TEST_DIR, "local_search_index"),
+    "LOG_LEVEL": "warning",
+    # 벡터 인덱스는 Azure 임베딩을 호출하므로 테스트에서는 끔 (tests/test_vector_index.py는 직접 생성)
+    "VECTOR_SEARCH_ENABLED": "false",
+}.items():
+    os.environ.setdefault(_key, _value)
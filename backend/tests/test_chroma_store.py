@@ -0,0 +1,85 @@
+"""JSONL 로그 저장소 (user-026): 로그 재생, 손상된 꼬리 제거, 스냅샷 압축"""
+import json
+import os
+import time
+
+import pytest
+
+from app.config import settings
+from app.services.chroma_store import TempStoreService
+
+def save(store, name):
+    return store.save_analysis_result(name, "백엔드", f"{name} 요약", "강점", "약점")
+
+def log_lines(store):
+    with open(store.log_file, "rb") as f:
+        return f.read().splitlines(keepends=True)
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "chroma_persist_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "chroma_group_commit_ms", 0)
+    monkeypatch.setattr(settings, "chroma_compact_min_records", 1000)
+    monkeypatch.setattr(settings, "chroma_compact_interval_seconds", 3600)
+    return tmp_path
+
+def test_saved_records_are_replayed_from_log(store_dir):
+    store = TempStoreService()
+    ids = [save(store, f"지원자{i}") for i in range(3)]
+    
+    assert len(log_lines(store)) == 3
+    assert not os.path.exists(store.storage_file)  # 압축 전에는 스냅샷 없음
+    reopened = TempStoreService()
+    assert {reopened.get_analysis_result(i)["id"] for i in ids} == set(ids)
+
+def test_torn_tail_is_ignored_on_load_and_truncated_on_next_write(store_dir):
+    store = TempStoreService()
+    first = save(store, "지원자1")
+    with open(store.log_file, "ab") as f:
+        f.write(b'{"op": "put", "doc": {"id": "torn"')  # 쓰는 중 중단된 줄
+    
+    reopened = TempStoreService()
+    assert reopened.get_collection_stats()["document_count"] == 1
+    
+    second = save(reopened, "지원자2")
+    lines = log_lines(reopened)
+    assert all(line.endswith(b"\n") for line in lines)
+    assert [json.loads(line)["doc"]["id"] for line in lines] == [first, second]
+    assert TempStoreService().get_collection_stats()["document_count"] == 2
+
+def test_compaction_writes_snapshot_and_empties_log(store_dir):
+    store = TempStoreService()
+    ids = [save(store, f"지원자{i}") for i in range(3)]
+    
+    store._compact()
+    assert os.path.getsize(store.log_file) == 0
+    with open(store.storage_file, encoding="utf-8") as f:
+        assert set(json.load(f)) == set(ids)
+    
+    after = save(store, "지원자3")
+    reopened = TempStoreService()
+    stats = reopened.get_collection_stats()
+    assert stats["document_count"] == 4 and stats["pending_log_records"] == 1
+    assert reopened.get_analysis_result(after)["candidate_name"] == "지원자3"
+
+def test_compaction_runs_in_background_after_min_records(store_dir, monkeypatch):
+    monkeypatch.setattr(settings, "chroma_compact_min_records", 2)
+    store = TempStoreService()
+    save(store, "지원자1")
+    save(store, "지원자2")
+    
+    deadline = time.monotonic() + 5
+    while os.path.getsize(store.log_file) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert os.path.getsize(store.log_file) == 0
+    assert TempStoreService().get_collection_stats()["document_count"] == 2
+
+def test_other_instance_sees_writes_and_compaction(store_dir):
+    writer, reader = TempStoreService(), TempStoreService()  # 같은 파일을 쓰는 두 워커 프로세스 흉내
+    first = save(writer, "지원자1")
+    assert reader.get_analysis_result(first)["id"] == first
+    
+    writer._compact()
+    second = save(writer, "지원자2")
+    assert reader.get_analysis_result(second)["id"] == second
+    assert reader.get_collection_stats()["document_count"] == 2
@@ -0,0 +1,151 @@
+"""HTTP 압축 (user-040): 응답 압축 send 래퍼, gzip 요청 본문 해제와 크기 제한(413)"""
+import asyncio
+import gzip
+import json
+import zlib
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from app.compression import CompressionMiddleware, _CompressingSend, _decompressing_receive, choose_encoding
+from app.config import settings
+
+def run_send(messages, encoding="gzip"):
+    """응답 메시지들을 _CompressingSend에 통과시키고 실제로 전송된 메시지 목록 반환"""
+    sent = []
+    
+    async def send(message):
+        sent.append(message)
+    
+    async def scenario():
+        wrapper = _CompressingSend(send, encoding)
+        for message in messages:
+            await wrapper(message)
+    
+    asyncio.run(scenario())
+    return sent
+
+def start(content_type="application/json", **headers):
+    raw = [(b"content-type", content_type.encode())]
+    raw += [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return {"type": "http.response.start", "status": 200, "headers": raw}
+
+def header(message, name):
+    return dict(message["headers"]).get(name.encode(), b"").decode()
+
+def test_choose_encoding_prefers_brotli_and_skips_q0():
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("br;q=0, gzip") == "gzip"
+    assert choose_encoding("*", ("gzip",)) == "gzip"
+    assert choose_encoding("identity") is None
+
+def test_large_body_is_compressed_with_length_and_etag_updated():
+    body = json.dumps({"items": ["면접 분석 결과"] * 500}, ensure_ascii=False).encode()
+    sent = run_send([
+        start(content_length=str(len(body)), etag='"abc"'),
+        {"type": "http.response.body", "body": body},
+    ])
+    
+    response_start, response_body = sent
+    assert header(response_start, "content-encoding") == "gzip"
+    assert header(response_start, "etag") == '"abc-gzip"'
+    assert "Accept-Encoding" in header(response_start, "vary")
+    assert header(response_start, "content-length") == str(len(response_body["body"]))
+    assert gzip.decompress(response_body["body"]) == body
+
+@pytest.mark.parametrize("first, content_type", [
+    (b"{}", "application/json"),  # compression_min_bytes 미만
+    (b"x" * 4096, "image/png"),  # 압축 효과가 없는 형식
+])
+def test_small_or_incompressible_body_passes_through(first, content_type):
+    original = start(content_type, content_length=str(len(first)))
+    sent = run_send([original, {"type": "http.response.body", "body": first}])
+    
+    assert sent[0] is original
+    assert header(sent[0], "content-encoding") == ""
+    assert sent[1]["body"] == first
+
+def test_streaming_chunks_are_flushed_individually():
+    chunks = [json.dumps({"progress": i}).encode() + b"\n" for i in range(3)]
+    messages = [start("application/x-ndjson", content_length="999")]
+    messages += [{"type": "http.response.body", "body": chunk, "more_body": True} for chunk in chunks]
+    messages.append({"type": "http.response.body", "body": b"", "more_body": False})
+    
+    sent = run_send(messages)
+    
+    assert header(sent[0], "content-encoding") == "gzip"
+    assert header(sent[0], "content-length") == ""
+    # 조각마다 flush되므로 다음 조각을 받기 전에 지금까지의 내용을 풀 수 있음
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for chunk, message in zip(chunks, sent[1:]):
+        assert message["more_body"] is True
+        assert decompressor.decompress(message["body"]) == chunk
+    assert sent[-1]["more_body"] is False
+    decompressor.decompress(sent[-1]["body"])
+    assert decompressor.eof
+
+def receive_all(chunks):
+    """gzip 조각들을 _decompressing_receive로 읽어 풀린 본문 반환"""
+    messages = iter(
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    )
+    
+    async def receive():
+        return next(messages)
+    
+    async def scenario():
+        wrapped = _decompressing_receive(receive)
+        body = b""
+        while True:
+            message = await wrapped()
+            body += message["body"]
+            if not message["more_body"]:
+                return body
+    
+    return asyncio.run(scenario())
+
+def test_gzip_request_body_is_decompressed_across_chunks():
+    original = "면접 STT 문장입니다. ".encode() * 2000
+    compressed = gzip.compress(original)
+    
+    assert receive_all([compressed[i:i + 100] for i in range(0, len(compressed), 100)]) == original
+
+def test_decompressed_size_limit_raises_413(monkeypatch):
+    monkeypatch.setattr(settings, "request_max_decompressed_bytes", 10_000)
+    
+    assert len(receive_all([gzip.compress(b"a" * 10_000)])) == 10_000
+    with pytest.raises(HTTPException) as error:
+        receive_all([gzip.compress(b"a" * 10_001)])
+    assert error.value.status_code == 413
+
+def test_invalid_gzip_raises_400():
+    with pytest.raises(HTTPException) as error:
+        receive_all([b"not gzip"])
+    assert error.value.status_code == 400
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    
+    @app.post("/echo")
+    async def echo(request: Request):
+        return {"length": len(await request.body())}
+    
+    app.add_middleware(CompressionMiddleware)
+    return TestClient(app)
+
+def test_middleware_returns_413_for_gzip_bomb(client, monkeypatch):
+    monkeypatch.setattr(settings, "request_max_decompressed_bytes", 1024 * 1024)
+    headers = {"content-encoding": "gzip", "content-type": "application/octet-stream"}
+    
+    ok = client.post("/echo", content=gzip.compress(b"a" * 1000), headers=headers)
+    assert ok.status_code == 200 and ok.json() == {"length": 1000}
+    
+    bomb = client.post("/echo", content=gzip.compress(b"\0" * (8 * 1024 * 1024)), headers=headers)
+    assert bomb.status_code == 413
+
+def test_middleware_rejects_unsupported_request_encoding(client):
+    response = client.post("/echo", content=b"data", headers={"content-encoding": "br"})
+    assert response.status_code == 415
@@ -0,0 +1,90 @@
+"""조건부 GET (user-041): ETag 비교, 압축 접미사 무시, 304 응답"""
+import json
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.compression import CompressionMiddleware
+from app.http_cache import (
+    LISTING_CACHE_CONTROL,
+    if_none_match,
+    not_modified,
+    requested_etag,
+    set_cache_headers,
+)
+from app.services.storage_backend import LocalStorageBackend, StorageNotModified
+
+def make_request(header=None):
+    headers = [(b"if-none-match", header.encode())] if header is not None else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+@pytest.mark.parametrize("header, expected", [
+    ('"v1"', True),
+    ('W/"v1"', True),
+    ('"v1-gzip"', True),  # CompressionMiddleware가 붙인 접미사
+    ('"v1-br"', True),
+    ('"v0", "v1-br"', True),
+    ("*", True),
+    ('"v2"', False),
+    ('"v1-deflate"', False),
+    (None, False),
+])
+def test_if_none_match_ignores_weak_prefix_and_encoding_suffix(header, expected):
+    assert if_none_match(make_request(header), '"v1"') is expected
+
+def test_if_none_match_without_current_etag_is_false():
+    assert not if_none_match(make_request('"v1"'), None)
+
+def test_requested_etag_strips_suffix_for_storage_conditional_get(tmp_path):
+    storage = LocalStorageBackend(str(tmp_path), "results")
+    etag = storage.put("result.json", b"{}")
+    
+    assert requested_etag(make_request("*")) is None
+    assert requested_etag(make_request(None)) is None
+    forwarded = requested_etag(make_request(f'{etag[:-1]}-gzip", "other"'))
+    assert forwarded == etag
+    with pytest.raises(StorageNotModified):
+        storage.get("result.json", if_none_match=forwarded)
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    state = {"version": 1}
+    
+    @app.get("/items")
+    async def items(request: Request, response: Response):
+        etag = f'"v{state["version"]}"'
+        if if_none_match(request, etag):
+            return not_modified(etag, LISTING_CACHE_CONTROL)
+        set_cache_headers(response, etag, LISTING_CACHE_CONTROL)
+        return {"version": state["version"], "items": ["면접 분석"] * 200}
+    
+    app.add_middleware(CompressionMiddleware)
+    test_client = TestClient(app)
+    test_client.state = state
+    return test_client
+
+def test_revalidation_of_compressed_response_returns_empty_304(client):
+    first = client.get("/items", headers={"accept-encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"] == '"v1-gzip"'
+    assert first.headers["cache-control"] == LISTING_CACHE_CONTROL
+    
+    second = client.get("/items", headers={"accept-encoding": "gzip", "if-none-match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert "content-encoding" not in second.headers
+    assert second.headers["etag"] == '"v1"'
+    assert second.headers["cache-control"] == LISTING_CACHE_CONTROL
+
+def test_changed_resource_returns_new_body(client):
+    first = client.get("/items", headers={"accept-encoding": "identity"})
+    assert first.headers["etag"] == '"v1"'
+    
+    client.state["version"] = 2
+    second = client.get("/items", headers={"accept-encoding": "identity", "if-none-match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.headers["etag"] == '"v2"'
+    assert json.loads(second.content)["version"] == 2
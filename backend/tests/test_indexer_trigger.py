@@ -0,0 +1,109 @@
+"""인덱서 실행 병합 (user-045): debounce 병합, 409 재실행 세대, 재시도 한도"""
+import threading
+
+import pytest
+
+from app.config import settings
+from app.services.indexer_trigger import IndexerTrigger
+
+INDEXERS = ("resume-indexer", "posting-indexer")
+
+class ScriptedTrigger(IndexerTrigger):
+    """_run 대신 정해진 인덱서 응답(이름 → 상태 코드)을 순서대로 반환"""
+    
+    def __init__(self, *responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.calls = []
+        self._calls_lock = threading.Lock()
+    
+    def _run(self, indexer_names):
+        with self._calls_lock:
+            self.calls.append(indexer_names)
+            codes = self.responses.pop(0) if self.responses else {}
+        names = indexer_names or INDEXERS
+        return {
+            "status": "success",
+            "indexers": [
+                {"indexer_name": name, "status": "started" if codes.get(name, 202) == 202 else "error", "status_code": codes.get(name, 202)}
+                for name in names
+            ]
+        }
+
+def statuses(result):
+    return {item["indexer_name"]: item["status_code"] for item in result["indexers"]}
+
+@pytest.fixture(autouse=True)
+def fast_trigger(monkeypatch):
+    monkeypatch.setattr(settings, "indexer_monitor_enabled", False)
+    monkeypatch.setattr(settings, "indexer_debounce_ms", 20)
+    monkeypatch.setattr(settings, "indexer_debounce_max_ms", 200)
+    monkeypatch.setattr(settings, "indexer_conflict_retry_seconds", 0.05)
+    monkeypatch.setattr(settings, "indexer_conflict_max_retries", 2)
+
+def test_requests_within_debounce_share_one_run():
+    trigger = ScriptedTrigger()
+    
+    generations = {trigger.request_run(f"resume_{i}.pdf") for i in range(3)}
+    assert len(generations) == 1
+    result = trigger.wait(generations.pop(), timeout=5)
+    
+    assert trigger.calls == [None]
+    assert result["merged_requests"] == 3
+    assert trigger.started_indexers(result) == list(INDEXERS)
+
+def test_busy_indexer_is_retried_in_next_generation():
+    trigger = ScriptedTrigger({"posting-indexer": 409})
+    generation = trigger.request_run("job.pdf")
+    
+    first = trigger.wait(generation, timeout=5, follow_retries=False)
+    assert statuses(first) == {"resume-indexer": 202, "posting-indexer": 409}
+    assert first["retry_generation"] == generation + 1
+    
+    combined = trigger.wait(generation, timeout=5)
+    assert trigger.calls == [None, ["posting-indexer"]]
+    assert combined["generation"] == generation + 1
+    assert "retry_generation" not in combined
+    assert combined["started_at"] == first["started_at"]
+    assert statuses(combined) == {"resume-indexer": 202, "posting-indexer": 202}
+    assert trigger.started_indexers(combined) == list(INDEXERS)
+
+def test_request_during_retry_delay_joins_retry_generation_and_runs_all(monkeypatch):
+    monkeypatch.setattr(settings, "indexer_conflict_retry_seconds", 2.0)
+    trigger = ScriptedTrigger({"posting-indexer": 409})
+    generation = trigger.request_run("job.pdf")
+    first = trigger.wait(generation, timeout=5, follow_retries=False)
+    
+    # 재실행 대기 중에 들어온 요청은 재실행 세대에 병합되고, 그 실행은 모든 인덱서를 대상으로 함
+    assert trigger.request_run("resume.pdf") == first["retry_generation"]
+    result = trigger.wait(first["retry_generation"], timeout=5)
+    
+    assert trigger.calls == [None, None]
+    assert result["merged_requests"] == 1
+    assert statuses(result) == {"resume-indexer": 202, "posting-indexer": 202}
+
+def test_retries_stop_after_max_and_counter_resets():
+    busy = {"posting-indexer": 409}
+    trigger = ScriptedTrigger(busy, busy, busy)
+    generation = trigger.request_run("job.pdf")
+    
+    result = trigger.wait(generation, timeout=5)
+    
+    assert trigger.calls == [None, ["posting-indexer"], ["posting-indexer"]]
+    assert result["generation"] == generation + 2
+    assert "retry_generation" not in result
+    assert trigger.started_indexers(result) == ["resume-indexer"]
+    
+    # 한도 초과 후에는 재시도 횟수가 초기화되어 다음 요청은 다시 재실행 가능
+    trigger.responses = [busy]
+    next_generation = trigger.request_run("job2.pdf")
+    assert trigger.wait(next_generation, timeout=5, follow_retries=False)["retry_generation"] == next_generation + 1
+
+def test_wait_times_out_with_error_result():
+    trigger = ScriptedTrigger()
+    
+    result = trigger.wait(99, timeout=0.01)
+    
+    assert result["status"] == "error"
+    assert result["generation"] == 99
+    assert trigger.started_indexers(result) == []
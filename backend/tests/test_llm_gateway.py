@@ -0,0 +1,114 @@
+"""LLM 게이트웨이 (user-031): 토큰 버킷 예약/대기 시간, AIMD 동시 실행 제한기"""
+import asyncio
+import threading
+
+import pytest
+
+from app.services.llm_gateway import AdaptiveConcurrencyLimiter, TokenBucket
+
+def test_bucket_reserve_returns_wait_until_refilled():
+    bucket = TokenBucket(per_minute=60)  # 초당 1개 보충
+    
+    assert bucket.reserve(60) == pytest.approx(0.0, abs=0.1)
+    assert bucket.reserve(30) == pytest.approx(30.0, abs=0.1)
+    # 한도보다 큰 예약은 버킷 크기만큼만 차감 (영원히 기다리지 않음)
+    assert bucket.reserve(1000) == pytest.approx(90.0, abs=0.1)
+
+def test_bucket_adjust_refunds_unused_tokens_up_to_capacity():
+    bucket = TokenBucket(per_minute=60)
+    bucket.reserve(60)
+    
+    bucket.adjust(20)
+    assert bucket.reserve(20) == pytest.approx(0.0, abs=0.1)
+    bucket.adjust(1000)
+    assert bucket.tokens <= bucket.capacity
+
+def test_bucket_pause_blocks_new_requests_for_retry_after():
+    bucket = TokenBucket(per_minute=60)
+    
+    bucket.pause(5)
+    assert bucket.reserve(1) == pytest.approx(6.0, abs=0.1)
+
+def test_limiter_try_acquire_respects_limit():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=2)
+    
+    assert limiter.try_acquire() and limiter.try_acquire()
+    assert not limiter.try_acquire()
+    limiter.release("error")
+    assert limiter.try_acquire()
+
+def test_limiter_halves_on_throttle_and_grows_slowly_on_success():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=8, min_limit=2)
+    
+    for expected in (4, 2, 2):  # min_limit 아래로는 내려가지 않음
+        limiter.acquire()
+        limiter.release("throttled")
+        assert limiter.limit == expected
+    
+    limiter.acquire()
+    limiter.release("error")
+    assert limiter.limit == 2
+    
+    limiter.acquire()
+    limiter.release("success")
+    assert limiter.limit == pytest.approx(2.5)
+    for _ in range(100):
+        limiter.acquire()
+        limiter.release("success")
+    assert limiter.limit == 8
+    assert limiter.in_flight == 0
+
+def test_limiter_sync_waiter_is_woken_by_release():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=1)
+    limiter.acquire()
+    acquired = threading.Event()
+    
+    def worker():
+        limiter.acquire()
+        acquired.set()
+    
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert not acquired.wait(0.05)
+    limiter.release()
+    assert acquired.wait(1)
+    thread.join()
+    assert limiter.in_flight == 1
+
+def test_limiter_async_waiters_are_granted_in_order():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(max_limit=1)
+        await limiter.acquire_async()
+        order = []
+        
+        async def waiter(name):
+            await limiter.acquire_async()
+            order.append(name)
+            limiter.release()
+        
+        tasks = [asyncio.create_task(waiter(name)) for name in ("a", "b", "c")]
+        await asyncio.sleep(0)
+        assert order == [] and len(limiter._async_waiters) == 3
+        
+        limiter.release()
+        await asyncio.wait_for(asyncio.gather(*tasks), 1)
+        return order, limiter.in_flight
+    
+    assert asyncio.run(scenario()) == (["a", "b", "c"], 0)
+
+def test_limiter_cancelled_async_waiter_does_not_leak_slot():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(max_limit=1)
+        await limiter.acquire_async()
+        task = asyncio.create_task(limiter.acquire_async())
+        await asyncio.sleep(0)
+        
+        # 슬롯이 넘어간 직후(_grant 실행 전)에 취소돼도 슬롯이 반납되어야 함
+        limiter.release()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+        return limiter.in_flight, limiter.try_acquire()
+    
+    assert asyncio.run(scenario()) == (0, True)
@@ -0,0 +1,73 @@
+"""리트리버 결과 캐시 (user-050): 질의 정규화, 세대 무효화, TTL, LRU 한도"""
+import pytest
+
+from app.config import settings
+from app.services.retriever_cache import RetrieverCache, retriever_cache
+from app.services.search_backend import LocalSearchBackend
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(settings, "retriever_cache_enabled", True)
+    monkeypatch.setattr(settings, "retriever_cache_ttl_seconds", 300.0)
+    monkeypatch.setattr(settings, "retriever_cache_max_entries", 256)
+    return RetrieverCache()
+
+def test_hit_uses_normalized_query(cache):
+    cache.put("파이썬  백엔드 ", ["doc"], cache.generation)
+    
+    assert cache.get(" 파이썬 백엔드") == ["doc"]
+    assert cache.get("파이썬 프론트엔드") is None
+
+def test_invalidate_drops_entries_and_bumps_generation(cache):
+    cache.put("질의", ["old"], cache.generation)
+    
+    cache.invalidate("테스트")
+    
+    assert cache.generation == 1
+    assert cache.get("질의") is None
+    cache.put("질의", ["new"], cache.generation)
+    assert cache.get("질의") == ["new"]
+
+def test_result_from_search_started_before_invalidation_is_not_stored(cache):
+    generation = cache.generation  # 검색 시작 시점의 세대
+    cache.invalidate("검색 중 새 문서 색인")
+    
+    cache.put("질의", ["stale"], generation)
+    
+    assert cache.get("질의") is None
+
+def test_expired_entry_is_a_miss(cache, monkeypatch):
+    monkeypatch.setattr(settings, "retriever_cache_ttl_seconds", -1.0)
+    cache.put("질의", ["doc"], cache.generation)
+    
+    assert cache.get("질의") is None
+    assert not cache._entries
+
+def test_least_recently_used_entry_is_evicted(cache, monkeypatch):
+    monkeypatch.setattr(settings, "retriever_cache_max_entries", 2)
+    cache.put("a", ["a"], cache.generation)
+    cache.put("b", ["b"], cache.generation)
+    cache.get("a")  # a를 최근 사용으로
+    
+    cache.put("c", ["c"], cache.generation)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == ["a"]
+    assert cache.get("c") == ["c"]
+
+def test_disabled_cache_never_stores(cache, monkeypatch):
+    monkeypatch.setattr(settings, "retriever_cache_enabled", False)
+    cache.put("질의", ["doc"], cache.generation)
+    
+    monkeypatch.setattr(settings, "retriever_cache_enabled", True)
+    assert cache.get("질의") is None
+
+def test_local_indexing_invalidates_global_cache(tmp_path):
+    backend = LocalSearchBackend(str(tmp_path))
+    before = retriever_cache.generation
+    
+    assert backend.index_document("resume.txt", "파이썬 백엔드 개발자".encode())
+    assert retriever_cache.generation == before + 1
+    # 내용이 같으면 다시 색인하지 않으므로 캐시도 유지
+    assert backend.index_document("resume.txt", "파이썬 백엔드 개발자".encode())
+    assert retriever_cache.generation == before + 1
@@ -0,0 +1,72 @@
+"""점수 구조화 (user-034): JSON 블록 추출, 마크다운 문구 대체 추출, 범위 보정"""
+from app.services.scoring import (
+    INTERVIEW_SCORE_FIELDS,
+    MATCH_SCORE_FIELDS,
+    average_score,
+    extract_scores,
+    score_format_instruction,
+)
+
+def test_json_block_is_parsed_clamped_and_removed():
+    analysis = """## 평가
+- **전반적 적합도**: 70/100점
+
+점수를 JSON으로 출력합니다:
+```json
+{"overall_fit": 85, "tech_stack_match": 120, "experience_fit": -5}
+```"""
+    
+    markdown, scores = extract_scores(analysis, MATCH_SCORE_FIELDS)
+    
+    assert scores == {"overall_fit": 85, "tech_stack_match": 100, "experience_fit": 0}
+    assert "```" not in markdown
+    assert "JSON" not in markdown
+    assert markdown.endswith("70/100점")
+
+def test_last_json_block_wins():
+    analysis = '```json\n{"overall_fit": 10}\n```\n본문\n```json\n{"overall_fit": 90}\n```'
+    
+    markdown, scores = extract_scores(analysis, MATCH_SCORE_FIELDS)
+    
+    assert scores["overall_fit"] == 90
+    assert '"overall_fit": 10' in markdown
+
+def test_markdown_fallback_fills_fields_missing_from_json():
+    analysis = """- **기술 스택 매칭**: 65/100점
+- 경력 충족도 ： 72 / 100
+```json
+{"overall_fit": "80", "tech_stack_match": "높음"}
+```"""
+    
+    _, scores = extract_scores(analysis, MATCH_SCORE_FIELDS)
+    
+    assert scores == {"overall_fit": 80, "tech_stack_match": 65, "experience_fit": 72}
+
+def test_broken_json_falls_back_to_markdown():
+    analysis = """**의사소통 능력**: 88/100
+**직무 적합성:** 60/100
+```json
+{"communication": 90,}
+```"""
+    
+    markdown, scores = extract_scores(analysis, INTERVIEW_SCORE_FIELDS)
+    
+    assert "```" not in markdown
+    assert scores["communication"] == 88
+    assert scores["job_fit"] == 60
+    assert scores["technical"] is None
+    assert average_score(scores) == 74
+
+def test_missing_scores_are_none():
+    markdown, scores = extract_scores(None, MATCH_SCORE_FIELDS)
+    
+    assert markdown == ""
+    assert set(scores.values()) == {None}
+    assert average_score(scores) is None
+
+def test_format_instruction_lists_every_field():
+    instruction = score_format_instruction(INTERVIEW_SCORE_FIELDS)
+    
+    for key, label in INTERVIEW_SCORE_FIELDS.items():
+        assert f'"{key}": 0' in instruction
+        assert label in instruction
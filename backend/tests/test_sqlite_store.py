@@ -0,0 +1,56 @@
+"""SQLite + FTS5 저장소 (user-027): FTS 검색, BM25 순위, 직무 필터, 페이지 조회"""
+import pytest
+
+from app.config import settings
+from app.services.sqlite_store import SQLiteStoreService
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "chroma_persist_dir", str(tmp_path))
+    return SQLiteStoreService()
+
+def test_match_query_uses_prefix_and_search_per_term():
+    assert SQLiteStoreService._build_match_query("파이썬, 백엔드!") == '"파이썬"* "백엔드"*'
+    assert SQLiteStoreService._build_match_query('"); DROP') == '"DROP"*'
+    assert SQLiteStoreService._build_match_query("  ?! ") == ""
+
+def test_search_matches_all_terms_by_prefix(store):
+    python_id = store.save_analysis_result("김철수", "백엔드", "파이썬 서버 개발 경험", "협업", "문서화")
+    store.save_analysis_result("이영희", "백엔드", "자바 서버 개발 경험", "설계", "발표")
+    
+    results = store.search_analyses("파이")
+    assert [result["id"] for result in results] == [python_id]
+    assert len(store.search_analyses("서버 개발")) == 2
+    assert store.search_analyses("파이썬 자바") == []  # 단어별 AND 검색
+    assert store.search_analyses("!!") == []
+
+def test_name_match_ranks_above_body_match(store):
+    body_id = store.save_analysis_result("이영희", "프론트엔드", "김철수와 함께 일한 경험", "협업", "")
+    name_id = store.save_analysis_result("김철수", "프론트엔드", "리액트 개발", "설계", "")
+    
+    results = store.search_analyses("김철수")
+    assert [result["id"] for result in results] == [name_id, body_id]
+    assert results[0]["similarity_score"] > results[1]["similarity_score"]
+
+def test_position_filter_is_exact(store):
+    backend_id = store.save_analysis_result("김철수", "백엔드", "API 개발", "", "")
+    store.save_analysis_result("이영희", "백엔드 리드", "API 개발", "", "")
+    
+    results = store.search_analyses("API", position="백엔드")
+    assert [result["id"] for result in results] == [backend_id]
+
+def test_pages_do_not_overlap_and_cover_all_results(store):
+    ids = {store.save_analysis_result(f"지원자{i}", "데이터", f"스파크 파이프라인 {i}", "", "") for i in range(7)}
+    
+    pages = [store.search_analyses("스파크", limit=3, offset=offset) for offset in (0, 3, 6, 9)]
+    assert [len(page) for page in pages] == [3, 3, 1, 0]
+    paged_ids = [result["id"] for page in pages for result in page]
+    assert len(paged_ids) == len(set(paged_ids))
+    assert set(paged_ids) == ids
+    assert paged_ids == [result["id"] for result in store.search_analyses("스파크", limit=10)]
+
+def test_iter_analysis_results_returns_records_in_insert_order(store):
+    ids = [store.save_analysis_result(f"지원자{i}", "백엔드", "요약", "", "") for i in range(3)]
+    
+    assert [record["id"] for record in store.iter_analysis_results()] == ids
+    assert store.get_collection_stats()["document_count"] == 3
@@ -0,0 +1,11 @@
+"""app.main 콜드 스타트 시간 회귀 테스트 (새 프로세스에서 import, settings.startup_import_budget_ms 이내)"""
+from app.config import settings
+from benchmarks.import_profile import measure_import
+
+def test_cold_start_import_within_budget():
+    median_ms, result = measure_import(repeat=3)
+    slowest = sorted(result["modules"], key=lambda m: m["cumulative_ms"], reverse=True)[:5]
+    assert median_ms <= settings.startup_import_budget_ms, (
+        f"app.main import {median_ms:.0f}ms > 한도 {settings.startup_import_budget_ms}ms, "
+        f"누적 상위 모듈: {[(m['module'], round(m['cumulative_ms'])) for m in slowest]}"
+    )
@@ -0,0 +1,75 @@
+"""프롬프트 토큰 예산 (user-032): 섹션별 예산 배분과 truncate/compress 정책"""
+import pytest
+
+from app.config import settings
+from app.services.token_budget import (
+    COMPRESSION_MARKER,
+    TRUNCATION_MARKER,
+    TokenBudgetManager,
+    _allocate,
+    count_tokens,
+)
+
+def build(resume: str, posting: str) -> str:
+    return f"이력서:\n{resume}\n\n채용공고:\n{posting}\n\n적합도를 평가하세요."
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(settings, "prompt_token_budgets", {"test": 200})
+    monkeypatch.setattr(settings, "prompt_budget_policies", {})
+    return TokenBudgetManager()
+
+def test_allocate_keeps_small_sections_and_splits_rest_evenly():
+    assert _allocate({"a": 10, "b": 500, "c": 800}, 310) == {"a": 10, "b": 150, "c": 150}
+    # 작은 섹션이 남긴 몫은 큰 섹션끼리 다시 나눔
+    assert _allocate({"a": 10, "b": 40, "c": 800}, 300) == {"a": 10, "b": 40, "c": 250}
+    assert _allocate({"a": 10, "b": 20}, 100) == {"a": 10, "b": 20}
+    assert _allocate({"a": 10, "b": 20}, 0) == {"a": 0, "b": 0}
+
+def test_fit_under_budget_returns_prompt_unchanged(manager):
+    prompt, usage = manager.fit("test", build, resume="파이썬 개발자", posting="백엔드 개발자 모집")
+    
+    assert prompt == build(resume="파이썬 개발자", posting="백엔드 개발자 모집")
+    assert usage["reduced_sections"] == []
+    assert usage["prompt_tokens"] == usage["original_prompt_tokens"]
+    assert usage["prompt_budget"] == 200
+
+def test_fit_truncates_only_the_large_section(manager, monkeypatch):
+    monkeypatch.setattr(settings, "prompt_budget_policies", {"test": "truncate"})
+    posting = "백엔드 개발자 모집"
+    resume = "경력 사항 " * 400
+    
+    prompt, usage = manager.fit("test", build, resume=resume, posting=posting)
+    
+    assert usage["policy"] == "truncate"
+    assert usage["reduced_sections"] == ["resume"]
+    assert usage["original_prompt_tokens"] > 200
+    assert usage["prompt_tokens"] <= 200 + 2  # 섹션 경계의 토큰 병합 오차만 허용
+    assert TRUNCATION_MARKER in prompt
+    assert posting in prompt
+
+def test_fit_compress_keeps_sentences_overlapping_other_sections(manager, monkeypatch):
+    monkeypatch.setattr(settings, "prompt_token_budgets", {"test": 120})
+    filler = [f"{i}번째 취미 활동으로 주말마다 등산과 독서를 즐깁니다." for i in range(30)]
+    resume = "\n".join(filler[:15] + ["쿠버네티스 운영 경험이 있습니다."] + filler[15:])
+    posting = "쿠버네티스 운영 경험 필수"
+    
+    prompt, usage = manager.fit("test", build, resume=resume, posting=posting)
+    
+    assert usage["policy"] == "compress"
+    assert usage["reduced_sections"] == ["resume"]
+    assert count_tokens(prompt) < count_tokens(build(resume=resume, posting=posting))
+    assert "쿠버네티스 운영 경험이 있습니다." in prompt
+    assert COMPRESSION_MARKER in prompt
+
+def test_completion_usage_prefers_reported_usage():
+    class Result:
+        content = "평가 결과"
+        usage_metadata = {"input_tokens": 50, "output_tokens": 7}
+    
+    usage = TokenBudgetManager.completion_usage({"prompt_tokens": 40}, Result())
+    assert usage == {"prompt_tokens": 50, "completion_tokens": 7, "total_tokens": 57}
+    
+    fallback = TokenBudgetManager.completion_usage({"prompt_tokens": 40}, "평가 결과")
+    assert fallback["completion_tokens"] == count_tokens("평가 결과")
+    assert fallback["total_tokens"] == 40 + fallback["completion_tokens"]
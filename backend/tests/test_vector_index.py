@@ -0,0 +1,81 @@
+"""벡터 인덱스 임베딩 재시도 (실패한 배치가 새 문서의 임베딩을 막지 않음)"""
+import itertools
+import queue
+import threading
+import time
+
+from app.config import settings
+from app.services.vector_index import AnalysisVectorIndex
+
+class FlakyIndex(AnalysisVectorIndex):
+    """ChromaDB/임베딩 없이 쓰기 스레드만 실행 (bad로 시작하는 문서가 들어 있는 배치는 실패)"""
+    
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._attempts = {}
+        self._retries = []
+        self._retry_seq = itertools.count()
+        self.added = {}
+        self.calls = []
+        threading.Thread(target=self._embed_loop, daemon=True).start()
+    
+    def add_documents(self, documents):
+        ids = [doc["id"] for doc in documents]
+        self.calls.append(ids)
+        if any(document_id.startswith("bad") for document_id in ids):
+            raise RuntimeError("embedding failed")
+        for document_id in ids:
+            self.added[document_id] = time.monotonic()
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_failed_batch_does_not_block_new_documents(monkeypatch):
+    monkeypatch.setattr(settings, "vector_embedding_batch_wait_ms", 10)
+    monkeypatch.setattr(settings, "vector_embedding_retry_base_seconds", 30.0)
+    monkeypatch.setattr(settings, "vector_embedding_retry_max_seconds", 30.0)
+    index = FlakyIndex()
+    
+    index.enqueue({"id": "bad-1"})
+    assert wait_until(lambda: index._attempts.get("bad-1") == 1)
+    
+    started = time.monotonic()
+    index.enqueue({"id": "good-1"})
+    assert wait_until(lambda: "good-1" in index.added, timeout=2.0)
+    assert index.added["good-1"] - started < 1.0  # 30초 백오프를 기다리지 않음
+    assert [entry[2]["id"] for entry in index._retries] == ["bad-1"]
+
+def test_retries_until_limit_then_drops(monkeypatch):
+    monkeypatch.setattr(settings, "vector_embedding_batch_wait_ms", 1)
+    monkeypatch.setattr(settings, "vector_embedding_retry_base_seconds", 0.01)
+    monkeypatch.setattr(settings, "vector_embedding_retry_max_seconds", 0.02)
+    monkeypatch.setattr(settings, "vector_embedding_max_retries", 3)
+    index = FlakyIndex()
+    
+    index.enqueue({"id": "bad-1"})
+    assert wait_until(lambda: len(index.calls) == 4 and not index._retries and not index._attempts)
+    time.sleep(0.1)
+    assert len(index.calls) == 4  # 첫 시도 + 재시도 3회 후 버림
+
+def test_successful_retry_clears_attempts(monkeypatch):
+    monkeypatch.setattr(settings, "vector_embedding_batch_wait_ms", 1)
+    monkeypatch.setattr(settings, "vector_embedding_retry_base_seconds", 0.01)
+    index = FlakyIndex()
+    
+    real_add = index.add_documents
+    failures = iter([True])
+    def fail_once(documents):
+        if next(failures, False):
+            index.calls.append([doc["id"] for doc in documents])
+            raise RuntimeError("throttled")
+        real_add(documents)
+    index.add_documents = fail_once
+    
+    index.enqueue({"id": "doc-1"})
+    assert wait_until(lambda: "doc-1" in index.added)
+    assert index._attempts == {} and index._retries == []
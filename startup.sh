@@ -59,6 +59,21 @@ find . -name "*.py" | head -10
 
 # 서버 실행
 echo "Starting uvicorn server..."
-exec python -m uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000}
+# 워커 수는 WEB_CONCURRENCY로 조정
+# 분석 결과 저장소(sqlite/jsonl)는 프로세스 간 안전하므로 여러 워커로 실행 가능
+# - CHROMA_SERVER_HOST 미설정: 로컬 ChromaDB 벡터 인덱스는 공유할 수 없어 벡터(의미) 검색만 꺼짐 (설정 검증에서 처리)
+# - SEARCH_BACKEND=local: 로컬 검색 인덱스는 단일 프로세스 전용이므로 워커를 1개로 실행
+WORKERS=${WEB_CONCURRENCY:-1}
+if [ "$WORKERS" -gt 1 ]; then
+    SINGLE_PROCESS_REASONS=$(python -c "from app.config import single_process_reasons; print(', '.join(single_process_reasons()))")
+    if [ -n "$SINGLE_PROCESS_REASONS" ]; then
+        echo "WARNING: WEB_CONCURRENCY=$WORKERS ignored, single-process only: $SINGLE_PROCESS_REASONS"
+        echo "         Use SEARCH_BACKEND=azure to run several workers."
+        WORKERS=1
+    fi
+fi
+export WEB_CONCURRENCY=$WORKERS
+echo "Workers: $WORKERS"
+exec python -m uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000} --workers $WORKERS
 
 # Fixed for Linux deployment - LF line endings - Updated v2.0 
\ No newline at end of file